@@ -1,13 +1,13 @@
 from flask import Flask
 from flask_restx import Api
-from flask_bcrypt import Bcrypt
 from app.api.v1.users import api as users_ns
 from app.api.v1.amenities import api as amenities_ns
 from app.api.v1.places import api as places_ns
 from app.api.v1.reviews import api as reviews_ns
-
-# Create bcrypt instance (will be initialized in create_app)
-bcrypt = Bcrypt()
+from app.api.v1.compression import Compressor
+from app.api.v1.encoding import output_json
+from app.api.v1.response_cache import ResponseCache
+from app.services import facade, passwords
 
 def create_app(config_class="config.DevelopmentConfig"):
     """
@@ -27,7 +27,9 @@ def create_app(config_class="config.DevelopmentConfig"):
     app.config.from_object(config_class)
     
     # Initialize Flask extensions
-    bcrypt.init_app(app)
+    # (the password workers are forked here, before anything starts threads)
+    passwords.init_app(app)
+    facade.init_app(app)
     
     # Initialize Flask-RESTX API
     api = Api(
@@ -38,6 +40,21 @@ def create_app(config_class="config.DevelopmentConfig"):
         doc='/api/v1/'
     )
     
+    # Encode JSON responses reusing the cached representations' text
+    if app.config.get('JSON_FRAGMENT_ENCODING', True):
+        api.representation('application/json')(output_json)
+    
+    # Compress large JSON responses for clients accepting gzip (or br)
+    compressor = None
+    if app.config.get('COMPRESSION', True):
+        compressor = Compressor.from_config(app.config)
+        app.after_request(compressor.after_request)
+    
+    # Keep encoded GET responses, reused while their ETag is current
+    if app.config.get('RESPONSE_CACHE_BYTES'):
+        app.extensions['response_cache'] = ResponseCache(app.config['RESPONSE_CACHE_BYTES'],
+                                                         compressor=compressor)
+    
     # Register API namespaces
     api.add_namespace(users_ns, path='/api/v1/users')
     api.add_namespace(amenities_ns, path='/api/v1/amenities')
@@ -1,15 +1,18 @@
-from flask_restx import Namespace, Resource, fields
+from flask_restx import Namespace, Resource
 from app.services import facade
+from app.api.v1.conditional import collection, conditional, entity
+from app.api.v1.pagination import page_params, paginate
+from app.api.v1.serializers import amenity_etag, amenity_summary
+from app.api.v1.validation import expect, model_fields
+from app.models import Amenity
 
 api = Namespace('amenities', description='Amenity operations')
 
-amenity_model = api.model('Amenity', {
-    'name': fields.String(required=True, description='Name of the amenity')
-})
+amenity_model = api.model('Amenity', model_fields(Amenity, 'name'))
 
 @api.route('/')
 class AmenityList(Resource):
-    @api.expect(amenity_model, validate=True)
+    @expect(api, amenity_model)
     @api.response(201, 'Amenity successfully created')
     @api.response(400, 'Invalid input data')
     @api.response(400, 'Amenity name already exists')
@@ -23,44 +26,41 @@ class AmenityList(Resource):
         
         new_amenity = facade.create_amenity(amenity_data)
         
-        return {
-            'id': new_amenity.id,
-            'name': new_amenity.name
-        }, 201
+        return amenity_summary(new_amenity), 201
 
+    @api.response(304, 'Not modified since the ETag in If-None-Match')
+    @api.doc(params=page_params)
     @api.response(200, 'List of amenities retrieved successfully')
+    @api.response(400, 'Invalid pagination parameters')
+    @conditional(collection('Amenity'))
     def get(self):
         """Retrieve a list of all amenities"""
-        amenities = facade.get_all_amenities()
+        try:
+            amenities, headers = paginate(facade.get_all_amenities, facade.get_amenities_page)
+        except ValueError as e:
+            return {'error': str(e)}, 400
         
-        amenities_list = []
-        for amenity in amenities:
-            amenity_dict = {
-                'id': amenity.id,
-                'name': amenity.name
-            }
-            amenities_list.append(amenity_dict)
-
-        return amenities_list, 200
+        return [amenity_summary(amenity) for amenity in amenities], 200, headers
 
 @api.route('/<amenity_id>')
 class AmenityResource(Resource):
+    @api.response(304, 'Not modified since the ETag in If-None-Match')
     @api.response(200, 'Amenity details retrieved successfully')
     @api.response(404, 'Amenity not found')
+    @conditional(entity(facade.get_amenity, amenity_etag))
     def get(self, amenity_id):
         """Get amenity details by ID"""
         amenity = facade.get_amenity(amenity_id)
         if not amenity:
             return {'error': 'Amenity not found'}, 404
-        return {
-            'id': amenity.id, 
-            'name': amenity.name
-        }, 200
+        return amenity_summary(amenity), 200
 
-    @api.expect(amenity_model, validate=True)
+    @api.response(412, 'Changed since the ETag in If-Match')
+    @expect(api, amenity_model)
     @api.response(200, 'Amenity updated successfully')
     @api.response(404, 'Amenity not found')
     @api.response(400, 'Invalid input data')
+    @conditional(entity(facade.get_amenity, amenity_etag), lock='Amenity')
     def put(self, amenity_id):
         """Update amenity information"""
         amenity_data = api.payload
@@ -83,10 +83,7 @@ class AmenityResource(Resource):
             if not updated_amenity:
                 return {'error': 'Failed to update amenity'}, 400
 
-            return {
-                'id': updated_amenity.id,
-                'name': updated_amenity.name
-            }, 200
+            return amenity_summary(updated_amenity), 200
         except ValueError as e:
             return {'error': str(e)}, 400
 
@@ -95,37 +92,30 @@ class AmenityResource(Resource):
         """Retrieve a list of all amenities"""
         amenities = facade.get_all_amenities()
         
-        amenities_list = []
-        for amenity in amenities:
-            amenity_dict = {
-                'id': amenity.id,
-                'name': amenity.name
-            }
-            amenities_list.append(amenity_dict)
-        
-        return amenities_list, 200
+        return [amenity_summary(amenity) for amenity in amenities], 200
 
 
 @api.route('/<amenity_id>')
 class AmenityResource(Resource):
+    @api.response(304, 'Not modified since the ETag in If-None-Match')
     @api.response(200, 'Amenity details retrieved successfully')
     @api.response(404, 'Amenity not found')
+    @conditional(entity(facade.get_amenity, amenity_etag))
     def get(self, amenity_id):
         """Get amenity details by ID"""
         amenity = facade.get_amenity(amenity_id)
         if not amenity:
             return {'error': 'Amenity not found'}, 404
         
-        return {
-            'id': amenity.id,
-            'name': amenity.name
-        }, 200
+        return amenity_summary(amenity), 200
 
-    @api.expect(amenity_model, validate=True)
+    @api.response(412, 'Changed since the ETag in If-Match')
+    @expect(api, amenity_model)
     @api.response(200, 'Amenity updated successfully')
     @api.response(404, 'Amenity not found')
     @api.response(400, 'Invalid input data')
     @api.response(400, 'Amenity name already exists')
+    @conditional(entity(facade.get_amenity, amenity_etag), lock='Amenity')
     def put(self, amenity_id):
         """Update an amenity's information"""
         
@@ -142,8 +132,12 @@ class AmenityResource(Resource):
         
         updated_amenity = facade.update_amenity(amenity_id, amenity_data)
         
-        return {
-            'id': updated_amenity.id,
-            'name': updated_amenity.name
-        }, 200
+        return amenity_summary(updated_amenity), 200
 
+    @api.response(200, 'Amenity deleted successfully')
+    @api.response(404, 'Amenity not found')
+    def delete(self, amenity_id):
+        """Delete an amenity and remove it from every place"""
+        if not facade.delete_amenity(amenity_id):
+            return {'error': 'Amenity not found'}, 404
+        return {'message': 'Amenity deleted successfully'}, 200
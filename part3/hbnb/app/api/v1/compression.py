@@ -0,0 +1,77 @@
+"""
+Response compression negotiated through Accept-Encoding: gzip, and br
+when the brotli package is installed.
+
+JSON responses of at least min_size bytes are compressed for clients
+accepting it. A compressed response is a different representation, so
+its strong ETag gets the coding appended ("<tag>-gzip"); conditional
+requests accept any of a resource's variants (see etag_variants()).
+Responses served from the response cache are compressed there, once per
+entry and coding; the after_request hook handles the others.
+"""
+import gzip
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+CODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def etag_variants(tag):
+    """tag followed by the tags of its compressed variants"""
+    return (tag,) + tuple(f"{tag}-{coding}" for coding in CODINGS)
+
+
+class Compressor:
+    """Compression policy of an app: codings, levels and size threshold"""
+
+    def __init__(self, min_size=1024, gzip_level=6, brotli_level=4):
+        self.min_size = min_size
+        self.levels = {'gzip': gzip_level, 'br': brotli_level}
+        self.codings = CODINGS
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(min_size=config.get('COMPRESSION_MIN_SIZE', 1024),
+                   gzip_level=config.get('COMPRESSION_GZIP_LEVEL', 6),
+                   brotli_level=config.get('COMPRESSION_BROTLI_LEVEL', 4))
+
+    def negotiate(self):
+        """The coding to send the current request's response in, or None"""
+        return request.accept_encodings.best_match(self.codings)
+
+    def compress(self, body, coding):
+        if coding == 'br':
+            return brotli.compress(body, mode=brotli.MODE_TEXT, quality=self.levels['br'])
+        return gzip.compress(body, compresslevel=self.levels['gzip'], mtime=0)
+
+    def compressible(self, response):
+        return (response.status_code == 200 and response.mimetype == 'application/json'
+                and not response.direct_passthrough
+                and 'Content-Encoding' not in response.headers
+                and response.content_length is not None
+                and response.content_length >= self.min_size)
+
+    def encode_response(self, response, coding, body=None):
+        """
+        Switch response to coding (its compressed body, when already known,
+        in body) and set the headers that go with it
+        """
+        response.set_data(self.compress(response.get_data(), coding) if body is None else body)
+        response.headers['Content-Encoding'] = coding
+        etag, weak = response.get_etag()
+        if etag:
+            response.set_etag(f"{etag}-{coding}", weak)
+        return response
+
+    def after_request(self, response):
+        if self.compressible(response):
+            response.vary.add('Accept-Encoding')
+            coding = self.negotiate()
+            if coding:
+                self.encode_response(response, coding)
+        return response
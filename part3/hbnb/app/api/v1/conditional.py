@@ -0,0 +1,96 @@
+"""
+Conditional requests: ETags on GET responses, 304 Not Modified for
+If-None-Match and 412 Precondition Failed for If-Match.
+
+A handler's tag is computed from stamps and versions alone, before the
+handler runs, so an unchanged resource is answered without fetching
+pages or serializing anything.
+"""
+import os
+from functools import wraps
+
+from flask import Response, current_app, request
+from flask_restx.utils import unpack
+from werkzeug.http import quote_etag
+
+from app.api.v1.compression import etag_variants
+from app.api.v1.response_cache import request_key
+from app.services import facade
+
+# collection versions restart with the process; this keeps their tags apart
+_BOOT = os.urandom(4).hex()
+
+
+def collection(*model_names):
+    """
+    etag_of for list endpoints: a collection version, changed by any write
+    to the named models (those the listed representations read) once it
+    is complete
+    """
+    def etag_of(**kwargs):
+        return f"{_BOOT}-" + '.'.join(f"{version:x}"
+                                      for version in facade.data_version(*model_names))
+    return etag_of
+
+
+def entity(get, etag):
+    """
+    etag_of for one entity: etag(get(id)) for the route's single id
+    argument, None when there is no such entity
+    """
+    def etag_of(**kwargs):
+        (obj_id,) = kwargs.values()
+        obj = get(obj_id)
+        return None if obj is None else etag(obj)
+    return etag_of
+
+
+def conditional(etag_of, lock=None):
+    """
+    Make a GET or PUT handler conditional on the resource's entity tag,
+    etag_of(**route_arguments) (None when the resource does not exist).
+
+    GET: a matching If-None-Match is answered 304 before the handler
+    runs; successful responses carry the ETag, and 200 responses are
+    kept in the app's response cache (if any) under that tag.
+    PUT: with If-Match, the update only happens if the tag still matches
+    (412 otherwise). lock names the entity's model: the check and the
+    update then run under facade.entity_lock(), so no write slips
+    between them.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if request.method in ('GET', 'HEAD'):
+                tag = etag_of(**kwargs)
+                if tag is None:
+                    return func(*args, **kwargs)
+                for variant in etag_variants(tag):
+                    if request.if_none_match.contains_weak(variant):
+                        return Response(status=304, headers={'ETag': quote_etag(variant)})
+                cache = current_app.extensions.get('response_cache')
+                if cache is not None:
+                    key = request_key()
+                    cached = cache.get(key, tag)
+                    if cached is not None:
+                        return cached
+                data, code, headers = unpack(func(*args, **kwargs))
+                if 200 <= code < 300:
+                    headers = dict(headers, ETag=quote_etag(tag))
+                if cache is not None and code == 200:
+                    # encoded here (args[0] is the Resource), to keep the bytes
+                    response = args[0].api.make_response(data, code, headers=headers)
+                    return cache.put(key, tag, response)
+                return data, code, headers
+
+            if not request.if_match:
+                return func(*args, **kwargs)
+            (obj_id,) = kwargs.values()
+            with facade.entity_lock(lock, obj_id):
+                tag = etag_of(**kwargs)
+                if tag is not None and not any(map(request.if_match.contains,
+                                                   etag_variants(tag))):
+                    return {'error': 'Resource has changed (If-Match failed)'}, 412
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
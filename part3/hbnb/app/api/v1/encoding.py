@@ -0,0 +1,156 @@
+"""
+JSON response encoding that reuses the encoded text of cached
+representations.
+
+The serializers return Encoded dicts: alongside the values they keep
+their JSON text, produced once and written as-is into every response
+embedding them. Only the parts around them (list brackets, extra keys,
+plain dicts) are encoded per request. The output is byte for byte what
+flask_restx's stdlib json representation produces, indented or not.
+"""
+import json
+from datetime import date, datetime, time
+
+from flask import current_app, make_response
+
+_ENCODERS = {}
+
+
+def _default(value):
+    """datetimes (and dates, times) encode as their isoformat()"""
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _dumps(indent):
+    try:
+        return _ENCODERS[indent]
+    except KeyError:
+        encoder = _ENCODERS[indent] = json.JSONEncoder(indent=indent, default=_default).encode
+        return encoder
+
+
+class Encoded(dict):
+    """
+    A representation that caches its JSON text (for one indent setting).
+    Like the cached representations themselves, it must not be mutated
+    once encoded; extend() builds a copy with more keys instead.
+    """
+    __slots__ = ('_base', '_json')
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._base = None
+        self._json = None
+
+    def encode(self, indent=None):
+        """JSON text of this dict, at the top level of a document"""
+        cached = self._json
+        if cached is not None and cached[0] == indent:
+            return cached[1]
+        base = self._base
+        if base is None:
+            text = _dumps(indent)(self)
+        else:
+            # the base's text, reopened to append the extra keys
+            parts = []
+            if indent is None:
+                parts.append(base.encode(None)[:-1])
+                for key in list(self)[len(base):]:
+                    parts.append(f", {_dumps(None)(key)}: ")
+                    _write(self[key], None, 0, parts.append)
+                parts.append('}')
+            else:
+                padding = '\n' + ' ' * indent
+                parts.append(base.encode(indent)[:-2])
+                for key in list(self)[len(base):]:
+                    parts.append(f",{padding}{_dumps(indent)(key)}: ")
+                    _write(self[key], indent, 1, parts.append)
+                parts.append('\n}')
+            text = ''.join(parts)
+        self._json = (indent, text)
+        return text
+
+
+def extend(base, **fields):
+    """
+    base (an Encoded representation) with fields appended, reusing the
+    encoded text of base; the same as dict(base, **fields) once encoded
+    """
+    extended = Encoded(base, **fields)
+    if type(base) is Encoded and base and fields.keys().isdisjoint(base):
+        extended._base = base
+    return extended
+
+
+def _write(value, indent, depth, write):
+    kind = type(value)
+    if kind is Encoded:
+        text = value.encode(indent)
+        if indent is not None and depth:
+            text = text.replace('\n', '\n' + ' ' * (indent * depth))
+        write(text)
+    elif kind is list or kind is tuple:
+        if not value:
+            write('[]')
+        elif indent is None:
+            separator = '['
+            for item in value:
+                write(separator)
+                _write(item, None, 0, write)
+                separator = ', '
+            write(']')
+        else:
+            separator = '[\n' + ' ' * (indent * (depth + 1))
+            for item in value:
+                write(separator)
+                _write(item, indent, depth + 1, write)
+                separator = ',\n' + ' ' * (indent * (depth + 1))
+            write('\n' + ' ' * (indent * depth) + ']')
+    elif kind is dict and value and all(type(key) is str for key in value):
+        dumps = _dumps(indent)
+        if indent is None:
+            separator = '{'
+            for key, item in value.items():
+                write(f"{separator}{dumps(key)}: ")
+                _write(item, None, 0, write)
+                separator = ', '
+            write('}')
+        else:
+            separator = '{\n' + ' ' * (indent * (depth + 1))
+            for key, item in value.items():
+                write(f"{separator}{dumps(key)}: ")
+                _write(item, indent, depth + 1, write)
+                separator = ',\n' + ' ' * (indent * (depth + 1))
+            write('\n' + ' ' * (indent * depth) + '}')
+    else:
+        text = _dumps(indent)(value)
+        if indent is not None and depth and kind is not str:
+            text = text.replace('\n', '\n' + ' ' * (indent * depth))
+        write(text)
+
+
+def encode(value, indent=None):
+    """json.dumps(value, indent=indent), reusing Encoded fragments' text"""
+    parts = []
+    _write(value, indent, 0, parts.append)
+    return ''.join(parts)
+
+
+def output_json(data, code, headers=None):
+    """
+    flask_restx representation for application/json: the same bytes as
+    the default one (RESTX_JSON settings, indent 4 when debugging, a
+    trailing newline), built from the cached fragments when the
+    settings only set the indent.
+    """
+    settings = current_app.config.get('RESTX_JSON', {})
+    indent = settings.get('indent', 4 if current_app.debug else None)
+    if settings.keys() <= {'indent'} and (indent is None or type(indent) is int):
+        dumped = encode(data, indent) + "\n"
+    else:
+        dumped = json.dumps(data, **dict({'default': _default, 'indent': indent}, **settings)) + "\n"
+    response = make_response(dumped, code)
+    response.headers.extend(headers or {})
+    return response
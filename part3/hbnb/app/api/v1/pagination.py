@@ -0,0 +1,93 @@
+import json
+import math
+from base64 import b64decode, urlsafe_b64encode
+from binascii import Error as Base64Error
+from datetime import datetime
+from flask import request
+from app.persistence.repository import page_key
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Swagger documentation for the query parameters every list endpoint accepts
+page_params = {
+    'limit': f'Page size (1-{MAX_PAGE_SIZE}); paginates the list when given',
+    'cursor': 'X-Next-Cursor value returned with the previous page',
+}
+
+
+def _encode_value(value):
+    return {'$dt': value.isoformat()} if isinstance(value, datetime) else value
+
+
+def _decode_value(value):
+    return datetime.fromisoformat(value['$dt']) if isinstance(value, dict) else value
+
+
+def encode_cursor(sort, key):
+    """Opaque token for the keyset position key in the given sort order"""
+    if isinstance(key, tuple):
+        key = [_encode_value(key[0]), key[1]]
+    data = json.dumps([sort, key], separators=(',', ':')).encode()
+    return urlsafe_b64encode(data).decode().rstrip('=')
+
+
+def _valid_key(key, field):
+    """
+    True if key can be compared with the page keys of field: an id string
+    for 'id', else a [value, id] pair whose value is a naive datetime for
+    the *_at timestamps and a finite number for the others
+    """
+    if field == 'id':
+        return type(key) is str
+    if not (isinstance(key, tuple) and type(key[1]) is str):
+        return False
+    value = key[0]
+    if field.endswith('_at'):
+        return isinstance(value, datetime) and value.tzinfo is None
+    return type(value) in (int, float) and math.isfinite(value)
+
+
+def decode_cursor(token, sort):
+    try:
+        data = b64decode(token + '=' * (-len(token) % 4), altchars=b'-_', validate=True)
+        cursor_sort, key = json.loads(data)
+        if isinstance(key, list):
+            value, obj_id = key
+            key = (_decode_value(value), obj_id)
+    except (Base64Error, UnicodeDecodeError, TypeError, KeyError, ValueError):
+        raise ValueError("Invalid cursor")
+    if cursor_sort != sort:
+        raise ValueError("Cursor does not match the sort order")
+    if not _valid_key(key, sort.lstrip('-')):
+        raise ValueError("Invalid cursor")
+    return key
+
+
+def paginate(get_all, get_page, sort='id'):
+    """
+    Return (entities, headers) for a list endpoint.
+
+    Without ?limit= or ?cursor= the whole collection is returned with
+    get_all(). Otherwise one page in sort order is fetched with
+    get_page(after_key, limit) and, when more rows follow, an X-Next-Cursor
+    header is set. Raises ValueError for malformed parameters.
+    """
+    args = request.args
+    if 'limit' not in args and 'cursor' not in args:
+        return get_all(), {}
+    try:
+        limit = int(args.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise ValueError("limit must be an integer")
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    after_key = decode_cursor(args['cursor'], sort) if args.get('cursor') else None
+
+    # fetch one extra row to learn whether another page exists
+    entities = get_page(after_key, limit + 1)
+    headers = {}
+    if len(entities) > limit:
+        entities = entities[:limit]
+        headers['X-Next-Cursor'] = encode_cursor(sort, page_key(entities[-1], sort.lstrip('-')))
+    return entities, headers
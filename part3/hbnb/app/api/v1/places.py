@@ -1,22 +1,59 @@
+import math
+
+from flask import request
 from flask_restx import Namespace, Resource, fields
 from app.services import facade
+from app.api.v1.conditional import collection, conditional, entity
+from app.api.v1.pagination import MAX_PAGE_SIZE, page_params, paginate
+from app.api.v1.serializers import extend, place_detail, place_etag, place_summary
+from app.api.v1.validation import expect, model_fields
+from app.models import Place
 
 api = Namespace('places', description='Place operations')
 
 # Define the place model for input validation and documentation
-place_model = api.model('Place', {
-    'title': fields.String(required=True, description='Title of the place'),
-    'description': fields.String(required=False, description='Description of the place'),
-    'price': fields.Float(required=True, description='Price per night'),
-    'latitude': fields.Float(required=True, description='Latitude coordinate'),
-    'longitude': fields.Float(required=True, description='Longitude coordinate'),
-    'owner_id': fields.String(required=True, description='ID of the place owner'),
-    'amenities': fields.List(fields.String, required=False, description='List of amenity IDs')
+place_model = api.model('Place', dict(
+    model_fields(Place, 'title', 'description', 'price', 'latitude', 'longitude'),
+    owner_id=fields.String(required=True, description='ID of the place owner'),
+    amenities=fields.List(fields.String, required=False, description='List of amenity IDs')
+))
+
+PLACE_SORTS = ('id', 'price', '-price', 'created_at', '-created_at')
+
+place_list_params = dict(page_params, **{
+    'min_price': 'Only places costing at least this much per night',
+    'max_price': 'Only places costing at most this much per night',
+    'sort': f"Sort order: {', '.join(PLACE_SORTS)} (default id, i.e. oldest first)",
+    'amenities': 'Comma-separated amenity IDs; only places having all of them',
+    'any_amenities': 'Comma-separated amenity IDs; only places having at least one of them',
 })
 
+
+def place_query(args):
+    """Parse the places list filters; raises ValueError for invalid values"""
+    query = {}
+    for name in ('min_price', 'max_price'):
+        if args.get(name):
+            try:
+                query[name] = float(args[name])
+            except ValueError:
+                raise ValueError(f"{name} must be a number")
+            if not math.isfinite(query[name]):
+                raise ValueError(f"{name} must be a finite number")
+    for name in ('amenities', 'any_amenities'):
+        amenity_ids = tuple(aid.strip() for aid in args.get(name, '').split(',') if aid.strip())
+        if amenity_ids:
+            query[name] = amenity_ids
+    sort = args.get('sort', 'id')
+    if sort not in PLACE_SORTS:
+        raise ValueError(f"sort must be one of: {', '.join(PLACE_SORTS)}")
+    if sort != 'id':
+        query['sort'] = sort
+    return query
+
 @api.route('/')
 class PlaceList(Resource):
-    @api.expect(place_model, validate=True)
+    @expect(api, place_model)
     @api.response(201, 'Place successfully created')
     @api.response(400, 'Invalid input data')
     @api.response(404, 'Owner not found')
@@ -34,82 +71,146 @@ class PlaceList(Resource):
             if not new_place:
                 return {'error': 'Failed to create place'}, 400
                 
-            return {
-                'id': new_place.id,
-                'title': new_place.title,
-                'description': new_place.description,
-                'price': new_place.price,
-                'latitude': new_place.latitude,
-                'longitude': new_place.longitude,
-                'owner': {
-                    'id': new_place.owner.id,
-                    'first_name': new_place.owner.first_name,
-                    'last_name': new_place.owner.last_name,
-                    'email': new_place.owner.email
-                },
-                'amenities': [{'id': amenity.id, 'name': amenity.name} for amenity in new_place.amenities]
-            }, 201
+            return place_summary(new_place), 201
         except Exception as e:
             return {'error': str(e)}, 400
 
+    @api.response(304, 'Not modified since the ETag in If-None-Match')
+    @api.doc(params=place_list_params)
     @api.response(200, 'List of places retrieved successfully')
+    @api.response(400, 'Invalid filter or pagination parameters')
+    @conditional(collection('Place', 'User', 'Amenity', 'Review'))
     def get(self):
         """Retrieve a list of all places"""
-        places = facade.get_all_places()
+        try:
+            query = place_query(request.args)
+            get_all = facade.get_all_places
+            if query:
+                get_all = lambda: facade.get_places_page(None, None, **query)
+            places, headers = paginate(
+                get_all, lambda after_key, limit: facade.get_places_page(after_key, limit, **query),
+                sort=query.get('sort', 'id'))
+        except ValueError as e:
+            return {'error': str(e)}, 400
         
-        places_list = []
-        for place in places:
-            place_dict = {
-                'id': place.id,
-                'title': place.title,
-                'description': place.description,
-                'price': place.price,
-                'latitude': place.latitude,
-                'longitude': place.longitude,
-                'owner': {
-                    'id': place.owner.id,
-                    'first_name': place.owner.first_name,
-                    'last_name': place.owner.last_name,
-                    'email': place.owner.email
-                },
-                'amenities': [{'id': amenity.id, 'name': amenity.name} for amenity in place.amenities]
-            }
-            places_list.append(place_dict)
+        places_list = [place_summary(place) for place in places]
         
-        return places_list, 200
+        return places_list, 200, headers
+
+
+def geo_query(args, size_param, default_size):
+    """Parse lat/lon and a result-size parameter; raises ValueError for invalid values"""
+    try:
+        latitude = float(args['lat'])
+        longitude = float(args['lon'])
+    except KeyError:
+        raise ValueError("lat and lon are required")
+    except ValueError:
+        raise ValueError("lat and lon must be numbers")
+    if not -90.0 <= latitude <= 90.0:
+        raise ValueError("lat must be within -90.0 to 90.0")
+    if not -180.0 <= longitude <= 180.0:
+        raise ValueError("lon must be within -180.0 to 180.0")
+    try:
+        size = int(args.get(size_param, default_size))
+    except ValueError:
+        raise ValueError(f"{size_param} must be an integer")
+    if not 1 <= size <= MAX_PAGE_SIZE:
+        raise ValueError(f"{size_param} must be between 1 and {MAX_PAGE_SIZE}")
+    return latitude, longitude, size
+
+
+def with_distances(matches):
+    return [extend(place_summary(place), distance_km=round(distance, 3))
+            for place, distance in matches]
+
+@api.route('/nearby')
+class PlaceNearby(Resource):
+    @api.doc(params={'lat': 'Latitude of the centre', 'lon': 'Longitude of the centre',
+                     'radius_km': 'Search radius in kilometres',
+                     'limit': f'Maximum number of places (1-{MAX_PAGE_SIZE}, default 100)'})
+    @api.response(304, 'Not modified since the ETag in If-None-Match')
+    @api.response(200, 'Places within the radius, nearest first')
+    @api.response(400, 'Invalid search parameters')
+    @conditional(collection('Place', 'User', 'Amenity', 'Review'))
+    def get(self):
+        """Find places within a radius of a point"""
+        try:
+            latitude, longitude, limit = geo_query(request.args, 'limit', 100)
+            try:
+                radius_km = float(request.args['radius_km'])
+            except (KeyError, ValueError):
+                raise ValueError("radius_km must be a number")
+            if not radius_km > 0:
+                raise ValueError("radius_km must be positive")
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        return with_distances(facade.get_places_within(latitude, longitude, radius_km, limit)), 200
+
+@api.route('/nearest')
+class PlaceNearest(Resource):
+    @api.doc(params={'lat': 'Latitude of the point', 'lon': 'Longitude of the point',
+                     'k': f'Number of places (1-{MAX_PAGE_SIZE}, default 10)'})
+    @api.response(304, 'Not modified since the ETag in If-None-Match')
+    @api.response(200, 'The k nearest places, nearest first')
+    @api.response(400, 'Invalid search parameters')
+    @conditional(collection('Place', 'User', 'Amenity', 'Review'))
+    def get(self):
+        """Find the places nearest to a point"""
+        try:
+            latitude, longitude, k = geo_query(request.args, 'k', 10)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        return with_distances(facade.get_nearest_places(latitude, longitude, k)), 200
+
+@api.route('/search')
+class PlaceSearch(Resource):
+    @api.doc(params={'q': 'Words to search for in titles, descriptions and reviews',
+                     'limit': f'Maximum number of places (1-{MAX_PAGE_SIZE}, default 20)',
+                     'prefix': 'true to also match words starting with the last word of q'})
+    @api.response(304, 'Not modified since the ETag in If-None-Match')
+    @api.response(200, 'Matching places, best match first')
+    @api.response(400, 'Invalid search parameters')
+    @conditional(collection('Place', 'User', 'Amenity', 'Review'))
+    def get(self):
+        """Full-text search over places and their reviews"""
+        query = request.args.get('q', '').strip()
+        if not query:
+            return {'error': 'q is required'}, 400
+        try:
+            limit = int(request.args.get('limit', 20))
+        except ValueError:
+            return {'error': 'limit must be an integer'}, 400
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            return {'error': f'limit must be between 1 and {MAX_PAGE_SIZE}'}, 400
+        prefix = request.args.get('prefix', 'false').lower()
+        if prefix not in ('true', 'false'):
+            return {'error': 'prefix must be true or false'}, 400
+
+        matches = facade.search_places(query, limit, prefix == 'true')
+        return [extend(place_summary(place), score=round(score, 4))
+                for place, score in matches], 200
 
 @api.route('/<place_id>')
 class PlaceResource(Resource):
+    @api.response(304, 'Not modified since the ETag in If-None-Match')
     @api.response(200, 'Place details retrieved successfully')
     @api.response(404, 'Place not found')
+    @conditional(entity(facade.get_place, place_etag))
     def get(self, place_id):
         """Get place details by ID"""
         place = facade.get_place(place_id)
         if not place:
             return {'error': 'Place not found'}, 404
             
-        return {
-            'id': place.id,
-            'title': place.title,
-            'description': place.description,
-            'price': place.price,
-            'latitude': place.latitude,
-            'longitude': place.longitude,
-            'owner': {
-                'id': place.owner.id,
-                'first_name': place.owner.first_name,
-                'last_name': place.owner.last_name,
-                'email': place.owner.email
-            },
-            'amenities': [{'id': amenity.id, 'name': amenity.name} for amenity in place.amenities],
-            'reviews': [{'id': review.id, 'text': review.text, 'rating': review.rating, 
-                        'user_id': review.user.id} for review in place.reviews]
-        }, 200
-
-    @api.expect(place_model, validate=True)
+        return place_detail(place), 200
+
+    @api.response(412, 'Changed since the ETag in If-Match')
+    @expect(api, place_model)
     @api.response(200, 'Place updated successfully')
     @api.response(404, 'Place not found')
     @api.response(400, 'Invalid input data')
+    @conditional(entity(facade.get_place, place_etag), lock='Place')
     def put(self, place_id):
         """Update place information"""
         place_data = api.payload.copy()
@@ -126,20 +227,14 @@ class PlaceResource(Resource):
         try:
             updated_place = facade.update_place(place_id, place_data)
             
-            return {
-                'id': updated_place.id,
-                'title': updated_place.title,
-                'description': updated_place.description,
-                'price': updated_place.price,
-                'latitude': updated_place.latitude,
-                'longitude': updated_place.longitude,
-                'owner': {
-                    'id': updated_place.owner.id,
-                    'first_name': updated_place.owner.first_name,
-                    'last_name': updated_place.owner.last_name,
-                    'email': updated_place.owner.email
-                },
-                'amenities': [{'id': amenity.id, 'name': amenity.name} for amenity in updated_place.amenities]
-            }, 200
+            return place_summary(updated_place), 200
         except Exception as e:
-            return {'error': str(e)}, 400
\ No newline at end of file
+            return {'error': str(e)}, 400
+
+    @api.response(200, 'Place deleted successfully')
+    @api.response(404, 'Place not found')
+    def delete(self, place_id):
+        """Delete a place and its reviews"""
+        if not facade.delete_place(place_id):
+            return {'error': 'Place not found'}, 404
+        return {'message': 'Place deleted successfully'}, 200
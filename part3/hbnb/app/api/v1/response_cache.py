@@ -0,0 +1,122 @@
+"""
+In-process cache of encoded GET responses.
+
+Entries are keyed by path and normalized query string and remember the
+entity tag (see conditional) the response was built for. The tag moves
+with every write to what the response shows, so a lookup under the
+current tag only finds a response that is still valid; entries left
+behind by a write are replaced on the next miss or evicted, least
+recently used first, once the cached bodies exceed max_bytes.
+
+With a compressor (see compression), each entry also keeps its body in
+the codings clients asked for, so a hot response is compressed once.
+"""
+import threading
+from collections import OrderedDict
+
+from flask import Response, request
+
+# rough per-entry cost of the key, the tuple and the dict slot
+_ENTRY_OVERHEAD = 200
+
+
+def request_key():
+    """(path, sorted query arguments) of the current request"""
+    return request.path, tuple(sorted(request.args.items(multi=True)))
+
+
+class _Entry:
+    __slots__ = ('tag', 'status', 'headers', 'body', 'encoded', 'size')
+
+    def __init__(self, tag, status, headers, body, size):
+        self.tag = tag
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.encoded = {}  # coding -> compressed body
+        self.size = size
+
+
+class ResponseCache:
+    """A byte-bounded LRU of (tag, status, headers, body) per request key"""
+
+    def __init__(self, max_bytes, max_entry_bytes=None, compressor=None):
+        self.max_bytes = max_bytes
+        # one oversized list must not flush everything else
+        self.max_entry_bytes = max_entry_bytes or max_bytes // 4
+        self.compressor = compressor
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.size = 0
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key, tag):
+        """A new Response for key if it was cached under tag, else None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.tag != tag:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return self._respond(key, entry)
+
+    def put(self, key, tag, response):
+        """
+        Cache response (a complete 200 response) for key under tag and
+        return the response to send
+        """
+        body = response.get_data()
+        headers = [(name, value) for name, value in response.headers.items()
+                   if name != 'Content-Length']
+        size = (len(body) + sum(len(name) + len(value) for name, value in headers)
+                + len(repr(key)) + _ENTRY_OVERHEAD)
+        if size > self.max_entry_bytes:
+            return response
+        entry = _Entry(tag, response.status_code, headers, body, size)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= old.size
+            self._entries[key] = entry
+            self._grow(size)
+        return self._respond(key, entry)
+
+    def _grow(self, size):
+        self.size += size
+        while self.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= evicted.size
+            self.evictions += 1
+
+    def _respond(self, key, entry):
+        response = Response(entry.body, entry.status, entry.headers)
+        compressor = self.compressor
+        if compressor is None or not compressor.compressible(response):
+            return response
+        response.vary.add('Accept-Encoding')
+        coding = compressor.negotiate()
+        if not coding:
+            return response
+        body = entry.encoded.get(coding)
+        if body is None:
+            body = compressor.compress(entry.body, coding)
+            with self._lock:
+                if self._entries.get(key) is entry and coding not in entry.encoded:
+                    entry.encoded[coding] = body
+                    entry.size += len(body)
+                    self._grow(len(body))
+        return compressor.encode_response(response, coding, body)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {'entries': len(self._entries), 'bytes': self.size,
+                    'hits': self.hits, 'misses': self.misses,
+                    'evictions': self.evictions,
+                    'hit_ratio': self.hits / lookups if lookups else 0.0}
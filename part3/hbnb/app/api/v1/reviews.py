@@ -1,19 +1,24 @@
 from flask_restx import Namespace, Resource, fields
 from app.services import facade
+from app.api.v1.conditional import collection, conditional, entity
+from app.api.v1.pagination import page_params, paginate
+from app.api.v1.serializers import (place_reviews_etag, review_etag, review_for_place,
+                                    review_summary)
+from app.api.v1.validation import expect, model_fields
+from app.models import Review
 
 api = Namespace('reviews', description='Review operations')
 
 # Define the review model for input validation and documentation
-review_model = api.model('Review', {
-    'text': fields.String(required=True, description='Review text'),
-    'rating': fields.Integer(required=True, description='Rating from 1 to 5'),
-    'user_id': fields.String(required=True, description='ID of the user making the review'),
-    'place_id': fields.String(required=True, description='ID of the place being reviewed')
-})
+review_model = api.model('Review', dict(
+    model_fields(Review, 'text', 'rating'),
+    user_id=fields.String(required=True, description='ID of the user making the review'),
+    place_id=fields.String(required=True, description='ID of the place being reviewed')
+))
 
 @api.route('/')
 class ReviewList(Resource):
-    @api.expect(review_model, validate=True)
+    @expect(api, review_model)
     @api.response(201, 'Review successfully created')
     @api.response(400, 'Invalid input data')
     @api.response(404, 'User or Place not found')
@@ -35,80 +40,44 @@ class ReviewList(Resource):
             if not new_review:
                 return {'error': 'Failed to create review'}, 400
                 
-            return {
-                'id': new_review.id,
-                'text': new_review.text,
-                'rating': new_review.rating,
-                'user': {
-                    'id': new_review.user.id,
-                    'first_name': new_review.user.first_name,
-                    'last_name': new_review.user.last_name,
-                    'email': new_review.user.email
-                },
-                'place': {
-                    'id': new_review.place.id,
-                    'title': new_review.place.title
-                }
-            }, 201
+            return review_summary(new_review), 201
         except Exception as e:
             return {'error': str(e)}, 400
 
+    @api.response(304, 'Not modified since the ETag in If-None-Match')
+    @api.doc(params=page_params)
     @api.response(200, 'List of reviews retrieved successfully')
+    @api.response(400, 'Invalid pagination parameters')
+    @conditional(collection('Review', 'User', 'Place'))
     def get(self):
         """Retrieve a list of all reviews"""
-        reviews = facade.get_all_reviews()
-        
-        reviews_list = []
-        for review in reviews:
-            review_dict = {
-                'id': review.id,
-                'text': review.text,
-                'rating': review.rating,
-                'user': {
-                    'id': review.user.id,
-                    'first_name': review.user.first_name,
-                    'last_name': review.user.last_name,
-                    'email': review.user.email
-                },
-                'place': {
-                    'id': review.place.id,
-                    'title': review.place.title
-                }
-            }
-            reviews_list.append(review_dict)
+        try:
+            reviews, headers = paginate(facade.get_all_reviews, facade.get_reviews_page)
+        except ValueError as e:
+            return {'error': str(e)}, 400
         
-        return reviews_list, 200
+        return [review_summary(review) for review in reviews], 200, headers
 
 @api.route('/<review_id>')
 class ReviewResource(Resource):
+    @api.response(304, 'Not modified since the ETag in If-None-Match')
     @api.response(200, 'Review details retrieved successfully')
     @api.response(404, 'Review not found')
+    @conditional(entity(facade.get_review, review_etag))
     def get(self, review_id):
         """Get review details by ID"""
         review = facade.get_review(review_id)
         if not review:
             return {'error': 'Review not found'}, 404
             
-        return {
-            'id': review.id,
-            'text': review.text,
-            'rating': review.rating,
-            'user': {
-                'id': review.user.id,
-                'first_name': review.user.first_name,
-                'last_name': review.user.last_name,
-                'email': review.user.email
-            },
-            'place': {
-                'id': review.place.id,
-                'title': review.place.title
-            }
-        }, 200
+        return review_summary(review), 200
 
-    @api.expect(review_model, validate=True)
+    @api.response(412, 'Changed since the ETag in If-Match')
+    @expect(api, review_model)
     @api.response(200, 'Review updated successfully')
     @api.response(404, 'Review not found')
     @api.response(400, 'Invalid input data')
+    @conditional(entity(facade.get_review, review_etag), lock='Review')
     def put(self, review_id):
         """Update review information"""
         review_data = api.payload.copy()
@@ -125,21 +94,7 @@ class ReviewResource(Resource):
         try:
             updated_review = facade.update_review(review_id, review_data)
             
-            return {
-                'id': updated_review.id,
-                'text': updated_review.text,
-                'rating': updated_review.rating,
-                'user': {
-                    'id': updated_review.user.id,
-                    'first_name': updated_review.user.first_name,
-                    'last_name': updated_review.user.last_name,
-                    'email': updated_review.user.email
-                },
-                'place': {
-                    'id': updated_review.place.id,
-                    'title': updated_review.place.title
-                }
-            }, 200
+            return review_summary(updated_review), 200
         except Exception as e:
             return {'error': str(e)}, 400
 
@@ -159,27 +114,14 @@ class ReviewResource(Resource):
 
 @api.route('/places/<place_id>')
 class PlaceReviewList(Resource):
+    @api.response(304, 'Not modified since the ETag in If-None-Match')
     @api.response(200, 'Reviews for place retrieved successfully')
     @api.response(404, 'Place not found')
+    @conditional(entity(facade.get_place, place_reviews_etag))
     def get(self, place_id):
         """Get all reviews for a specific place"""
         place = facade.get_place(place_id)
         if not place:
             return {'error': 'Place not found'}, 404
             
-        reviews_list = []
-        for review in place.reviews:
-            review_dict = {
-                'id': review.id,
-                'text': review.text,
-                'rating': review.rating,
-                'user': {
-                    'id': review.user.id,
-                    'first_name': review.user.first_name,
-                    'last_name': review.user.last_name,
-                    'email': review.user.email
-                }
-            }
-            reviews_list.append(review_dict)
-        
-        return reviews_list, 200
\ No newline at end of file
+        return [review_for_place(review) for review in place.reviews], 200
\ No newline at end of file
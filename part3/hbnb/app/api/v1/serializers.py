@@ -0,0 +1,210 @@
+"""
+Response representations of the models, shared by every resource.
+
+Each entity keeps the representations built from it in its _serialized
+slot, next to the updated_at stamps (of the entity and of the related
+entities it embeds) they were built from. save() always moves
+updated_at forward, so a representation is reused until one of those
+entities changes and rebuilt on the next request after that.
+Representations are shared between responses and must not be mutated;
+callers adding keys use extend(summary, key=value). They are Encoded
+dicts, so their JSON text is cached along with them (see encoding).
+
+The *_etag() functions give the entity tag of a representation from the
+same stamps, without building it: "<id>.<updated_at>", plus a digest of
+the related entities' stamps when it embeds any.
+"""
+from hashlib import blake2b
+
+from app.api.v1.encoding import Encoded, extend
+from app.services import facade
+
+
+def _cached(obj, view, stamp, build):
+    """obj's representation called view, rebuilt unless built at stamp"""
+    try:
+        cache = obj._serialized
+    except AttributeError:
+        cache = obj._serialized = {}
+    entry = cache.get(view)
+    if entry is not None and entry[0] == stamp:
+        return entry[1]
+    value = build(obj)
+    if type(value) is not Encoded:
+        value = Encoded(value)
+    cache[view] = (stamp, value)
+    return value
+
+
+def _amenities_stamp(place):
+    # each amenity's stamp only grows, so their sum changes with any of them
+    return sum(amenity._updated_us for amenity in place.amenities)
+
+
+def _etag(obj, *related):
+    tag = f"{obj.id}.{obj._updated_us:x}"
+    if related:
+        tag += '.' + blake2b(repr(related).encode(), digest_size=8).hexdigest()
+    return tag
+
+
+def user_etag(user):
+    """Entity tag of user_summary(user)"""
+    return _etag(user)
+
+
+def amenity_etag(amenity):
+    """Entity tag of amenity_summary(amenity)"""
+    return _etag(amenity)
+
+
+def place_etag(place):
+    """Entity tag of place_detail(place)"""
+    # the displayed Bayesian average rather than the prior it is computed
+    # from: a review elsewhere moves the prior, but rarely this place's
+    # rounded average
+    return _etag(place, place.owner._updated_us, _amenities_stamp(place),
+                 round(place.bayesian_rating(*facade.rating_prior()), 3),
+                 sum(review._updated_us for review in place.reviews))
+
+
+def place_reviews_etag(place):
+    """Entity tag of the list of review_for_place() of a place's reviews"""
+    return _etag(place, len(place.reviews),
+                 sum(review._updated_us + review.user._updated_us for review in place.reviews))
+
+
+def review_etag(review):
+    """Entity tag of review_summary(review)"""
+    return _etag(review, review.user._updated_us, review.place._updated_us)
+
+
+def user_summary(user):
+    """A user, without the password"""
+    return _cached(user, 'summary', user._updated_us, lambda user: {
+        'id': user.id,
+        'first_name': user.first_name,
+        'last_name': user.last_name,
+        'email': user.email,
+        'is_admin': user.is_admin,
+        'created_at': user.created_at.isoformat(),
+        'updated_at': user.updated_at.isoformat()
+    })
+
+
+def user_created(user):
+    """A newly registered user (no updated_at)"""
+    summary = dict(user_summary(user))
+    del summary['updated_at']
+    return summary
+
+
+def user_brief(user):
+    """A user embedded in a place or review"""
+    return _cached(user, 'brief', user._updated_us, lambda user: {
+        'id': user.id,
+        'first_name': user.first_name,
+        'last_name': user.last_name,
+        'email': user.email
+    })
+
+
+def amenity_summary(amenity):
+    return _cached(amenity, 'summary', amenity._updated_us, lambda amenity: {
+        'id': amenity.id,
+        'name': amenity.name
+    })
+
+
+def place_brief(place):
+    """A place embedded in a review"""
+    return _cached(place, 'brief', place._updated_us, lambda place: {
+        'id': place.id,
+        'title': place.title
+    })
+
+
+def place_rating(place):
+    """The rating aggregates block of a place"""
+    prior = facade.rating_prior()
+    return _cached(place, 'rating', (place._updated_us, prior), lambda place: {
+        'count': place.rating_count,
+        'average': None if place.average_rating is None else round(place.average_rating, 3),
+        'bayesian_average': round(place.bayesian_rating(*prior), 3),
+        'histogram': list(place.rating_histogram)
+    })
+
+
+def _place_fields(place):
+    return {
+        'id': place.id,
+        'title': place.title,
+        'description': place.description,
+        'price': place.price,
+        'latitude': place.latitude,
+        'longitude': place.longitude,
+        'owner': user_brief(place.owner),
+        'amenities': [amenity_summary(amenity) for amenity in place.amenities]
+    }
+
+
+def place_summary(place):
+    """A place the way list endpoints return it"""
+    stamp = (place._updated_us, place.owner._updated_us, _amenities_stamp(place))
+    # the rating follows every review posted anywhere (through the prior),
+    # so it is cached on its own; the joined summary is kept while both
+    # parts are (the cache holds them, so their ids are not reused)
+    fields = _cached(place, 'fields', stamp, _place_fields)
+    rating = place_rating(place)
+    return _cached(place, 'summary', (id(fields), id(rating)),
+                   lambda place: extend(fields, rating=rating))
+
+
+def place_detail(place):
+    """A place with its reviews"""
+    return extend(place_summary(place),
+                  reviews=[review_in_place(review) for review in place.reviews])
+
+
+def review_in_place(review):
+    """A review listed in its place's details"""
+    return _cached(review, 'in_place', review._updated_us, lambda review: {
+        'id': review.id,
+        'text': review.text,
+        'rating': review.rating,
+        'user_id': review.user.id
+    })
+
+
+def review_summary(review):
+    """A review with its author and place"""
+    stamp = (review._updated_us, review.user._updated_us, review.place._updated_us)
+    return _cached(review, 'summary', stamp, lambda review: {
+        'id': review.id,
+        'text': review.text,
+        'rating': review.rating,
+        'user': user_brief(review.user),
+        'place': place_brief(review.place)
+    })
+
+
+def review_for_place(review):
+    """A review listed under its place (no place block)"""
+    stamp = (review._updated_us, review.user._updated_us)
+    return _cached(review, 'for_place', stamp, lambda review: {
+        'id': review.id,
+        'text': review.text,
+        'rating': review.rating,
+        'user': user_brief(review.user)
+    })
+
+
+def review_for_user(review):
+    """A review listed under its author (no user block)"""
+    stamp = (review._updated_us, review.place._updated_us)
+    return _cached(review, 'for_user', stamp, lambda review: {
+        'id': review.id,
+        'text': review.text,
+        'rating': review.rating,
+        'place': place_brief(review.place)
+    })
@@ -1,30 +1,32 @@
-from flask_restx import Namespace, Resource, fields
-from app.services import facade
+from flask_restx import Namespace, Resource
+from app.services import facade, PasswordPoolBusy
+from app.api.v1.conditional import collection, conditional, entity
+from app.api.v1.pagination import page_params, paginate
+from app.api.v1.serializers import (place_summary, review_for_user, user_created,
+                                    user_etag, user_summary)
+from app.api.v1.validation import expect, model_fields
+from app.models import User
 
 api = Namespace('users', description='User operations')
 
+# seconds a client rejected for password-pool backpressure should wait
+RETRY_AFTER = '1'
+
 # Define the user model for input validation and documentation
-user_model = api.model('User', {
-    'first_name': fields.String(required=True, description='First name of the user'),
-    'last_name': fields.String(required=True, description='Last name of the user'),
-    'email': fields.String(required=True, description='Email of the user'),
-    'password': fields.String(required=True, description='Password of the user')
-})
-
-# Define the user model for updates (password optional)
-user_update_model = api.model('UserUpdate', {
-    'first_name': fields.String(required=False, description='First name of the user'),
-    'last_name': fields.String(required=False, description='Last name of the user'),
-    'email': fields.String(required=False, description='Email of the user'),
-    'password': fields.String(required=False, description='Password of the user')
-})
+user_model = api.model('User', model_fields(
+    User, 'first_name', 'last_name', 'email', 'password'))
+
+# Define the user model for updates (every field optional)
+user_update_model = api.model('UserUpdate', model_fields(
+    User, 'first_name', 'last_name', 'email', 'password', required=False))
 
 @api.route('/')
 class UserList(Resource):
-    @api.expect(user_model, validate=True)
+    @expect(api, user_model)
     @api.response(201, 'User successfully created')
     @api.response(400, 'Email already registered')
     @api.response(400, 'Invalid input data')
+    @api.response(503, 'Too many signups in progress, retry later')
     def post(self):
         """Register a new user"""
         user_data = api.payload
@@ -39,45 +41,36 @@ class UserList(Resource):
             new_user = facade.create_user(user_data)
             
             # Return user data WITHOUT password
-            return {
-                'id': new_user.id,
-                'first_name': new_user.first_name,
-                'last_name': new_user.last_name,
-                'email': new_user.email,
-                'is_admin': new_user.is_admin,
-                'created_at': new_user.created_at.isoformat()
-            }, 201
+            return user_created(new_user), 201
             
         except ValueError as e:
             return {'error': str(e)}, 400
+        except PasswordPoolBusy as e:
+            return {'error': str(e)}, 503, {'Retry-After': RETRY_AFTER}
         except Exception as e:
             return {'error': 'Internal server error'}, 500
 
+    @api.response(304, 'Not modified since the ETag in If-None-Match')
+    @api.doc(params=page_params)
     @api.response(200, 'List of users retrieved successfully')
+    @api.response(400, 'Invalid pagination parameters')
+    @conditional(collection('User'))
     def get(self):
         """Retrieve a list of all users"""
-        users = facade.get_all_users()
-        
-        users_list = []
-        for user in users:
-            # Explicitly exclude password from response
-            user_dict = {
-                'id': user.id,
-                'first_name': user.first_name,
-                'last_name': user.last_name,
-                'email': user.email,
-                'is_admin': user.is_admin,
-                'created_at': user.created_at.isoformat(),
-                'updated_at': user.updated_at.isoformat()
-            }
-            users_list.append(user_dict)
+        try:
+            users, headers = paginate(facade.get_all_users, facade.get_users_page)
+        except ValueError as e:
+            return {'error': str(e)}, 400
         
-        return users_list, 200
+        # user_summary() leaves the password out
+        return [user_summary(user) for user in users], 200, headers
 
 @api.route('/<user_id>')
 class UserResource(Resource):
+    @api.response(304, 'Not modified since the ETag in If-None-Match')
     @api.response(200, 'User details retrieved successfully')
     @api.response(404, 'User not found')
+    @conditional(entity(facade.get_user, user_etag))
     def get(self, user_id):
         """Get user details by ID"""
         user = facade.get_user(user_id)
@@ -85,20 +78,15 @@ class UserResource(Resource):
             return {'error': 'User not found'}, 404
         
         # Return user data WITHOUT password
-        return {
-            'id': user.id,
-            'first_name': user.first_name,
-            'last_name': user.last_name,
-            'email': user.email,
-            'is_admin': user.is_admin,
-            'created_at': user.created_at.isoformat(),
-            'updated_at': user.updated_at.isoformat()
-        }, 200
-
-    @api.expect(user_update_model, validate=True)
+        return user_summary(user), 200
+
+    @api.response(412, 'Changed since the ETag in If-Match')
+    @expect(api, user_update_model)
     @api.response(200, 'User updated successfully')
     @api.response(404, 'User not found')
     @api.response(400, 'Invalid input data')
+    @api.response(503, 'Too many password changes in progress, retry later')
+    @conditional(entity(facade.get_user, user_etag), lock='User')
     def put(self, user_id):
         """Update user information"""
         user_data = api.payload
@@ -120,17 +108,45 @@ class UserResource(Resource):
             updated_user = facade.update_user(user_id, user_data)
             
             # Return updated user data WITHOUT password
-            return {
-                'id': updated_user.id,
-                'first_name': updated_user.first_name,
-                'last_name': updated_user.last_name,
-                'email': updated_user.email,
-                'is_admin': updated_user.is_admin,
-                'created_at': updated_user.created_at.isoformat(),
-                'updated_at': updated_user.updated_at.isoformat()
-            }, 200
+            return user_summary(updated_user), 200
             
         except ValueError as e:
             return {'error': str(e)}, 400
+        except PasswordPoolBusy as e:
+            return {'error': str(e)}, 503, {'Retry-After': RETRY_AFTER}
         except Exception as e:
             return {'error': 'Internal server error'}, 500
+
+    @api.response(200, 'User deleted successfully')
+    @api.response(404, 'User not found')
+    def delete(self, user_id):
+        """Delete a user with their places and reviews"""
+        if not facade.delete_user(user_id):
+            return {'error': 'User not found'}, 404
+        return {'message': 'User deleted successfully'}, 200
+
+@api.route('/<user_id>/places')
+class UserPlaceList(Resource):
+    @api.response(304, 'Not modified since the ETag in If-None-Match')
+    @api.response(200, 'Places owned by the user retrieved successfully')
+    @api.response(404, 'User not found')
+    @conditional(collection('Place', 'User', 'Amenity', 'Review'))
+    def get(self, user_id):
+        """Get all places owned by a user"""
+        if not facade.get_user(user_id):
+            return {'error': 'User not found'}, 404
+        return [place_summary(place) for place in facade.get_places_by_owner(user_id)], 200
+
+@api.route('/<user_id>/reviews')
+class UserReviewList(Resource):
+    @api.response(304, 'Not modified since the ETag in If-None-Match')
+    @api.response(200, 'Reviews written by the user retrieved successfully')
+    @api.response(404, 'User not found')
+    @conditional(collection('Review', 'Place'))
+    def get(self, user_id):
+        """Get all reviews written by a user"""
+        if not facade.get_user(user_id):
+            return {'error': 'User not found'}, 404
+
+        return [review_for_user(review) for review in facade.get_reviews_by_user(user_id)], 200
+
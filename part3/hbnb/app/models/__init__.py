@@ -1,68 +1,126 @@
 # app/models/__init__.py
-import re
-import uuid
-from datetime import datetime
-
-EMAIL_RE = re.compile(r"^[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}$")
-
-def _require_str(name, value, max_len=None, required=False):
-    if required and (value is None or value == ""):
-        raise ValueError(f"{name} is required")
-    if value is not None and not isinstance(value, str):
-        raise TypeError(f"{name} must be a string")
-    if max_len is not None and value is not None and len(value) > max_len:
-        raise ValueError(f"{name} must be at most {max_len} characters")
-
-def _require_bool(name, value):
-    if not isinstance(value, bool):
-        raise TypeError(f"{name} must be a boolean")
-
-def _require_float(name, value):
-    if not isinstance(value, (float, int)):  # allow ints where float is expected
-        raise TypeError(f"{name} must be a number (float)")
-    return float(value)
-
-def _require_int(name, value):
-    if not isinstance(value, int):
-        raise TypeError(f"{name} must be an integer")
-    return value
-
-def _require_email(name, value):
-    _require_str(name, value, required=True, max_len=255)
-    if not EMAIL_RE.match(value):
-        raise ValueError(f"{name} must be a valid email")
+import sys
+from datetime import datetime, timedelta
+from .ids import new_id
+from .schema import EMAIL_RE, Field, compile_fields  # noqa: F401
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+def _to_micros(value):
+    """Naive datetime -> int microseconds since 1970-01-01 (no timezone math)"""
+    return (value - _EPOCH) // _MICROSECOND
+
+class _interned:
+    """
+    str attribute stored interned in the slot named '_' + its name, so
+    the many equal values (first names, amenity names) share one string.
+    """
+    def __set_name__(self, owner, name):
+        self.slot = owner.__dict__['_' + name]
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        return self.slot.__get__(obj, owner)
+
+    def __set__(self, obj, value):
+        self.slot.__set__(obj, sys.intern(value) if type(value) is str else value)
+
+class _by_id:
+    """
+    list attribute of entities stored in the slot named '_' + its name as
+    an insertion-ordered {id: entity} dict, so one entity is found or
+    removed in O(1) and the others keep their order. Reads return a list.
+    """
+    def __set_name__(self, owner, name):
+        self.slot = owner.__dict__['_' + name]
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        return list(self.slot.__get__(obj, owner).values())
+
+    def __set__(self, obj, value):
+        self.slot.__set__(obj, {item.id: item for item in value})
 
 class BaseModel:
     """
-    Common base with id (UUID string), created_at, updated_at.
+    Common base with id (time-sortable UUIDv7 string), created_at, updated_at.
     Provides save() and update() with per-field validation hook.
+
+    Models use __slots__ rather than a per-instance __dict__, and keep
+    the timestamps as int microseconds behind datetime properties.
+    STATE_FIELDS lists each model's persistent attributes: its public
+    slots and _interned and _by_id attributes; other underscore slots are caches
+    (_serialized holds the API representations, see api.v1.serializers).
+
+    FIELDS declares the validated attributes ({name: Field}); each
+    subclass's declaration is compiled once into _validators, the
+    per-field checks shared by the constructor, update() and the API.
     """
+    __slots__ = ('id', '_created_us', '_updated_us', '_serialized')
+
+    STATE_FIELDS = ('id', 'created_at', 'updated_at')
+    FIELDS = {}
+
+    @property
+    def created_at(self):
+        return _EPOCH + timedelta(microseconds=self._created_us)
+
+    @created_at.setter
+    def created_at(self, value):
+        self._created_us = (value - _EPOCH) // _MICROSECOND
+
+    @property
+    def updated_at(self):
+        return _EPOCH + timedelta(microseconds=self._updated_us)
+
+    @updated_at.setter
+    def updated_at(self, value):
+        self._updated_us = (value - _EPOCH) // _MICROSECOND
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        fields = list(cls.STATE_FIELDS)
+        for slot in cls.__dict__.get('__slots__', ()):
+            if not slot.startswith('_'):
+                fields.append(slot)
+            elif isinstance(cls.__dict__.get(slot[1:]), (_interned, _by_id)):
+                fields.append(slot[1:])
+        cls.STATE_FIELDS = tuple(fields)
+        cls._validators = compile_fields(cls.FIELDS)
+
     def __init__(self):
-        self.id = str(uuid.uuid4())
-        self.created_at = datetime.now()
-        self.updated_at = datetime.now()
+        self.id = new_id()
+        self._created_us = self._updated_us = _to_micros(datetime.now())
 
     def save(self):
-        """Update the updated_at timestamp whenever the object is modified."""
-        self.updated_at = datetime.now()
-
-    def _validate_field(self, key, value):
-        """Override in subclasses to validate per-field updates."""
-        return
+        """
+        Update the updated_at timestamp whenever the object is modified.
+        It always moves forward (by at least a microsecond), so cached
+        representations can be checked against it.
+        """
+        now = (datetime.now() - _EPOCH) // _MICROSECOND
+        self._updated_us = now if now > self._updated_us else self._updated_us + 1
 
     def update(self, data: dict):
         """
-        Update attributes from a dict with validation via _validate_field.
-        Only updates existing attributes.
+        Update attributes from a dict. Only the declared FIELDS can be
+        set, each checked by its validator before any is applied; other
+        keys, including the server-managed id, timestamps and relation
+        lists, are ignored.
         """
         if not isinstance(data, dict):
             raise TypeError("update() expects a dict")
-        # validate first
-        for k, v in data.items():
-            if hasattr(self, k):
-                self._validate_field(k, v)
-        # apply
-        for k, v in data.items():
-            if hasattr(self, k):
-                setattr(self, k, v)
+        validators = self._validators
+        values = [(k, validators[k](v)) for k, v in data.items() if k in validators]
+        for k, v in values:
+            setattr(self, k, v)
         self.save()
+
+# re-export entity classes (kept at the bottom to avoid circular imports)
+from .user import User  # noqa: E402
+from .amenity import Amenity  # noqa: E402
+from .place import Place  # noqa: E402
+from .review import Review  # noqa: E402
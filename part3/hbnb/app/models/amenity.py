@@ -1,16 +1,19 @@
 # app/models/amenity.py
-from . import BaseModel, _require_str
+from . import BaseModel, Field, _interned
 
 class Amenity(BaseModel):
     """
     Amenity:
       - name (required, <= 50)
     """
+    __slots__ = ('_name',)
+
+    name = _interned()
+
+    FIELDS = {
+        'name': Field(str, required=True, max_len=50, description='Name of the amenity'),
+    }
+
     def __init__(self, name: str):
         super().__init__()
-        _require_str("name", name, max_len=50, required=True)
-        self.name = name
-
-    def _validate_field(self, key, value):
-        if key == "name":
-            _require_str("name", value, max_len=50, required=True)
+        self.name = self._validators['name'](name)
@@ -1,5 +1,5 @@
 # app/models/place.py
-from . import BaseModel, _require_str, _require_float
+from . import BaseModel, Field, _by_id
 from .user import User
 from .amenity import Amenity
 
@@ -14,58 +14,48 @@ class Place(BaseModel):
       - owner       (User)
       - reviews     (list of Review, managed via add_review)
       - amenities   (list of Amenity)
+      - rating_count / rating_sum / rating_histogram (aggregates of the
+        review ratings, kept in step by the review methods)
     """
+    __slots__ = ('title', 'description', 'price', 'latitude', 'longitude', 'owner',
+                 '_reviews', 'amenities', 'rating_count', 'rating_sum', 'rating_histogram',
+                 '_amenity_id_set')
+
+    reviews = _by_id()
+
+    FIELDS = {
+        'title': Field(str, required=True, max_len=100, description='Title of the place'),
+        'description': Field(str, description='Description of the place'),
+        'price': Field(float, required=True, positive=True, description='Price per night'),
+        'latitude': Field(float, required=True, minimum=-90, maximum=90,
+                          description='Latitude coordinate'),
+        'longitude': Field(float, required=True, minimum=-180, maximum=180,
+                           description='Longitude coordinate'),
+        'owner': Field(User),
+        'rating_count': Field(int, computed_from='reviews'),
+        'rating_sum': Field(int, computed_from='reviews'),
+        'rating_histogram': Field(list, computed_from='reviews'),
+    }
+    # reviews/amenities are managed via methods, not direct update
+
     def __init__(self, title: str, description: str | None, price, latitude, longitude, owner: User):
         super().__init__()
-        # validate base fields
-        _require_str("title", title, max_len=100, required=True)
-        if description is not None:
-            _require_str("description", description, max_len=None, required=False)
-        price_f = _require_float("price", price)
-        if price_f <= 0:
-            raise ValueError("price must be positive")
-        lat_f = _require_float("latitude", latitude)
-        if not (-90.0 <= lat_f <= 90.0):
-            raise ValueError("latitude must be within -90.0 to 90.0")
-        lon_f = _require_float("longitude", longitude)
-        if not (-180.0 <= lon_f <= 180.0):
-            raise ValueError("longitude must be within -180.0 to 180.0")
-        if not isinstance(owner, User):
-            raise TypeError("owner must be a User")
-
-        self.title = title
-        self.description = description
-        self.price = float(price_f)
-        self.latitude = float(lat_f)
-        self.longitude = float(lon_f)
-        self.owner = owner
+        check = self._validators
+        self.title = check['title'](title)
+        self.description = check['description'](description)
+        self.price = check['price'](price)
+        self.latitude = check['latitude'](latitude)
+        self.longitude = check['longitude'](longitude)
+        self.owner = check['owner'](owner)
 
         # relationships
-        self.reviews = []     # list of Review (added via add_review)
+        self._reviews = {}    # Review by id, oldest first (added via add_review)
         self.amenities = []   # list of Amenity
 
-    def _validate_field(self, key, value):
-        if key == "title":
-            _require_str("title", value, max_len=100, required=True)
-        elif key == "description":
-            if value is not None:
-                _require_str("description", value)
-        elif key == "price":
-            v = _require_float("price", value)
-            if v <= 0:
-                raise ValueError("price must be positive")
-        elif key == "latitude":
-            v = _require_float("latitude", value)
-            if not (-90.0 <= float(v) <= 90.0):
-                raise ValueError("latitude must be within -90.0 to 90.0")
-        elif key == "longitude":
-            v = _require_float("longitude", value)
-            if not (-180.0 <= float(v) <= 180.0):
-                raise ValueError("longitude must be within -180.0 to 180.0")
-        elif key == "owner":
-            if not isinstance(value, User):
-                raise TypeError("owner must be a User")
-        # reviews/amenities are managed via methods, not direct update
+        # rating aggregates; rating_histogram[n - 1] counts n-star reviews
+        self.rating_count = 0
+        self.rating_sum = 0
+        self.rating_histogram = [0, 0, 0, 0, 0]
 
     # relationships management
     def add_review(self, review):
@@ -75,17 +65,72 @@ class Place(BaseModel):
             raise TypeError("review must be a Review")
         if review.place is not self:
             raise ValueError("review.place must reference this Place")
-        self.reviews.append(review)
+        self._reviews[review.id] = review
+        self._count_rating(review.rating, 1)
+        self.save()
+
+    def remove_review(self, review):
+        """
+        Remove review in O(1), keeping the others in order. Returns False
+        if the review was not on this place.
+        """
+        if self._reviews.pop(review.id, None) is None:
+            return False
+        self._count_rating(review.rating, -1)
         self.save()
+        return True
+
+    def change_rating(self, old_rating, new_rating):
+        """Move one of the reviews from old_rating to new_rating stars"""
+        self._count_rating(old_rating, -1)
+        self._count_rating(new_rating, 1)
+        self.save()
+
+    def _count_rating(self, rating, delta):
+        self.rating_count += delta
+        self.rating_sum += delta * rating
+        self.rating_histogram[rating - 1] += delta
+
+    @property
+    def average_rating(self):
+        """Mean rating, or None without reviews"""
+        return self.rating_sum / self.rating_count if self.rating_count else None
+
+    def bayesian_rating(self, prior_mean, prior_weight):
+        """
+        Mean rating shrunk towards prior_mean as if prior_weight extra
+        reviews had rated prior_mean, so few reviews cannot rank a place
+        above well-reviewed ones.
+        """
+        return ((prior_weight * prior_mean + self.rating_sum)
+                / (prior_weight + self.rating_count))
 
     def add_amenity(self, amenity: Amenity):
         if not isinstance(amenity, Amenity):
             raise TypeError("amenity must be an Amenity")
-        if amenity not in self.amenities:
+        if not self._has_amenity(amenity):
             self.amenities.append(amenity)
+            amenity_ids = getattr(self, '_amenity_id_set', None)
+            if amenity_ids is not None:
+                amenity_ids.add(amenity.id)
             self.save()
 
     def remove_amenity(self, amenity: Amenity):
-        if amenity in self.amenities:
+        if self._has_amenity(amenity):
             self.amenities.remove(amenity)
+            amenity_ids = getattr(self, '_amenity_id_set', None)
+            if amenity_ids is not None:
+                amenity_ids.discard(amenity.id)
             self.save()
+
+    def _has_amenity(self, amenity):
+        """
+        Membership by id: a scan of short amenity lists, a cached set of
+        ids (not persisted) once the list is long
+        """
+        amenity_ids = getattr(self, '_amenity_id_set', None)
+        if amenity_ids is None:
+            if len(self.amenities) < 8:
+                return any(other.id == amenity.id for other in self.amenities)
+            amenity_ids = self._amenity_id_set = {other.id for other in self.amenities}
+        return amenity.id in amenity_ids
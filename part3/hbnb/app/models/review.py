@@ -1,5 +1,5 @@
 # app/models/review.py
-from . import BaseModel, _require_str, _require_int
+from . import BaseModel, Field
 from .user import User
 from .place import Place
 
@@ -11,32 +11,20 @@ class Review(BaseModel):
       - place  (Place)
       - user   (User)
     """
-    def __init__(self, text: str, rating: int, place: Place, user: User):
-        super().__init__()
-        _require_str("text", text, required=True)
-        rating_i = _require_int("rating", rating)
-        if not (1 <= rating_i <= 5):
-            raise ValueError("rating must be between 1 and 5")
-        if not isinstance(place, Place):
-            raise TypeError("place must be a Place")
-        if not isinstance(user, User):
-            raise TypeError("user must be a User")
+    __slots__ = ('text', 'rating', 'place', 'user')
 
-        self.text = text
-        self.rating = rating_i
-        self.place = place
-        self.user = user
+    FIELDS = {
+        'text': Field(str, required=True, description='Review text'),
+        'rating': Field(int, required=True, minimum=1, maximum=5,
+                         description='Rating from 1 to 5'),
+        'place': Field(Place),
+        'user': Field(User),
+    }
 
-    def _validate_field(self, key, value):
-        if key == "text":
-            _require_str("text", value, required=True)
-        elif key == "rating":
-            v = _require_int("rating", value)
-            if not (1 <= v <= 5):
-                raise ValueError("rating must be between 1 and 5")
-        elif key == "place":
-            if not isinstance(value, Place):
-                raise TypeError("place must be a Place")
-        elif key == "user":
-            if not isinstance(value, User):
-                raise TypeError("user must be a User")
+    def __init__(self, text: str, rating: int, place: Place, user: User):
+        super().__init__()
+        check = self._validators
+        self.text = check['text'](text)
+        self.rating = check['rating'](rating)
+        self.place = check['place'](place)
+        self.user = check['user'](user)
@@ -0,0 +1,154 @@
+# app/models/schema.py
+import re
+
+EMAIL_RE = re.compile(r"^[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}$")
+
+
+class Field:
+    """
+    Declarative spec of one model field.
+
+    kind is str, float, int, bool or a model class (a reference).
+    Strings may be required (no None or "") and bounded by max_len;
+    numbers take an inclusive minimum/maximum, or positive=True. Fields
+    with computed_from cannot be written at all. description documents
+    the field in the API.
+    """
+    __slots__ = ('kind', 'required', 'max_len', 'email', 'minimum', 'maximum',
+                 'positive', 'computed_from', 'description')
+
+    def __init__(self, kind, required=False, max_len=None, email=False, minimum=None,
+                 maximum=None, positive=False, computed_from=None, description=None):
+        self.kind = kind
+        self.required = required
+        self.max_len = max_len
+        self.email = email
+        self.minimum = minimum
+        self.maximum = maximum
+        self.positive = positive
+        self.computed_from = computed_from
+        self.description = description
+
+
+def compile_fields(fields):
+    """{name: Field} -> {name: validator}; see compile_field()"""
+    return {name: compile_field(name, field) for name, field in fields.items()}
+
+
+def compile_field(name, field):
+    """
+    Build the validator of one field: a function taking a raw value and
+    returning the value to store (numbers cast to their kind), raising
+    TypeError for a wrong type and ValueError for a bad value. Only the
+    checks the field declares end up in the function.
+    """
+    if field.computed_from is not None:
+        return _computed(name, field)
+    if field.kind is str:
+        return _email(name, field) if field.email else _string(name, field)
+    if field.kind is float:
+        return _float(name, field)
+    if field.kind is bool:
+        return _boolean(name)
+    if field.kind is int:
+        return _integer(name, field)
+    return _reference(name, field.kind)
+
+
+def _computed(name, field):
+    message = f"{name} is computed from the {field.computed_from}"
+
+    def validate(value):
+        raise ValueError(message)
+    return validate
+
+
+def _string(name, field):
+    required, max_len = field.required, field.max_len
+    missing = f"{name} is required"
+    wrong_type = f"{name} must be a string"
+    too_long = f"{name} must be at most {max_len} characters"
+
+    def validate(value):
+        if type(value) is not str:
+            if value is None:
+                if required:
+                    raise ValueError(missing)
+                return value
+            if not isinstance(value, str):
+                raise TypeError(wrong_type)
+        if required and not value:
+            raise ValueError(missing)
+        if max_len is not None and len(value) > max_len:
+            raise ValueError(too_long)
+        return value
+    return validate
+
+
+def _email(name, field):
+    string = _string(name, Field(str, required=True, max_len=field.max_len))
+    match = EMAIL_RE.match
+    invalid = f"{name} must be a valid email"
+
+    def validate(value):
+        value = string(value)
+        if not match(value):
+            raise ValueError(invalid)
+        return value
+    return validate
+
+
+def _float(name, field):
+    low, high, positive = field.minimum, field.maximum, field.positive
+    wrong_type = f"{name} must be a number (float)"
+    if positive:
+        out_of_range = f"{name} must be positive"
+    else:
+        out_of_range = f"{name} must be within {float(low)} to {float(high)}"
+    bounded = low is not None or high is not None
+
+    def validate(value):
+        if type(value) is not float:
+            if not isinstance(value, (float, int)):  # allow ints where float is expected
+                raise TypeError(wrong_type)
+            value = float(value)
+        if positive and value <= 0:
+            raise ValueError(out_of_range)
+        if bounded and not ((low is None or low <= value) and (high is None or value <= high)):
+            raise ValueError(out_of_range)
+        return value
+    return validate
+
+
+def _integer(name, field):
+    low, high = field.minimum, field.maximum
+    wrong_type = f"{name} must be an integer"
+    out_of_range = f"{name} must be between {low} and {high}"
+
+    def validate(value):
+        if not isinstance(value, int):
+            raise TypeError(wrong_type)
+        if not ((low is None or low <= value) and (high is None or value <= high)):
+            raise ValueError(out_of_range)
+        return value
+    return validate
+
+
+def _boolean(name):
+    wrong_type = f"{name} must be a boolean"
+
+    def validate(value):
+        if not isinstance(value, bool):
+            raise TypeError(wrong_type)
+        return value
+    return validate
+
+
+def _reference(name, model):
+    wrong_type = f"{name} must be a {model.__name__}"
+
+    def validate(value):
+        if not isinstance(value, model):
+            raise TypeError(wrong_type)
+        return value
+    return validate
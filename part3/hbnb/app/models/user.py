@@ -1,5 +1,5 @@
 # app/models/user.py
-from . import BaseModel, _require_str, _require_bool, _require_email
+from . import BaseModel, Field, _interned
 
 class User(BaseModel):
     """
@@ -10,6 +10,20 @@ class User(BaseModel):
       - password   (required, hashed)
       - is_admin   (bool, default False)
     """
+    __slots__ = ('_first_name', '_last_name', 'email', 'is_admin', 'password')
+
+    first_name = _interned()
+    last_name = _interned()
+
+    FIELDS = {
+        'first_name': Field(str, required=True, max_len=50, description='First name of the user'),
+        'last_name': Field(str, required=True, max_len=50, description='Last name of the user'),
+        'email': Field(str, required=True, email=True, max_len=255,
+                       description='Email of the user'),
+        'password': Field(str, required=True, description='Password of the user'),
+        'is_admin': Field(bool),
+    }
+
     # simple in-memory uniqueness guard for emails (per-process)
     _emails_registry = set()
 
@@ -17,21 +31,17 @@ class User(BaseModel):
                  password: str = None, is_admin: bool = False):
         super().__init__()
         
-        # validate basic fields
-        _require_str("first_name", first_name, max_len=50, required=True)
-        _require_str("last_name", last_name, max_len=50, required=True)
-        _require_email("email", email)
-        _require_bool("is_admin", is_admin)
+        # validate and assign basic fields
+        check = self._validators
+        self.first_name = check['first_name'](first_name)
+        self.last_name = check['last_name'](last_name)
+        email = check['email'](email)
+        self.is_admin = check['is_admin'](is_admin)
         
         # validate email uniqueness
         if email in User._emails_registry:
             raise ValueError("email must be unique")
-            
-        # assign basic attributes
-        self.first_name = first_name
-        self.last_name = last_name
         self.email = email
-        self.is_admin = is_admin
         
         # handle password
         if password:
@@ -44,58 +54,50 @@ class User(BaseModel):
 
     def hash_password(self, password):
         """Hashes the password before storing it."""
+        self.password = self._hash(password)
+
+    def _hash(self, password):
         # Import here to avoid circular imports
-        from app import bcrypt
+        from app.services import passwords
         
         # Validate password (add your own password requirements here)
-        _require_str("password", password, required=True)
+        self._validators['password'](password)
         
-        # Hash and store the password
-        self.password = bcrypt.generate_password_hash(password).decode('utf-8')
+        # Hashed in the password worker pool; raises PasswordPoolBusy when full
+        return passwords.hash(password)
 
     def verify_password(self, password):
         """Verifies if the provided password matches the hashed password."""
         # Import here to avoid circular imports
-        from app import bcrypt
+        from app.services import passwords
         
         if not self.password:
             return False
         
-        return bcrypt.check_password_hash(self.password, password)
-
-    def _validate_field(self, key, value):
-        """Validate individual field updates"""
-        if key == "first_name":
-            _require_str("first_name", value, max_len=50, required=True)
-        elif key == "last_name":
-            _require_str("last_name", value, max_len=50, required=True)
-        elif key == "email":
-            _require_email("email", value)
-            # if changing email, enforce uniqueness
-            if value != self.email and value in User._emails_registry:
-                raise ValueError("email must be unique")
-        elif key == "is_admin":
-            _require_bool("is_admin", value)
-        elif key == "password":
-            # If updating password, hash it
-            _require_str("password", value, required=True)
-            # Note: the actual hashing will be done in update() method
+        return passwords.verify(password, self.password)
 
     def update(self, data: dict):
         """Update user attributes with special handling for email and password"""
+        # hash a new password first, so a rejected hash changes nothing
+        hashed = None
+        if "password" in data:
+            password = data.pop("password")  # Remove from data to handle separately
+            hashed = self._hash(password)
+
         # handle email uniqueness swap safely
         new_email = data.get("email", self.email)
         if new_email != self.email:
             # validate first to avoid losing current reservation on error
-            self._validate_field("email", new_email)
+            self._validators['email'](new_email)
+            if new_email in User._emails_registry:
+                raise ValueError("email must be unique")
             # commit email change: free old, reserve new
             User._emails_registry.discard(self.email)
             User._emails_registry.add(new_email)
+            self.email = new_email
         
-        # handle password hashing if password is being updated
-        if "password" in data:
-            password = data.pop("password")  # Remove from data to handle separately
-            self.hash_password(password)
+        if hashed is not None:
+            self.password = hashed
         
         # call parent update for other fields
         super().update(data)
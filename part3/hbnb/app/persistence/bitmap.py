@@ -0,0 +1,165 @@
+import threading
+
+# bits per block: setting or clearing one bit rebuilds one block-sized int
+BLOCK_BITS = 4096
+
+
+def _set(blocks, ordinal):
+    block, bit = divmod(ordinal, BLOCK_BITS)
+    blocks[block] = blocks.get(block, 0) | 1 << bit
+
+
+def _clear(blocks, ordinal):
+    block, bit = divmod(ordinal, BLOCK_BITS)
+    bits = blocks.get(block)
+    if bits:
+        bits &= ~(1 << bit)
+        if bits:
+            blocks[block] = bits
+        else:
+            del blocks[block]
+
+
+class BitmapIndex:
+    """
+    Objects grouped by key (e.g. places by amenity id) as bitmaps.
+
+    Every object gets a dense ordinal the first time it is indexed, and
+    each key maps to a bitmap whose bit n is set when the object with
+    ordinal n has that key. A bitmap is split into blocks of BLOCK_BITS
+    bits, {block number: Python int}, with empty blocks left out: one
+    bit changes in O(1), and AND/OR filters over several keys are a few
+    big-int operations per block running in C, whatever the number of
+    matches.
+
+    The ordinals of removed objects are handed to the next new objects,
+    so the bitmaps stay as long as the live objects need. A bitmap taken
+    by match() may therefore name, at a reused ordinal, an object added
+    after it was taken: callers holding one across changes re-check the
+    objects they get from it.
+    """
+    def __init__(self):
+        self._ordinals = {}
+        self._ids = []
+        self._free = []  # ordinals of removed objects
+        self._bitmaps = {}
+        self._live = {}  # every indexed object
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._ordinals)
+
+    def _ordinal(self, obj_id):
+        ordinal = self._ordinals.get(obj_id)
+        if ordinal is None:
+            if self._free:
+                ordinal = self._free.pop()
+                self._ids[ordinal] = obj_id
+            else:
+                ordinal = len(self._ids)
+                self._ids.append(obj_id)
+            self._ordinals[obj_id] = ordinal
+            _set(self._live, ordinal)
+        return ordinal
+
+    def add(self, obj_id, key):
+        with self._lock:
+            _set(self._bitmaps.setdefault(key, {}), self._ordinal(obj_id))
+
+    def add_many(self, pairs):
+        """Index (obj_id, key) pairs under one lock round."""
+        with self._lock:
+            for obj_id, key in pairs:
+                _set(self._bitmaps.setdefault(key, {}), self._ordinal(obj_id))
+
+    def discard(self, obj_id, key):
+        with self._lock:
+            ordinal = self._ordinals.get(obj_id)
+            if ordinal is not None and key in self._bitmaps:
+                _clear(self._bitmaps[key], ordinal)
+
+    def drop(self, key):
+        """Forget key and its bitmap."""
+        with self._lock:
+            self._bitmaps.pop(key, None)
+
+    def remove(self, obj_id, keys=None):
+        """
+        Drop obj_id from the index. keys are the keys it has, when the
+        caller knows them (e.g. a place's amenity ids): only those bits are
+        cleared. Otherwise every key is visited.
+        """
+        with self._lock:
+            ordinal = self._ordinals.pop(obj_id, None)
+            if ordinal is None:
+                return
+            bitmaps = self._bitmaps
+            for key in bitmaps if keys is None else keys:
+                blocks = bitmaps.get(key)
+                if blocks:
+                    _clear(blocks, ordinal)
+            self._ids[ordinal] = None
+            _clear(self._live, ordinal)
+            self._free.append(ordinal)
+
+    def match(self, all_of=(), any_of=()):
+        """
+        Bitmap of the objects having every key of all_of and, if any_of is
+        not empty, at least one key of any_of.
+        """
+        with self._lock:
+            bitmaps = self._bitmaps
+            result = None
+            for key in all_of:
+                blocks = bitmaps.get(key, {})
+                if result is None:
+                    result = dict(blocks)
+                    continue
+                for block, bits in list(result.items()):
+                    bits &= blocks.get(block, 0)
+                    if bits:
+                        result[block] = bits
+                    else:
+                        del result[block]
+            if any_of:
+                union = {}
+                for key in any_of:
+                    for block, bits in bitmaps.get(key, {}).items():
+                        union[block] = union.get(block, 0) | bits
+                if result is None:
+                    result = union
+                else:
+                    result = {block: bits & union[block] for block, bits in result.items()
+                              if block in union and bits & union[block]}
+            if result is None:
+                # no filter at all: every indexed object
+                result = dict(self._live)
+        return result
+
+    @staticmethod
+    def count(bitmap):
+        """Number of objects in bitmap."""
+        return sum(bits.bit_count() for bits in bitmap.values())
+
+    def contains(self, bitmap, obj_id):
+        """True if obj_id is in bitmap."""
+        ordinal = self._ordinals.get(obj_id)
+        if ordinal is None:
+            return False
+        block, bit = divmod(ordinal, BLOCK_BITS)
+        return bitmap.get(block, 0) >> bit & 1 == 1
+
+    def iter_ids(self, bitmap):
+        """Yield the ids of the objects in bitmap, in ordinal order."""
+        ids = self._ids
+        for block in sorted(bitmap):
+            base = block * BLOCK_BITS
+            # the binary digits are searched for set bits at C speed
+            bits = format(bitmap[block], 'b')
+            top = len(bits) - 1
+            pos = bits.rfind('1')
+            while pos >= 0:
+                obj_id = ids[base + top - pos]
+                if obj_id is not None:
+                    yield obj_id
+                pos = bits.rfind('1', 0, pos)
@@ -0,0 +1,87 @@
+from datetime import datetime
+from app.models import BaseModel, User, Place, Review, Amenity
+
+# model name (as written in references) -> class
+MODELS = {model.__name__: model for model in (User, Place, Review, Amenity)}
+
+_SCALARS = frozenset((str, int, float, bool, type(None), datetime))
+
+_MISSING = object()
+
+
+def dump_state(obj, json_safe=True):
+    """
+    Encode an entity's STATE_FIELDS without duplicating related entities.
+
+    With json_safe (the default) references are stored as
+    {"$ref": [model, id]} and datetimes as {"$dt": isoformat}. Otherwise
+    references become (model, id) tuples and datetimes are kept as is,
+    which is smaller and much faster to pickle and load. Fields never set
+    (e.g. on entities loaded from older states) are left out.
+    """
+    state = {}
+    for key in type(obj).STATE_FIELDS:
+        value = getattr(obj, key, _MISSING)
+        if value is not _MISSING:
+            state[key] = _encode(value, json_safe)
+    return state
+
+
+def load_state(obj, state, resolve):
+    """
+    Apply a dump_state() result (either flavour) to obj in place.
+    resolve((model_name, obj_id)) must return the referenced entity.
+    Keys that are not attributes of obj's model are ignored.
+    """
+    for key, value in state.items():
+        kind = type(value)
+        if kind is tuple:
+            value = resolve(value)
+        elif kind not in _SCALARS:
+            value = _decode(value, resolve)
+        try:
+            setattr(obj, key, value)
+        except AttributeError:
+            pass  # not an attribute of this model (any more)
+    return obj
+
+
+def new_instance(model, obj_id=None):
+    """
+    Create an entity without running its constructor (no validation),
+    with obj_id as its id if given: an entity referenced before its state
+    is loaded (e.g. a review in its place's reviews) already has its id.
+    """
+    obj = model.__new__(model)
+    if obj_id is not None:
+        obj.id = obj_id
+    return obj
+
+
+def _encode(value, json_safe):
+    if isinstance(value, BaseModel):
+        if json_safe:
+            return {'$ref': [type(value).__name__, value.id]}
+        return (type(value).__name__, value.id)
+    if isinstance(value, datetime):
+        return {'$dt': value.isoformat()} if json_safe else value
+    if isinstance(value, (list, tuple)):
+        return [_encode(item, json_safe) for item in value]
+    return value
+
+
+def _decode(value, resolve):
+    if type(value) is tuple:
+        return resolve(value)
+    if isinstance(value, dict):
+        if '$ref' in value:
+            return resolve(tuple(value['$ref']))
+        if '$dt' in value:
+            return datetime.fromisoformat(value['$dt'])
+    if isinstance(value, list):
+        # relationship lists silently drop references that no longer resolve
+        items = [resolve(item) if type(item) is tuple
+                 else item if type(item) in _SCALARS else _decode(item, resolve)
+                 for item in value]
+        return [item for item in items if item is not None]
+    return value
@@ -0,0 +1,192 @@
+import heapq
+import math
+import threading
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+def _haversine(distance_km):
+    """The haversine term a of a great-circle distance (monotonic in it)."""
+    return math.sin(min(distance_km / (2 * EARTH_RADIUS_KM), math.pi / 2)) ** 2
+
+
+def _distance_km(a):
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance between two points, in kilometres."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = (math.sin((phi2 - phi1) / 2) ** 2
+         + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class GeoIndex:
+    """
+    Grid index over (latitude, longitude) points for radius and
+    nearest-neighbour search.
+
+    The globe is cut into cell_size x cell_size degree cells, each holding
+    {obj_id: (lat, lon)} in radians with the cosine of the latitude
+    precomputed, and candidates are compared on the haversine term rather
+    than on kilometres. A radius query only visits the cells overlapping
+    the circle's bounding box; a k-nearest query visits rings of cells
+    around the point and stops as soon as no unvisited cell can be closer
+    than the k-th best match. Longitudes wrap at the antimeridian. When a
+    query would visit more cells than are occupied, it scans the occupied
+    cells instead. cell_size must divide 360, so that the columns meet
+    exactly at the antimeridian.
+    """
+    def __init__(self, cell_size=0.2):
+        cols = round(360 / cell_size) if cell_size > 0 else 0
+        if cols < 1 or not math.isclose(cols * cell_size, 360.0, rel_tol=1e-9):
+            raise ValueError(f"cell_size must divide 360 degrees, got {cell_size}")
+        self.cell_size = cell_size
+        self._rows = math.ceil(180 / cell_size)
+        self._cols = cols
+        self._cells = {}
+        self._points = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._points)
+
+    def _cell(self, lat, lon):
+        row = min(int((lat + 90) / self.cell_size), self._rows - 1)
+        col = int((lon + 180) / self.cell_size) % self._cols
+        return row, col
+
+    def insert(self, obj_id, lat, lon):
+        """Index obj_id at (lat, lon), moving it if it was already indexed."""
+        with self._lock:
+            self._remove(obj_id)
+            self._points[obj_id] = (lat, lon)
+            phi = math.radians(lat)
+            self._cells.setdefault(self._cell(lat, lon), {})[obj_id] = (
+                phi, math.radians(lon), math.cos(phi))
+
+    def remove(self, obj_id):
+        with self._lock:
+            self._remove(obj_id)
+
+    def _remove(self, obj_id):
+        point = self._points.pop(obj_id, None)
+        if point is not None:
+            cell = self._cell(*point)
+            members = self._cells[cell]
+            del members[obj_id]
+            if not members:
+                del self._cells[cell]
+
+    def _cell_points(self, row, col):
+        return self._cells.get((row, col % self._cols))
+
+    def within(self, lat, lon, radius_km, limit=None):
+        """Return [(distance_km, obj_id)] within radius_km, nearest first."""
+        lon = (lon + 180) % 360 - 180
+        lat_span = radius_km / KM_PER_DEGREE
+        cos_lat = math.cos(math.radians(min(90.0, abs(lat) + lat_span)))
+        lon_span = 180.0 if cos_lat < 1e-9 else min(180.0, lat_span / cos_lat)
+        row_lo, _ = self._cell(max(-90.0, lat - lat_span), lon)
+        row_hi, _ = self._cell(min(90.0, lat + lat_span), lon)
+        col_lo = int((lon - lon_span + 180) // self.cell_size)
+        col_hi = int((lon + lon_span + 180) // self.cell_size)
+        if col_hi - col_lo + 1 >= self._cols:
+            col_lo, col_hi = 0, self._cols - 1
+
+        phi1, lam1 = math.radians(lat), math.radians(lon)
+        cos1 = math.cos(phi1)
+        sin, a_max = math.sin, _haversine(radius_km)
+        found = []
+        with self._lock:
+            if (row_hi - row_lo + 1) * (col_hi - col_lo + 1) > len(self._cells):
+                candidates = list(self._cells.values())
+            else:
+                candidates = [self._cell_points(row, col)
+                              for row in range(row_lo, row_hi + 1)
+                              for col in range(col_lo, col_hi + 1)]
+                candidates = [points for points in candidates if points]
+            for points in candidates:
+                for obj_id, (phi2, lam2, cos2) in points.items():
+                    a = sin((phi2 - phi1) * 0.5) ** 2 + cos1 * cos2 * sin((lam2 - lam1) * 0.5) ** 2
+                    if a <= a_max:
+                        found.append((a, obj_id))
+        found = sorted(found) if limit is None else heapq.nsmallest(limit, found)
+        return [(_distance_km(a), obj_id) for a, obj_id in found]
+
+    def nearest(self, lat, lon, k):
+        """Return the k nearest [(distance_km, obj_id)], nearest first."""
+        lon = (lon + 180) % 360 - 180
+        phi1, lam1 = math.radians(lat), math.radians(lon)
+        cos1 = math.cos(phi1)
+        sin = math.sin
+        best = []  # max-heap of (-a, obj_id)
+        with self._lock:
+            k = min(k, len(self._points))
+            if k <= 0:
+                return []
+            row0, col0 = self._cell(lat, lon)
+            ring = 0
+            while True:
+                if len(self._cells) <= 8 * ring:
+                    # the ring is larger than the occupied grid: finish with a scan
+                    rings = list(self._cells.values())
+                    best = []
+                    done = True
+                else:
+                    rings = [self._cell_points(row, col) for row, col in self._ring(row0, col0, ring)]
+                    done = False
+                for points in rings:
+                    if not points:
+                        continue
+                    for obj_id, (phi2, lam2, cos2) in points.items():
+                        a = sin((phi2 - phi1) * 0.5) ** 2 + cos1 * cos2 * sin((lam2 - lam1) * 0.5) ** 2
+                        if len(best) < k:
+                            heapq.heappush(best, (-a, obj_id))
+                        elif a < -best[0][0]:
+                            heapq.heapreplace(best, (-a, obj_id))
+                if done:
+                    break
+                if len(best) == k and -best[0][0] <= _haversine(
+                        self._beyond_ring(lat, lon, row0, col0, ring)):
+                    break
+                ring += 1
+        return sorted((_distance_km(-negative), obj_id) for negative, obj_id in best)
+
+    def _ring(self, row0, col0, ring):
+        """Cells at Chebyshev distance ring from (row0, col0), each once."""
+        if ring == 0:
+            return [(row0, col0)]
+        cols = [(col0 + offset) % self._cols
+                for offset in range(-ring, ring + 1)][:self._cols]
+        cells = set()
+        for row in range(max(0, row0 - ring), min(self._rows, row0 + ring + 1)):
+            if abs(row - row0) == ring:
+                cells.update((row, col) for col in cols)
+            elif 2 * ring - 1 < self._cols:
+                # the side columns were not covered by an earlier ring
+                cells.add((row, (col0 - ring) % self._cols))
+                cells.add((row, (col0 + ring) % self._cols))
+        return cells
+
+    def _beyond_ring(self, lat, lon, row0, col0, ring):
+        """
+        Lower bound on the distance from (lat, lon) to any point in a cell
+        outside ring: the nearest latitude edge, or the nearest longitude
+        edge measured as the distance to that meridian.
+        """
+        size = self.cell_size
+        bound = math.inf
+        if row0 - ring > 0:
+            bound = min(bound, (lat - ((row0 - ring) * size - 90)) * KM_PER_DEGREE)
+        if row0 + ring + 1 < self._rows:
+            bound = min(bound, (((row0 + ring + 1) * size - 90) - lat) * KM_PER_DEGREE)
+        if 2 * ring + 1 < self._cols:
+            west = lon - ((col0 - ring) * size - 180)
+            east = ((col0 + ring + 1) * size - 180) - lon
+            delta = math.radians(min(90.0, west, east))
+            sine = math.cos(math.radians(lat)) * math.sin(delta)
+            bound = min(bound, EARTH_RADIUS_KM * math.asin(min(1.0, sine)))
+        return bound
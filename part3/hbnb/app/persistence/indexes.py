@@ -0,0 +1,226 @@
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+from operator import itemgetter
+
+
+def index_value(value):
+    """Normalize a value for indexing: model references are indexed by id."""
+    return getattr(value, 'id', value)
+
+
+class HashIndex:
+    """
+    Secondary hash index over one attribute of the stored objects.
+
+    A unique index maps value -> obj_id and rejects duplicates; a non-unique
+    index maps value -> {obj_id: None} (an insertion-ordered set, so removal
+    is O(1)). The last indexed value of every object is remembered so the
+    index can be refreshed after the object was mutated in place.
+    """
+    def __init__(self, attr_name, unique=False):
+        self.attr_name = attr_name
+        self.unique = unique
+        self._entries = {} if unique else defaultdict(dict)
+        self._values = {}
+
+    def _value_of(self, obj):
+        return index_value(getattr(obj, self.attr_name, None))
+
+    def check(self, obj_id, value):
+        """Raise ValueError if storing value for obj_id would violate uniqueness."""
+        if not self.unique:
+            return
+        owner = self._entries.get(index_value(value))
+        if owner is not None and owner != obj_id:
+            raise ValueError(f"{self.attr_name} must be unique")
+
+    def insert(self, obj):
+        value = self._value_of(obj)
+        self.check(obj.id, value)
+        if self.unique:
+            self._entries[value] = obj.id
+        else:
+            self._entries[value][obj.id] = None
+        self._values[obj.id] = value
+
+    def remove(self, obj_id):
+        if obj_id not in self._values:
+            return
+        value = self._values.pop(obj_id)
+        if self.unique:
+            if self._entries.get(value) == obj_id:
+                del self._entries[value]
+        else:
+            ids = self._entries.get(value)
+            if ids is not None:
+                ids.pop(obj_id, None)
+                if not ids:
+                    del self._entries[value]
+
+    def refresh(self, obj):
+        """Move obj to its current value if it changed since it was indexed."""
+        value = self._value_of(obj)
+        if obj.id in self._values and self._values[obj.id] == value:
+            return
+        self.check(obj.id, value)
+        self.remove(obj.id)
+        self.insert(obj)
+
+    def lookup(self, value):
+        """Return the first obj_id stored under value, or None."""
+        value = index_value(value)
+        if self.unique:
+            return self._entries.get(value)
+        ids = self._entries.get(value)
+        return next(iter(ids)) if ids else None
+
+    def lookup_all(self, value):
+        """Return the obj_ids stored under value, in insertion order."""
+        value = index_value(value)
+        if self.unique:
+            obj_id = self._entries.get(value)
+            return [] if obj_id is None else [obj_id]
+        return list(self._entries.get(value, ()))
+
+    def insert_many(self, objs):
+        for obj in objs:
+            self.insert(obj)
+
+
+class IdIndex:
+    """
+    The ids of a table in sorted order, for keyset pages in id order in
+    O(log n + k). Ids are time-sortable, so a new row almost always goes
+    at the end (an append); removals shift the list like SortedIndex.
+    """
+    def __init__(self):
+        self._ids = []
+
+    def insert(self, obj_id):
+        ids = self._ids
+        if not ids or obj_id > ids[-1]:
+            ids.append(obj_id)
+        else:
+            insort(ids, obj_id)
+
+    def insert_many(self, obj_ids):
+        batch = sorted(obj_ids)
+        ids = self._ids
+        ids.extend(batch)
+        if batch and len(ids) > len(batch) and batch[0] < ids[-len(batch) - 1]:
+            # timsort merges the two sorted runs in O(n)
+            ids.sort()
+
+    def remove(self, obj_id):
+        ids = self._ids
+        i = bisect_left(ids, obj_id)
+        if i < len(ids) and ids[i] == obj_id:
+            del ids[i]
+
+    def scan(self, after_key=None, descending=False):
+        """Yield the ids after after_key, in ascending or descending order"""
+        ids = self._ids
+        if descending:
+            end = len(ids) if after_key is None else bisect_left(ids, after_key)
+            for i in range(end - 1, -1, -1):
+                yield ids[i]
+        else:
+            start = 0 if after_key is None else bisect_right(ids, after_key)
+            for i in range(start, len(ids)):
+                yield ids[i]
+
+
+class SortedIndex:
+    """
+    Ordered secondary index over one attribute, for range queries and
+    sorted pages in O(log n + k).
+
+    Entries are (value, obj_id) pairs kept in one sorted list; obj_id breaks
+    ties so every entry has a unique, stable position. Inserts and removals
+    shift the list (a memmove, cheap at the sizes an in-memory store holds),
+    and batches are merged with a single sort. Objects whose value is None
+    are not indexed.
+    """
+    unique = False
+
+    def __init__(self, attr_name):
+        self.attr_name = attr_name
+        self._keys = []
+        self._values = {}
+
+    def _value_of(self, obj):
+        return index_value(getattr(obj, self.attr_name, None))
+
+    def check(self, obj_id, value):
+        pass
+
+    def insert(self, obj):
+        value = self._value_of(obj)
+        if value is None:
+            return
+        insort(self._keys, (value, obj.id))
+        self._values[obj.id] = value
+
+    def insert_many(self, objs):
+        objs = list(objs)
+        if len(objs) < 64:
+            for obj in objs:
+                self.insert(obj)
+            return
+        for obj in objs:
+            value = self._value_of(obj)
+            if value is not None:
+                self._keys.append((value, obj.id))
+                self._values[obj.id] = value
+        # timsort merges the sorted prefix with the sorted batch in O(n)
+        self._keys.sort()
+
+    def remove(self, obj_id):
+        if obj_id not in self._values:
+            return
+        key = (self._values.pop(obj_id), obj_id)
+        i = bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            del self._keys[i]
+
+    def refresh(self, obj):
+        """Move obj to its current value if it changed since it was indexed."""
+        value = self._value_of(obj)
+        if obj.id in self._values and self._values[obj.id] == value:
+            return
+        self.remove(obj.id)
+        self.insert(obj)
+
+    def scan(self, low=None, high=None, after_key=None, descending=False):
+        """
+        Yield obj_ids with low <= value <= high (None = unbounded) in
+        (value, obj_id) order, or the reverse, resuming after the key
+        after_key = (value, obj_id).
+        """
+        keys = self._keys
+        if descending:
+            end = len(keys) if high is None else bisect_right(keys, high, key=itemgetter(0))
+            if after_key is not None:
+                end = min(end, bisect_left(keys, tuple(after_key)))
+            for i in range(end - 1, -1, -1):
+                value, obj_id = keys[i]
+                if low is not None and value < low:
+                    return
+                yield obj_id
+        else:
+            start = 0 if low is None else bisect_left(keys, low, key=itemgetter(0))
+            if after_key is not None:
+                start = max(start, bisect_right(keys, tuple(after_key)))
+            for i in range(start, len(keys)):
+                value, obj_id = keys[i]
+                if high is not None and value > high:
+                    return
+                yield obj_id
+
+    def lookup(self, value):
+        value = index_value(value)
+        return None if value is None else next(self.scan(value, value), None)
+
+    def lookup_all(self, value):
+        value = index_value(value)
+        return [] if value is None else list(self.scan(value, value))
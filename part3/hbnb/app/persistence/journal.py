@@ -0,0 +1,341 @@
+import gc
+import glob
+import os
+import pickle
+import struct
+import threading
+import zlib
+from app.persistence.repository import Repository
+from app.persistence.codec import MODELS, dump_state, load_state, new_instance
+from app.persistence.group_commit import GroupCommitWriter
+
+# every record is framed as <body length, crc32(body)> + pickled body
+HEADER = struct.Struct('<II')
+OP_UPSERT = 1
+OP_DELETE = 2
+OP_SNAPSHOT = 3
+OP_UPSERT_BATCH = 4
+OP_DELETE_BATCH = 5
+
+# entities per snapshot record: large enough to amortize framing and let
+# pickle share repeated attribute names, small enough to bound memory
+SNAPSHOT_BATCH = 1000
+
+SNAPSHOT_FILE = 'snapshot.bin'
+SEGMENT_PATTERN = 'journal-*.log'
+
+
+def encode_record(body):
+    data = pickle.dumps(body, protocol=5)
+    return HEADER.pack(len(data), zlib.crc32(data)) + data
+
+
+def read_records(path):
+    """
+    Yield (end_offset, body) for every intact record in path.
+    Stops at the first torn or corrupt record.
+    """
+    with open(path, 'rb') as f:
+        data = memoryview(f.read())
+    offset = 0
+    while offset + HEADER.size <= len(data):
+        length, crc = HEADER.unpack_from(data, offset)
+        start = offset + HEADER.size
+        end = start + length
+        if end > len(data) or zlib.crc32(data[start:end]) != crc:
+            return
+        try:
+            body = pickle.loads(data[start:end])
+        except Exception:
+            return
+        offset = end
+        yield offset, body
+
+
+class Journal:
+    """
+    Write-ahead log plus snapshot for in-memory repositories.
+
+    Mutations are appended to numbered log segments as full entity states
+    (upserts) or deletions, so replaying them is idempotent. States use the
+    codec's compact (non JSON-safe) flavour. snapshot()
+    switches to a fresh segment, dumps every repository into snapshot.bin
+    and then drops the segments it covers; recovery loads the snapshot and
+    replays the remaining segments, ignoring a torn tail.
+
+    With group_commit, appends are handed to a GroupCommitWriter so
+    concurrent writers share one fsync per batch instead of paying one each.
+    """
+    def __init__(self, directory, fsync=True, group_commit=False,
+                 batch_window=0.002, max_batch=256):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.fsync = fsync
+        self._lock = threading.Lock()      # orders records
+        self._io_lock = threading.Lock()   # guards the open segment file
+        self.flushes = 0                   # number of write+fsync rounds
+        self._writer = None
+        if group_commit:
+            self._writer = GroupCommitWriter(self._write, window=batch_window,
+                                             max_batch=max_batch)
+        self._file = None
+        self._seq = 0
+        self._stop = threading.Event()
+        self._compactor = None
+
+    def _segment_path(self, seq):
+        return os.path.join(self.directory, f'journal-{seq:08d}.log')
+
+    def _segments(self):
+        paths = glob.glob(os.path.join(self.directory, SEGMENT_PATTERN))
+        return sorted((int(os.path.basename(p)[8:16]), p) for p in paths)
+
+    def _open_segment(self, seq):
+        with self._io_lock:
+            if self._file is not None:
+                self._file.close()
+            self._seq = seq
+            self._file = open(self._segment_path(seq), 'ab')
+
+    def _sync_directory(self):
+        if hasattr(os, 'O_DIRECTORY'):
+            fd = os.open(self.directory, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    # recovery
+
+    def recover(self, repositories):
+        """
+        Rebuild repositories ({model_name: repository}) from disk and open
+        the log for appending. Returns the number of entities restored.
+        """
+        # recovery allocates millions of small containers that all stay
+        # alive; cyclic GC passes over them would dominate restart time
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return self._recover(repositories)
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+    def _recover(self, repositories):
+        latest = {}
+        base_seq = 0
+        snapshot_path = os.path.join(self.directory, SNAPSHOT_FILE)
+        if os.path.exists(snapshot_path):
+            for _, body in read_records(snapshot_path):
+                if body[0] == OP_SNAPSHOT:
+                    base_seq = body[1]
+                else:
+                    model_name = body[1]
+                    for obj_id, state in body[3]:
+                        latest[(model_name, obj_id)] = state
+
+        last_seq = base_seq
+        for seq, path in self._segments():
+            if seq < base_seq:
+                continue
+            good_offset = 0
+            for good_offset, body in read_records(path):
+                op = body[0]
+                if op == OP_UPSERT or op == OP_DELETE:
+                    latest[(body[1], body[2])] = body[3]
+                elif op == OP_UPSERT_BATCH:
+                    model_name = body[1]
+                    for obj_id, state in body[3]:
+                        latest[(model_name, obj_id)] = state
+                else:
+                    model_name = body[1]
+                    for obj_id in body[3]:
+                        latest[(model_name, obj_id)] = None
+            if good_offset != os.path.getsize(path):
+                # torn tail from a crash: drop it so new records follow good ones
+                with open(path, 'r+b') as f:
+                    f.truncate(good_offset)
+            last_seq = seq
+
+        # two passes so references (including cycles) resolve to live objects
+        shells = {key: new_instance(MODELS[key[0]], key[1])
+                  for key, state in latest.items() if state is not None}
+        for key, obj in shells.items():
+            load_state(obj, latest[key], shells.get)
+        loaded = {}
+        for (model_name, _), obj in shells.items():
+            loaded.setdefault(model_name, []).append(obj)
+        for model_name, objs in loaded.items():
+            repositories[model_name].add_many(objs)
+
+        self._open_segment(last_seq)
+        return len(shells)
+
+    # logging
+
+    def _write(self, records):
+        with self._io_lock:
+            self._file.write(b''.join(records))
+            self._file.flush()
+            self.flushes += 1
+            if self.fsync:
+                os.fsync(self._file.fileno())
+
+    def _append(self, make_bodies):
+        # the state is captured under the lock so log order matches the
+        # order in which concurrent writers observed the entity
+        with self._lock:
+            record = b''.join(encode_record(body) for body in make_bodies())
+            if self._writer is None:
+                self._write([record])
+                return
+            ticket = self._writer.enqueue(record)
+        self._writer.wait(ticket)
+
+    def log_upsert(self, model_name, obj):
+        self._append(lambda: [(OP_UPSERT, model_name, obj.id, dump_state(obj, json_safe=False))])
+
+    def log_delete(self, model_name, obj_id):
+        self._append(lambda: [(OP_DELETE, model_name, obj_id, None)])
+
+    def log_upsert_many(self, model_name, objs):
+        """Log objs as batch records, written (and fsynced) together."""
+        objs = list(objs)
+        self._append(lambda: [
+            (OP_UPSERT_BATCH, model_name, None,
+             [(obj.id, dump_state(obj, json_safe=False))
+              for obj in objs[start:start + SNAPSHOT_BATCH]])
+            for start in range(0, len(objs), SNAPSHOT_BATCH)])
+
+    def log_delete_many(self, model_name, obj_ids):
+        obj_ids = list(obj_ids)
+        self._append(lambda: [
+            (OP_DELETE_BATCH, model_name, None, obj_ids[start:start + SNAPSHOT_BATCH])
+            for start in range(0, len(obj_ids), SNAPSHOT_BATCH)])
+
+    # compaction
+
+    def snapshot(self, repositories):
+        """Write a snapshot of repositories and drop the log it replaces."""
+        with self._lock:
+            base_seq = self._seq + 1
+            self._open_segment(base_seq)
+
+        # the snapshot is fuzzy (writers keep going), which is fine because
+        # replaying the segments from base_seq on top of it is idempotent
+        tmp_path = os.path.join(self.directory, SNAPSHOT_FILE + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(encode_record((OP_SNAPSHOT, base_seq, None, None)))
+            for model_name, repository in repositories.items():
+                objs = repository.get_all()
+                for start in range(0, len(objs), SNAPSHOT_BATCH):
+                    batch = [(obj.id, dump_state(obj, json_safe=False))
+                             for obj in objs[start:start + SNAPSHOT_BATCH]]
+                    f.write(encode_record((OP_UPSERT_BATCH, model_name, None, batch)))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, os.path.join(self.directory, SNAPSHOT_FILE))
+        self._sync_directory()
+
+        for seq, path in self._segments():
+            if seq < base_seq:
+                os.remove(path)
+
+    def start_compactor(self, repositories, interval):
+        """Snapshot repositories every interval seconds in a daemon thread."""
+        def run():
+            while not self._stop.wait(interval):
+                self.snapshot(repositories)
+
+        self._compactor = threading.Thread(target=run, name='journal-compactor', daemon=True)
+        self._compactor.start()
+
+    def close(self):
+        self._stop.set()
+        if self._compactor is not None:
+            self._compactor.join()
+        if self._writer is not None:
+            self._writer.close()
+        with self._io_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class JournaledRepository(Repository):
+    """Repository decorator that logs every mutation to a Journal."""
+    def __init__(self, repository, journal, model_name):
+        self.repository = repository
+        self.journal = journal
+        self.model_name = model_name
+
+    @property
+    def version(self):
+        return self.repository.version
+
+    def create_index(self, attr_name, unique=False, ordered=False):
+        return self.repository.create_index(attr_name, unique=unique, ordered=ordered)
+
+    def lock(self, obj_id):
+        return self.repository.lock(obj_id)
+
+    def lock_many(self, obj_ids):
+        return self.repository.lock_many(obj_ids)
+
+    def add(self, obj):
+        self.repository.add(obj)
+        self.journal.log_upsert(self.model_name, obj)
+
+    def add_many(self, objs):
+        objs = list(objs)
+        self.repository.add_many(objs)
+        self.journal.log_upsert_many(self.model_name, objs)
+
+    def get(self, obj_id):
+        return self.repository.get(obj_id)
+
+    def get_many(self, obj_ids):
+        return self.repository.get_many(obj_ids)
+
+    def get_all(self):
+        return self.repository.get_all()
+
+    def iter_all(self):
+        return self.repository.iter_all()
+
+    def iter_page(self, after_key=None, limit=100, order_by='id', descending=False,
+                  ranges=None):
+        return self.repository.iter_page(after_key, limit, order_by, descending, ranges)
+
+    def update(self, obj_id, data):
+        self.repository.update(obj_id, data)
+        obj = self.repository.get(obj_id)
+        if obj:
+            self.journal.log_upsert(self.model_name, obj)
+
+    def delete(self, obj_id):
+        if self.repository.get(obj_id) is not None:
+            self.repository.delete(obj_id)
+            self.journal.log_delete(self.model_name, obj_id)
+
+    def update_many(self, updates):
+        updates = list(updates)
+        try:
+            self.repository.update_many(updates)
+        finally:
+            # log whatever was applied, even if a later update failed
+            objs = self.repository.get_many(obj_id for obj_id, _ in updates)
+            self.journal.log_upsert_many(self.model_name, [obj for obj in objs if obj])
+
+    def delete_many(self, obj_ids):
+        obj_ids = list(obj_ids)
+        obj_ids = [obj_id for obj_id, obj in zip(obj_ids, self.repository.get_many(obj_ids)) if obj]
+        self.repository.delete_many(obj_ids)
+        self.journal.log_delete_many(self.model_name, obj_ids)
+
+    def get_by_attribute(self, attr_name, attr_value):
+        return self.repository.get_by_attribute(attr_name, attr_value)
+
+    def get_all_by_attribute(self, attr_name, attr_value):
+        return self.repository.get_all_by_attribute(attr_name, attr_value)
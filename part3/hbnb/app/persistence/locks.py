@@ -0,0 +1,116 @@
+import threading
+from contextlib import ExitStack, contextmanager, nullcontext
+
+
+class ReadWriteLock:
+    """
+    Many concurrent readers or one writer.
+
+    The writer may re-enter (and read under) its own lock, and waiting
+    writers keep new readers out so a steady stream of reads cannot starve
+    them.
+    """
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = None
+        self._depth = 0
+        self._writers_waiting = 0
+
+    def acquire_read(self):
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._depth += 1
+                return
+            while self._writer is not None or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+
+    def release_read(self):
+        with self._cond:
+            if self._writer == threading.get_ident():
+                self._depth -= 1
+                return
+            self._readers -= 1
+            if not self._readers:
+                self._cond.notify_all()
+
+    def acquire_write(self):
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._depth += 1
+                return
+            self._writers_waiting += 1
+            while self._writer is not None or self._readers:
+                self._cond.wait()
+            self._writers_waiting -= 1
+            self._writer = me
+            self._depth = 1
+
+    def release_write(self):
+        with self._cond:
+            self._depth -= 1
+            if not self._depth:
+                self._writer = None
+                self._cond.notify_all()
+
+    @contextmanager
+    def read(self):
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self):
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+class NullLock:
+    """ReadWriteLock stand-in for single-threaded use."""
+    def read(self):
+        return nullcontext()
+
+    def write(self):
+        return nullcontext()
+
+
+class LockStripes:
+    """
+    A fixed pool of ReadWriteLocks shared by key hash, so operations on
+    different ids rarely contend while memory stays bounded.
+    With count=0 every key maps to a NullLock (no locking).
+    """
+    def __init__(self, count=64):
+        self._locks = [ReadWriteLock() for _ in range(count)]
+        self._null = NullLock()
+
+    def __len__(self):
+        return len(self._locks)
+
+    def __getitem__(self, key):
+        if not self._locks:
+            return self._null
+        return self._locks[hash(key) % len(self._locks)]
+
+    def write_all(self, keys):
+        """
+        Context manager holding the write locks of every stripe used by
+        keys. Stripes are taken once each, in stripe order, so concurrent
+        batches cannot deadlock against each other.
+        """
+        if not self._locks:
+            return nullcontext()
+        n = len(self._locks)
+        stack = ExitStack()
+        with stack:
+            for slot in sorted({hash(key) % n for key in keys}):
+                stack.enter_context(self._locks[slot].write())
+            return stack.pop_all()
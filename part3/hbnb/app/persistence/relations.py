@@ -0,0 +1,45 @@
+import threading
+
+
+class ReverseIndex:
+    """
+    One-to-many adjacency from a parent id to its children's ids (e.g.
+    owner -> places), for navigating relationships backwards.
+
+    Each parent's children are kept in an insertion-ordered dict used as
+    a set, so adding or removing a child is O(1) and listing a parent's
+    children is O(degree).
+    """
+    def __init__(self):
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def add(self, parent_id, child_id):
+        with self._lock:
+            self._children.setdefault(parent_id, {})[child_id] = None
+
+    def add_many(self, pairs):
+        with self._lock:
+            for parent_id, child_id in pairs:
+                self._children.setdefault(parent_id, {})[child_id] = None
+
+    def remove(self, parent_id, child_id):
+        with self._lock:
+            children = self._children.get(parent_id)
+            if children is not None:
+                children.pop(child_id, None)
+                if not children:
+                    del self._children[parent_id]
+
+    def pop(self, parent_id):
+        """Forget parent_id and return its children's ids."""
+        with self._lock:
+            return list(self._children.pop(parent_id, ()))
+
+    def children(self, parent_id):
+        """Ids of parent_id's children, oldest first."""
+        with self._lock:
+            return list(self._children.get(parent_id, ()))
+
+    def count(self, parent_id):
+        return len(self._children.get(parent_id, ()))
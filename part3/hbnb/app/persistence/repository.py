@@ -1,6 +1,65 @@
+import heapq
+import itertools
+import threading
 from abc import ABC, abstractmethod
+from contextlib import nullcontext
+from itertools import islice
+from app.persistence.indexes import HashIndex, IdIndex, SortedIndex, index_value
+from app.persistence.locks import LockStripes
+
+def page_key(obj, order_by='id'):
+    """
+    Keyset position of obj in order_by order: its id when ordering by id,
+    otherwise (value, id) so rows with equal values keep a stable order.
+    """
+    if order_by == 'id':
+        return obj.id
+    return (index_value(getattr(obj, order_by, None)), obj.id)
+
+
+def in_ranges(obj, ranges):
+    """True if every {attr_name: (low, high)} bound holds for obj (None = unbounded)."""
+    for attr_name, (low, high) in ranges.items():
+        value = index_value(getattr(obj, attr_name, None))
+        if value is None and (low is not None or high is not None):
+            return False
+        if (low is not None and value < low) or (high is not None and value > high):
+            return False
+    return True
+
+
+def select_page(objs, after_key=None, limit=100, order_by='id', descending=False, ranges=None):
+    """Pick one keyset page out of objs, holding at most limit of them."""
+    def key(obj):
+        return page_key(obj, order_by)
+
+    if ranges:
+        objs = (obj for obj in objs if in_ranges(obj, ranges))
+    if after_key is not None:
+        after_key = after_key if order_by == 'id' else tuple(after_key)
+        if descending:
+            objs = (obj for obj in objs if key(obj) < after_key)
+        else:
+            objs = (obj for obj in objs if key(obj) > after_key)
+    if limit is None:
+        return sorted(objs, key=key, reverse=descending)
+    pick = heapq.nlargest if descending else heapq.nsmallest
+    return pick(limit, objs, key=key)
+
+
+# every write takes the next number, so no two repositories (even ones
+# recreated by the facade) ever show the same version
+_write_versions = itertools.count(1)
+
 
 class Repository(ABC):
+    # changes on every write, once it is applied; whatever was read
+    # while it kept one value can be reused until it changes
+    version = 0
+
+    def _wrote(self):
+        self.version = next(_write_versions)
+
     @abstractmethod
     def add(self, obj):
         pass
@@ -11,6 +70,7 @@ class Repository(ABC):
 
     @abstractmethod
     def get_all(self):
+        """Return every entity as a new list."""
         pass
 
     @abstractmethod
@@ -25,28 +85,250 @@ class Repository(ABC):
     def get_by_attribute(self, attr_name, attr_value):
         pass
 
+    @abstractmethod
+    def get_all_by_attribute(self, attr_name, attr_value):
+        pass
+
+    @abstractmethod
+    def create_index(self, attr_name, unique=False, ordered=False):
+        """
+        Declare a secondary index on attr_name. ordered=True asks for an
+        index that also serves range filters and sorted pages.
+        """
+        pass
+
+    # batch operations: engines override these to amortize locking,
+    # lookups and round trips; the defaults just loop
+
+    def add_many(self, objs):
+        for obj in objs:
+            self.add(obj)
+
+    def get_many(self, obj_ids):
+        """Return the entities for obj_ids, in order (None where missing)."""
+        return [self.get(obj_id) for obj_id in obj_ids]
+
+    def update_many(self, updates):
+        """Apply (obj_id, data) pairs in order."""
+        for obj_id, data in updates:
+            self.update(obj_id, data)
+
+    def delete_many(self, obj_ids):
+        for obj_id in obj_ids:
+            self.delete(obj_id)
+
+    def lock_many(self, obj_ids):
+        """Like lock(), for several ids at once, without deadlocking."""
+        return nullcontext()
+
+    def iter_all(self):
+        """Yield every entity without materializing the whole table."""
+        yield from self.get_all()
+
+    def iter_page(self, after_key=None, limit=100, order_by='id', descending=False,
+                  ranges=None):
+        """
+        Return up to limit entities (all of them if limit is None) in
+        order_by order, or the reverse, that come after after_key, the
+        page_key() of the last entity of the previous page (None for the
+        first page). ranges optionally filters on {attr_name: (low, high)},
+        inclusive, None meaning unbounded. Keysets stay stable while rows
+        are added or deleted, unlike offsets.
+
+        This fallback scans iter_all() but only ever holds limit entities.
+        """
+        return select_page(self.iter_all(), after_key, limit, order_by, descending, ranges)
+
+    def lock(self, obj_id):
+        """
+        Context manager holding obj_id exclusively, for multi-step
+        read-modify-write sequences. Engines without in-process locking
+        return a no-op.
+        """
+        return nullcontext()
+
 
 class InMemoryRepository(Repository):
-    def __init__(self):
+    """
+    Dict-backed repository.
+
+    With lock_stripes > 0 it is safe to share between threads: every id maps
+    to one of lock_stripes read/write locks, so readers never block each
+    other and writers only contend with writers of the same stripe. Index
+    maintenance is serialized by a short mutex so unique checks and inserts
+    are atomic.
+    """
+    def __init__(self, lock_stripes=0):
         self._storage = {}
+        self._indexes = {}
+        self._ids = IdIndex()  # id order, for the default page order
+        self._locks = LockStripes(lock_stripes)
+        self._index_lock = threading.Lock() if lock_stripes else nullcontext()
+
+    def lock(self, obj_id):
+        return self._locks[obj_id].write()
+
+    def lock_many(self, obj_ids):
+        return self._locks.write_all(obj_ids)
+
+    def create_index(self, attr_name, unique=False, ordered=False):
+        """Declare a secondary index on attr_name (built from existing rows)."""
+        if ordered and unique:
+            raise ValueError("ordered indexes cannot be unique")
+        index = SortedIndex(attr_name) if ordered else HashIndex(attr_name, unique=unique)
+        with self._index_lock:
+            index.insert_many(self._storage.values())
+            self._indexes[attr_name] = index
+        return index
 
     def add(self, obj):
-        self._storage[obj.id] = obj
+        with self._locks[obj.id].write(), self._index_lock:
+            # check every unique index first so a rejected add leaves no trace
+            for index in self._indexes.values():
+                index.check(obj.id, getattr(obj, index.attr_name, None))
+            self._storage[obj.id] = obj
+            self._ids.insert(obj.id)
+            for index in self._indexes.values():
+                index.insert(obj)
+            self._wrote()
+
+    def add_many(self, objs):
+        """Add objs under one lock round; a unique violation adds none of them."""
+        objs = list(objs)
+        with self._locks.write_all(obj.id for obj in objs), self._index_lock:
+            for index in self._indexes.values():
+                if index.unique:
+                    seen = set()
+                    for obj in objs:
+                        value = index_value(getattr(obj, index.attr_name, None))
+                        index.check(obj.id, value)
+                        if value in seen:
+                            raise ValueError(f"{index.attr_name} must be unique")
+                        seen.add(value)
+            for obj in objs:
+                self._storage[obj.id] = obj
+            self._ids.insert_many(obj.id for obj in objs)
+            for index in self._indexes.values():
+                index.insert_many(objs)
+            self._wrote()
 
     def get(self, obj_id):
-        return self._storage.get(obj_id)
+        with self._locks[obj_id].read():
+            return self._storage.get(obj_id)
 
     def get_all(self):
         return list(self._storage.values())
 
     def update(self, obj_id, data):
-        obj = self.get(obj_id)
-        if obj:
-            obj.update(data)
+        with self._locks[obj_id].write():
+            obj = self._storage.get(obj_id)
+            if not obj:
+                return
+            if any(index.unique and attr_name in data
+                   for attr_name, index in self._indexes.items()):
+                # hold the index lock throughout so two writers cannot both
+                # pass the uniqueness check for the same value
+                with self._index_lock:
+                    for attr_name, index in self._indexes.items():
+                        if attr_name in data:
+                            index.check(obj_id, data[attr_name])
+                    obj.update(data)
+                    self._refresh_indexes(obj)
+                    self._wrote()
+            else:
+                obj.update(data)
+                with self._index_lock:
+                    self._refresh_indexes(obj)
+                    self._wrote()
+
+    def iter_page(self, after_key=None, limit=100, order_by='id', descending=False,
+                  ranges=None):
+        ranges = dict(ranges or {})
+        index = self._indexes.get(order_by)
+        if isinstance(index, SortedIndex):
+            # walk the order index from the cursor: O(log n + k)
+            low, high = ranges.pop(order_by, (None, None))
+            with self._index_lock:
+                objs = (self._storage[obj_id]
+                        for obj_id in index.scan(low, high, after_key, descending))
+                if ranges:
+                    objs = (obj for obj in objs if in_ranges(obj, ranges))
+                return list(islice(objs, limit))
+        for attr_name, (low, high) in ranges.items():
+            index = self._indexes.get(attr_name)
+            if isinstance(index, SortedIndex):
+                # narrow to the rows in range, then order just those
+                with self._index_lock:
+                    objs = [self._storage[obj_id] for obj_id in index.scan(low, high)]
+                del ranges[attr_name]
+                return select_page(objs, after_key, limit, order_by, descending, ranges)
+        if order_by == 'id':
+            # walk the id order from the cursor, like an order index
+            with self._index_lock:
+                objs = (self._storage[obj_id]
+                        for obj_id in self._ids.scan(after_key, descending))
+                if ranges:
+                    objs = (obj for obj in objs if in_ranges(obj, ranges))
+                return list(islice(objs, limit))
+        return super().iter_page(after_key, limit, order_by, descending, ranges)
+
+    def get_many(self, obj_ids):
+        # single dict reads are atomic; stripe locks would only add overhead
+        storage = self._storage
+        return [storage.get(obj_id) for obj_id in obj_ids]
+
+    def update_many(self, updates):
+        """
+        Apply (obj_id, data) pairs under one lock round. Each update is
+        checked and applied in order, exactly as update() would; a failing
+        update stops the batch.
+        """
+        updates = list(updates)
+        with self._locks.write_all(obj_id for obj_id, _ in updates), self._index_lock:
+            for obj_id, data in updates:
+                obj = self._storage.get(obj_id)
+                if not obj:
+                    continue
+                for attr_name, index in self._indexes.items():
+                    if attr_name in data:
+                        index.check(obj_id, data[attr_name])
+                obj.update(data)
+                self._refresh_indexes(obj)
+                self._wrote()
+
+    def _refresh_indexes(self, obj):
+        for index in self._indexes.values():
+            index.refresh(obj)
 
     def delete(self, obj_id):
-        if obj_id in self._storage:
-            del self._storage[obj_id]
+        with self._locks[obj_id].write(), self._index_lock:
+            if obj_id in self._storage:
+                del self._storage[obj_id]
+                self._ids.remove(obj_id)
+                for index in self._indexes.values():
+                    index.remove(obj_id)
+                self._wrote()
+
+    def delete_many(self, obj_ids):
+        obj_ids = list(obj_ids)
+        with self._locks.write_all(obj_ids), self._index_lock:
+            for obj_id in obj_ids:
+                if self._storage.pop(obj_id, None) is not None:
+                    self._ids.remove(obj_id)
+                    for index in self._indexes.values():
+                        index.remove(obj_id)
+            self._wrote()
 
     def get_by_attribute(self, attr_name, attr_value):
-        return next((obj for obj in self._storage.values() if getattr(obj, attr_name) == attr_value), None)
+        index = self._indexes.get(attr_name)
+        if index is not None:
+            obj_id = index.lookup(attr_value)
+            return None if obj_id is None else self.get(obj_id)
+        return next((obj for obj in self.get_all() if getattr(obj, attr_name) == attr_value), None)
+
+    def get_all_by_attribute(self, attr_name, attr_value):
+        index = self._indexes.get(attr_name)
+        if index is not None:
+            found = (self._storage.get(obj_id) for obj_id in index.lookup_all(attr_value))
+            return [obj for obj in found if obj is not None]
+        return [obj for obj in self.get_all() if getattr(obj, attr_name) == attr_value]
@@ -0,0 +1,135 @@
+import heapq
+import math
+import re
+import threading
+from bisect import bisect_left, insort
+
+TOKEN = re.compile(r'\w+')
+
+
+def tokenize(text):
+    """Lower-cased word tokens of text."""
+    return TOKEN.findall(text.lower()) if text else []
+
+
+class TextIndex:
+    """
+    Incremental inverted index with BM25 ranking.
+
+    A document (e.g. a place) is the sum of several sources (its title,
+    its description, each of its reviews), so a source can be added,
+    replaced or removed without touching the rest of the document. Each
+    source has an integer weight that multiplies its term frequencies,
+    letting title words count more than review words.
+
+    Postings map term -> {doc_id: weighted term frequency}. Sources keep a
+    reference to their text rather than their token counts (the text is
+    the model's own string, so this costs no copy) and are re-tokenized
+    when removed. A sorted vocabulary serves prefix expansion of the last
+    query term.
+    """
+    def __init__(self, k1=1.2, b=0.75, max_expansions=50):
+        self.k1 = k1
+        self.b = b
+        self.max_expansions = max_expansions
+        self._postings = {}
+        self._vocabulary = []
+        self._doc_lengths = {}
+        self._sources = {}
+        self._total_length = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._doc_lengths)
+
+    def put(self, source_id, doc_id, text, weight=1):
+        """Index text as source_id of doc_id, replacing its previous text."""
+        with self._lock:
+            self._remove(source_id)
+            if not text:
+                return
+            self._sources[source_id] = (doc_id, text, weight)
+            tokens = tokenize(text)
+            postings = self._postings
+            for term in tokens:
+                docs = postings.get(term)
+                if docs is None:
+                    docs = postings[term] = {}
+                    insort(self._vocabulary, term)
+                docs[doc_id] = docs.get(doc_id, 0) + weight
+            length = len(tokens) * weight
+            self._doc_lengths[doc_id] = self._doc_lengths.get(doc_id, 0) + length
+            self._total_length += length
+
+    def remove(self, source_id):
+        with self._lock:
+            self._remove(source_id)
+
+    def _remove(self, source_id):
+        source = self._sources.pop(source_id, None)
+        if source is None:
+            return
+        doc_id, text, weight = source
+        tokens = tokenize(text)
+        for term in tokens:
+            docs = self._postings[term]
+            tf = docs[doc_id] - weight
+            if tf:
+                docs[doc_id] = tf
+            else:
+                del docs[doc_id]
+                if not docs:
+                    del self._postings[term]
+                    del self._vocabulary[bisect_left(self._vocabulary, term)]
+        length = len(tokens) * weight
+        self._total_length -= length
+        remaining = self._doc_lengths[doc_id] - length
+        if remaining:
+            self._doc_lengths[doc_id] = remaining
+        else:
+            del self._doc_lengths[doc_id]
+
+    def _expand(self, prefix):
+        """Up to max_expansions vocabulary terms starting with prefix, most common first."""
+        vocabulary = self._vocabulary
+        terms = []
+        i = bisect_left(vocabulary, prefix)
+        while i < len(vocabulary) and vocabulary[i].startswith(prefix):
+            terms.append(vocabulary[i])
+            i += 1
+        if len(terms) > self.max_expansions:
+            terms = heapq.nlargest(self.max_expansions, terms,
+                                   key=lambda term: len(self._postings[term]))
+        return terms
+
+    def search(self, query, limit=20, prefix=False):
+        """
+        Return [(score, doc_id)] for the best limit documents matching any
+        query term, best first. With prefix=True the last term also matches
+        every indexed word it starts (search-as-you-type).
+        """
+        terms = tokenize(query)
+        if not terms:
+            return []
+        with self._lock:
+            count = len(self._doc_lengths)
+            if not count:
+                return []
+            avg_length = self._total_length / count
+            k1, b = self.k1, self.b
+            lengths = self._doc_lengths
+            last = self._expand(terms[-1]) if prefix else [terms[-1]]
+            norm = k1 * (1 - b)
+            scale = k1 * b / avg_length
+
+            scores = {}
+            for term in dict.fromkeys(terms[:-1] + last):
+                docs = self._postings.get(term)
+                if not docs:
+                    continue
+                idf = math.log(1 + (count - len(docs) + 0.5) / (len(docs) + 0.5))
+                for doc_id, tf in docs.items():
+                    score = idf * tf * (k1 + 1) / (tf + norm + scale * lengths[doc_id])
+                    scores[doc_id] = scores.get(doc_id, 0.0) + score
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return [(score, doc_id) for doc_id, score in best]
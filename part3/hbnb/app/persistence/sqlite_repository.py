@@ -0,0 +1,363 @@
+import json
+import sqlite3
+import threading
+from app.persistence.repository import Repository
+from app.persistence.indexes import index_value
+from app.persistence.locks import LockStripes
+from app.persistence.codec import dump_state, load_state, new_instance
+from app.models.ids import id_bytes
+
+
+class SQLiteDatabase:
+    """
+    One SQLite database file shared by several SQLiteRepository tables.
+
+    Connections are pooled per thread (sqlite3 connections must not be
+    shared between threads) and opened in WAL mode so readers never block
+    the writer. Every connection keeps its own compiled-statement cache,
+    and the repositories always issue the same SQL text, so statements are
+    prepared once per connection and then reused.
+    """
+    def __init__(self, path, statement_cache_size=256):
+        self.path = path
+        self.statement_cache_size = statement_cache_size
+        self.repositories = {}
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False,
+                                   cached_statements=self.statement_cache_size)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def register(self, model_name, repository):
+        self.repositories[model_name] = repository
+
+    def resolve(self, ref):
+        """Return the entity for a (model_name, obj_id) reference, loading it if needed."""
+        model_name, obj_id = ref
+        repository = self.repositories.get(model_name)
+        if repository is None:
+            return None
+        return repository.resolve(obj_id)
+
+    def close(self):
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+
+class SQLiteRepository(Repository):
+    """
+    Repository storing one model per table.
+
+    Each row holds the entity's encoded state plus a version counter; indexed
+    attributes get their own column backed by a real SQL index. Loaded
+    entities are kept in an identity map so the facade always sees the same
+    instance for an id, and are re-decoded only when the row's version moved
+    (e.g. another worker wrote it).
+
+    version (see Repository) counts the writes of this process only.
+
+    UUID ids are stored as 16-byte blobs rather than 36-character text,
+    in the rows and in the primary-key index; blob order is id order.
+    Tables created before that keep their text ids.
+
+    lock() and lock_many() hold ids with striped read/write locks, as in
+    InMemoryRepository; they serialize the threads of this process only.
+    """
+    def __init__(self, database, model, table=None, lock_stripes=64):
+        self.database = database
+        self.model = model
+        self.table = table or model.__name__.lower()
+        self._indexes = {}
+        self._identity = {}
+        self._locks = LockStripes(lock_stripes)
+        database.register(model.__name__, self)
+
+        t = self.table
+        self._sql_get = f'SELECT version, state FROM "{t}" WHERE id = ?'
+        self._sql_all = f'SELECT id, version, state FROM "{t}" ORDER BY rowid'
+        self._sql_delete = f'DELETE FROM "{t}" WHERE id = ?'
+        with self.database.connection() as conn:
+            conn.execute(f'CREATE TABLE IF NOT EXISTS "{t}" ('
+                         'id BLOB PRIMARY KEY, version INTEGER NOT NULL, state TEXT NOT NULL)')
+            existing = {row[1]: row[2] for row in conn.execute(f'PRAGMA table_info("{t}")')}
+        self._binary_ids = existing['id'].upper() == 'BLOB'
+        for column in existing:
+            if column.startswith('idx_'):
+                self._indexes[column[4:]] = False
+        self._prepare_writes()
+
+    def lock(self, obj_id):
+        return self._locks[obj_id].write()
+
+    def lock_many(self, obj_ids):
+        return self._locks.write_all(obj_ids)
+
+    def _key(self, obj_id):
+        """Stored form of obj_id"""
+        if self._binary_ids:
+            key = id_bytes(obj_id)
+            if key is not None:
+                return key
+        return obj_id
+
+    def _column(self, attr_name):
+        return f'idx_{attr_name}'
+
+    def _prepare_writes(self):
+        columns = ['id', 'version', 'state'] + [self._column(a) for a in self._indexes]
+        quoted = ', '.join(f'"{c}"' for c in columns)
+        marks = ', '.join('?' for _ in columns)
+        self._sql_insert = f'INSERT INTO "{self.table}" ({quoted}) VALUES ({marks})'
+        sets = ', '.join(f'"{c}" = ?' for c in columns[2:])
+        self._sql_update = (f'UPDATE "{self.table}" SET version = version + 1, {sets} '
+                            'WHERE id = ? RETURNING version')
+
+    def _index_params(self, obj):
+        return [index_value(getattr(obj, attr, None)) for attr in self._indexes]
+
+    def create_index(self, attr_name, unique=False, ordered=False):
+        """
+        Add an indexed column for attr_name and back-fill it. SQL indexes
+        are B-trees, so every index already serves ranges and ordering.
+        """
+        column = self._column(attr_name)
+        kind = 'UNIQUE INDEX' if unique else 'INDEX'
+        conn = self.database.connection()
+        with conn:
+            if attr_name not in self._indexes:
+                conn.execute(f'ALTER TABLE "{self.table}" ADD COLUMN "{column}"')
+                self._indexes[attr_name] = unique
+                self._prepare_writes()
+                for obj in self.get_all():
+                    conn.execute(f'UPDATE "{self.table}" SET "{column}" = ? WHERE id = ?',
+                                 (index_value(getattr(obj, attr_name, None)),
+                                  self._key(obj.id)))
+            self._indexes[attr_name] = unique
+            try:
+                conn.execute(f'CREATE {kind} IF NOT EXISTS "{self.table}_{column}" '
+                             f'ON "{self.table}" ("{column}")')
+            except sqlite3.IntegrityError:
+                raise ValueError(f"{attr_name} must be unique")
+
+    def _check_unique(self, conn, obj_id, attr_name, value):
+        column = self._column(attr_name)
+        row = conn.execute(f'SELECT 1 FROM "{self.table}" WHERE "{column}" = ? AND id <> ?',
+                           (index_value(value), self._key(obj_id))).fetchone()
+        if row is not None:
+            raise ValueError(f"{attr_name} must be unique")
+
+    def _decode(self, key, version, state):
+        obj = self._identity.get(key)
+        if obj is not None and obj[0] == version:
+            return obj[1]
+        entity = obj[1] if obj is not None else new_instance(self.model)
+        # register before decoding so reference cycles resolve to this instance
+        self._identity[key] = (version, entity)
+        load_state(entity, json.loads(state), self.database.resolve)
+        return entity
+
+    def resolve(self, obj_id):
+        cached = self._identity.get(self._key(obj_id))
+        if cached is not None:
+            return cached[1]
+        return self.get(obj_id)
+
+    def add(self, obj):
+        conn = self.database.connection()
+        key = self._key(obj.id)
+        params = [key, 1, json.dumps(dump_state(obj))] + self._index_params(obj)
+        try:
+            with conn:
+                conn.execute(self._sql_insert, params)
+        except sqlite3.IntegrityError as exc:
+            raise ValueError(f"{self.model.__name__} violates a unique index: {exc}")
+        self._identity[key] = (1, obj)
+        self._wrote()
+
+    def add_many(self, objs):
+        """Insert objs in one transaction (all or nothing)."""
+        objs = list(objs)
+        rows = [[self._key(obj.id), 1, json.dumps(dump_state(obj))] + self._index_params(obj)
+                for obj in objs]
+        try:
+            with self.database.connection() as conn:
+                conn.executemany(self._sql_insert, rows)
+        except sqlite3.IntegrityError as exc:
+            raise ValueError(f"{self.model.__name__} violates a unique index: {exc}")
+        for row, obj in zip(rows, objs):
+            self._identity[row[0]] = (1, obj)
+        self._wrote()
+
+    def get(self, obj_id):
+        key = self._key(obj_id)
+        row = self.database.connection().execute(self._sql_get, (key,)).fetchone()
+        if row is None:
+            self._identity.pop(key, None)
+            return None
+        return self._decode(key, *row)
+
+    def get_all(self):
+        rows = self.database.connection().execute(self._sql_all).fetchall()
+        return [self._decode(*row) for row in rows]
+
+    def get_many(self, obj_ids, batch_size=500):
+        keys = [self._key(obj_id) for obj_id in obj_ids]
+        conn = self.database.connection()
+        found = {}
+        # stay below SQLite's bound-parameter limit
+        for start in range(0, len(keys), batch_size):
+            chunk = keys[start:start + batch_size]
+            marks = ', '.join('?' for _ in chunk)
+            sql = f'SELECT id, version, state FROM "{self.table}" WHERE id IN ({marks})'
+            for row in conn.execute(sql, chunk):
+                found[row[0]] = self._decode(*row)
+        return [found.get(key) for key in keys]
+
+    def iter_all(self, batch_size=500):
+        cursor = self.database.connection().execute(self._sql_all)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            for row in rows:
+                yield self._decode(*row)
+
+    def iter_page(self, after_key=None, limit=100, order_by='id', descending=False,
+                  ranges=None):
+        ranges = ranges or {}
+        if any(attr_name != 'id' and attr_name not in self._indexes
+               for attr_name in [order_by, *ranges]):
+            return super().iter_page(after_key, limit, order_by, descending, ranges)
+
+        def column(attr_name):
+            return 'id' if attr_name == 'id' else f'"{self._column(attr_name)}"'
+
+        clauses, params = [], []
+        for attr_name, (low, high) in ranges.items():
+            if low is not None:
+                clauses.append(f'{column(attr_name)} >= ?')
+                params.append(index_value(low))
+            if high is not None:
+                clauses.append(f'{column(attr_name)} <= ?')
+                params.append(index_value(high))
+        op = '<' if descending else '>'
+        direction = ' DESC' if descending else ''
+        if order_by == 'id':
+            order = f'id{direction}'
+            if after_key is not None:
+                clauses.append(f'id {op} ?')
+                params.append(self._key(after_key))
+        else:
+            order = f'{column(order_by)}{direction}, id{direction}'
+            if after_key is not None:
+                clauses.append(f'({column(order_by)}, id) {op} (?, ?)')
+                params.extend((after_key[0], self._key(after_key[1])))
+        where = f' WHERE {" AND ".join(clauses)}' if clauses else ''
+        sql = f'SELECT id, version, state FROM "{self.table}"{where} ORDER BY {order} LIMIT ?'
+        params.append(-1 if limit is None else limit)
+        rows = self.database.connection().execute(sql, params).fetchall()
+        return [self._decode(*row) for row in rows]
+
+    def update(self, obj_id, data):
+        obj = self.get(obj_id)
+        if obj:
+            conn = self.database.connection()
+            for attr_name, unique in self._indexes.items():
+                if unique and attr_name in data:
+                    self._check_unique(conn, obj_id, attr_name, data[attr_name])
+            key = self._key(obj_id)
+            before = dump_state(obj, json_safe=False)
+            try:
+                obj.update(data)
+                params = [json.dumps(dump_state(obj))] + self._index_params(obj) + [key]
+                with conn:
+                    version = conn.execute(self._sql_update, params).fetchone()[0]
+            except Exception as exc:
+                # nothing was written: the cached entity goes back to its row
+                load_state(obj, before, self.database.resolve)
+                if isinstance(exc, sqlite3.IntegrityError):
+                    raise ValueError(f"{self.model.__name__} violates a unique index: {exc}")
+                raise
+            self._identity[key] = (version, obj)
+            self._wrote()
+
+    def update_many(self, updates):
+        """Apply (obj_id, data) pairs in one transaction."""
+        updates = list(updates)
+        objs = dict(zip((obj_id for obj_id, _ in updates),
+                        self.get_many(obj_id for obj_id, _ in updates)))
+        conn = self.database.connection()
+        versions = []
+        befores = []
+        try:
+            with conn:
+                for obj_id, data in updates:
+                    obj = objs[obj_id]
+                    if not obj:
+                        continue
+                    for attr_name, unique in self._indexes.items():
+                        if unique and attr_name in data:
+                            self._check_unique(conn, obj_id, attr_name, data[attr_name])
+                    befores.append((obj, dump_state(obj, json_safe=False)))
+                    obj.update(data)
+                    key = self._key(obj_id)
+                    params = [json.dumps(dump_state(obj))] + self._index_params(obj) + [key]
+                    versions.append((key, obj, conn.execute(self._sql_update, params).fetchone()[0]))
+        except Exception as exc:
+            # the transaction rolled back: put the cached entities back as
+            # stored, the earliest state last (an id may repeat in updates)
+            for obj, before in reversed(befores):
+                load_state(obj, before, self.database.resolve)
+            if isinstance(exc, sqlite3.IntegrityError):
+                raise ValueError(f"{self.model.__name__} violates a unique index: {exc}")
+            raise
+        for key, obj, version in versions:
+            self._identity[key] = (version, obj)
+        self._wrote()
+
+    def delete(self, obj_id):
+        key = self._key(obj_id)
+        with self.database.connection() as conn:
+            conn.execute(self._sql_delete, (key,))
+        self._identity.pop(key, None)
+        self._wrote()
+
+    def delete_many(self, obj_ids):
+        keys = [self._key(obj_id) for obj_id in obj_ids]
+        with self.database.connection() as conn:
+            conn.executemany(self._sql_delete, ((key,) for key in keys))
+        for key in keys:
+            self._identity.pop(key, None)
+        self._wrote()
+
+    def _select_by(self, attr_name, attr_value, limit=None):
+        sql = (f'SELECT id, version, state FROM "{self.table}" '
+               f'WHERE "{self._column(attr_name)}" = ? ORDER BY rowid')
+        if limit is not None:
+            sql += f' LIMIT {int(limit)}'
+        rows = self.database.connection().execute(sql, (index_value(attr_value),)).fetchall()
+        return [self._decode(*row) for row in rows]
+
+    def get_by_attribute(self, attr_name, attr_value):
+        if attr_name in self._indexes:
+            found = self._select_by(attr_name, attr_value, limit=1)
+            return found[0] if found else None
+        return next((obj for obj in self.get_all() if getattr(obj, attr_name) == attr_value), None)
+
+    def get_all_by_attribute(self, attr_name, attr_value):
+        if attr_name in self._indexes:
+            return self._select_by(attr_name, attr_value)
+        return [obj for obj in self.get_all() if getattr(obj, attr_name) == attr_value]
@@ -1,2 +1,4 @@
 from app.services.facade import HBnBFacade
+from app.services.passwords import PasswordHasher, PasswordPoolBusy
 facade = HBnBFacade()
+passwords = PasswordHasher()
@@ -1,19 +1,204 @@
-from app.persistence.repository import InMemoryRepository
+import threading
+from contextlib import contextmanager, nullcontext
+from itertools import count, islice
+
+from app.persistence.repository import InMemoryRepository, page_key, select_page
+from app.persistence.sqlite_repository import SQLiteDatabase, SQLiteRepository
+from app.persistence.journal import Journal, JournaledRepository
+from app.persistence.bitmap import BitmapIndex
+from app.persistence.geo import GeoIndex
+from app.persistence.relations import ReverseIndex
+from app.persistence.search import TextIndex
 from app.models import User, Place, Review, Amenity
 
 class HBnBFacade:
-    def __init__(self):
-        self.user_repo = InMemoryRepository()
-        self.place_repo = InMemoryRepository()
-        self.review_repo = InMemoryRepository()
-        self.amenity_repo = InMemoryRepository()
+    def __init__(self, engine='memory', **options):
+        self.journal = None
+        self.database = None
+        # per-model versions bumped once a facade write is complete (see
+        # data_version); kept across configure()
+        self._versions = dict.fromkeys(('User', 'Place', 'Review', 'Amenity'), 0)
+        self._write_count = count(1)
+        self.configure(engine, **options)
+
+    def init_app(self, app):
+        """Select the repository engine from the Flask app configuration"""
+        self.configure(app.config.get('REPOSITORY_ENGINE', 'memory'),
+                       database=app.config.get('SQLITE_DATABASE'),
+                       journal_dir=app.config.get('JOURNAL_DIR'),
+                       journal_fsync=app.config.get('JOURNAL_FSYNC', True),
+                       group_commit=app.config.get('JOURNAL_GROUP_COMMIT', False),
+                       batch_window=app.config.get('JOURNAL_BATCH_WINDOW', 0.002),
+                       max_batch=app.config.get('JOURNAL_MAX_BATCH', 256),
+                       snapshot_interval=app.config.get('JOURNAL_SNAPSHOT_INTERVAL'),
+                       lock_stripes=app.config.get('REPOSITORY_LOCK_STRIPES', 64),
+                       geo_cell_size=app.config.get('GEO_CELL_SIZE', 0.2),
+                       rating_prior_weight=app.config.get('RATING_PRIOR_WEIGHT', 5))
+
+    def configure(self, engine='memory', database=None, journal_dir=None,
+                  journal_fsync=True, snapshot_interval=None, group_commit=False,
+                  batch_window=0.002, max_batch=256, lock_stripes=64, geo_cell_size=0.2,
+                  rating_prior_weight=5):
+        """
+        (Re)create the repositories.
+
+        Args:
+            engine (str): 'memory' (default) or 'sqlite'
+            database (str): SQLite database path, used by the 'sqlite' engine
+            journal_dir (str): make the 'memory' engine durable by logging
+                               every mutation to this directory
+            journal_fsync (bool): fsync the journal after every write
+            snapshot_interval (float): seconds between background snapshots
+            group_commit (bool): share one journal fsync between concurrent writes
+            batch_window (float): seconds a group commit waits to fill a batch
+            max_batch (int): maximum records per group commit
+            lock_stripes (int): read/write lock stripes per repository
+                                (0 = not thread-safe)
+            geo_cell_size (float): grid cell size, in degrees, of the place
+                                   location index
+            rating_prior_weight (float): reviews-worth of weight the Bayesian
+                                         average gives the overall mean rating
+        """
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+        if self.database is not None:
+            self.database.close()
+            self.database = None
+
+        if engine == 'memory':
+            make_repo = lambda model: InMemoryRepository(lock_stripes=lock_stripes)
+        elif engine == 'sqlite':
+            db = self.database = SQLiteDatabase(database or 'hbnb.db')
+            make_repo = lambda model: SQLiteRepository(db, model, lock_stripes=lock_stripes)
+        else:
+            raise ValueError(f"Unknown repository engine: {engine}")
+
+        repos = {model.__name__: make_repo(model) for model in (User, Place, Review, Amenity)}
+
+        # secondary indexes for the attribute lookups done on every signup,
+        # email change and amenity create
+        repos['User'].create_index('email', unique=True)
+        repos['Amenity'].create_index('name', unique=True)
+        # ordered indexes behind the places list filters and sort orders
+        repos['Place'].create_index('price', ordered=True)
+        repos['Place'].create_index('created_at', ordered=True)
+
+        if journal_dir and engine == 'memory':
+            self.journal = Journal(journal_dir, fsync=journal_fsync, group_commit=group_commit,
+                                   batch_window=batch_window, max_batch=max_batch)
+            self.journal.recover(repos)
+            if snapshot_interval:
+                self.journal.start_compactor(dict(repos), snapshot_interval)
+            repos = {name: JournaledRepository(repo, self.journal, name)
+                     for name, repo in repos.items()}
+
+        self.user_repo = repos['User']
+        self.place_repo = repos['Place']
+        self.review_repo = repos['Review']
+        self.amenity_repo = repos['Amenity']
+
+        # reserve the emails of users loaded from storage
+        for user in self.user_repo.get_all():
+            User._emails_registry.add(user.email)
+
+        # reverse relationship indexes: places by owner, reviews by author
+        # (reviews by place are the place's own reviews list)
+        self.places_by_owner = ReverseIndex()
+        self.reviews_by_user = ReverseIndex()
+
+        # in-process place indexes: locations for radius and nearest
+        # searches, amenities for the list filters and words for full-text
+        # search over titles, descriptions and review texts; with a database
+        # shared between processes, places written by other processes
+        # appear after a restart
+        self.place_geo = GeoIndex(cell_size=geo_cell_size)
+        self.place_amenities = BitmapIndex()
+        self.place_text = TextIndex()
+        amenity_pairs = []
+        # totals of every review rating, the prior of the Bayesian averages
+        self.rating_prior_weight = rating_prior_weight
+        self._rating_lock = threading.Lock()
+        self._rating_count = self._rating_sum = 0
+        for place in self.place_repo.iter_all():
+            self.place_geo.insert(place.id, place.latitude, place.longitude)
+            amenity_pairs.extend((place.id, amenity.id) for amenity in place.amenities)
+            self._index_place_text(place)
+            self._count_ratings(place.rating_count, place.rating_sum)
+            self.places_by_owner.add(place.owner.id, place.id)
+        self.place_amenities.add_many(amenity_pairs)
+        for review in self.review_repo.iter_all():
+            self._index_review_text(review)
+            self.reviews_by_user.add(review.user.id, review.id)
+
+    def _repo(self, model_name):
+        return getattr(self, f"{model_name.lower()}_repo")
+
+    def data_version(self, *model_names):
+        """
+        Versions of the named models' data ('User', 'Place', ...): any
+        write to one of them changes its version, so they version whatever
+        was read from them (e.g. a list response). Each repository's
+        version is followed by the facade's, which only changes once the
+        write is complete, indexes and rating totals included: a version
+        read halfway through a write is never seen again afterwards.
+        'Place' versions end with the rating totals, the prior of the
+        Bayesian averages in place representations.
+        """
+        versions = tuple(version for name in model_names
+                         for version in (self._repo(name).version, self._versions[name]))
+        if 'Place' in model_names:
+            with self._rating_lock:
+                versions += (self._rating_count, self._rating_sum)
+        return versions
+
+    def _wrote(self, *model_names):
+        """Mark the named models' data changed, at the end of a write"""
+        version = next(self._write_count)
+        for name in model_names:
+            self._versions[name] = version
+
+    @contextmanager
+    def entity_lock(self, model_name, obj_id):
+        """
+        Hold one entity across a check-then-update (e.g. a conditional
+        PUT), locking in the order the update methods do: a review's place
+        before the review
+        """
+        repo = self._repo(model_name)
+        review = repo.get(obj_id) if model_name == 'Review' else None
+        with (self.place_repo.lock(review.place.id) if review else nullcontext()), \
+                repo.lock(obj_id):
+            yield
+
+    def snapshot(self):
+        """Compact the journal into a snapshot (no-op without a journal)"""
+        if self.journal is not None:
+            self.journal.snapshot({'User': self.user_repo, 'Place': self.place_repo,
+                                   'Review': self.review_repo, 'Amenity': self.amenity_repo})
 
     def create_user(self, user_data):
         """Create a new user with hashed password"""
         user = User(**user_data)  # Password will be hashed automatically in __init__
         self.user_repo.add(user)
+        self._wrote('User')
         return user
 
+    def create_users(self, users_data):
+        """Create many users with one repository batch (all or nothing)"""
+        users = []
+        try:
+            for user_data in users_data:
+                users.append(User(**user_data))
+            self.user_repo.add_many(users)
+        except Exception:
+            # release the emails reserved by the users that were built
+            for user in users:
+                User._emails_registry.discard(user.email)
+            raise
+        self._wrote('User')
+        return users
+
     def get_user(self, user_id):
         return self.user_repo.get(user_id)
 
@@ -23,29 +208,73 @@ class HBnBFacade:
     def get_user_by_email(self, email):
         return self.user_repo.get_by_attribute('email', email)
 
+    def get_places_by_owner(self, user_id):
+        """Places owned by a user, oldest first"""
+        return self._existing(self.place_repo, self.places_by_owner.children(user_id))
+
+    def get_reviews_by_user(self, user_id):
+        """Reviews written by a user, oldest first"""
+        return self._existing(self.review_repo, self.reviews_by_user.children(user_id))
+
+    @staticmethod
+    def _existing(repo, obj_ids):
+        return [obj for obj in repo.get_many(obj_ids) if obj]
+
     def get_all_users(self):
         """Retrieve all users from the repository"""
         return self.user_repo.get_all()
 
+    def get_users_page(self, after_id=None, limit=100):
+        """Retrieve up to limit users ordered by id (oldest first), starting after after_id"""
+        return self.user_repo.iter_page(after_id, limit)
+
     def update_user(self, user_id, user_data):
         """Update a user's information (including password hashing if needed)"""
         user = self.user_repo.get(user_id)
         if not user:
             return None
 
-        # Use the User model's update method which handles password hashing
-        user.update(user_data)
-        
-        # Update in repository
-        self.user_repo.update(user_id, user)
+        # The repository applies the User model's update method (which handles
+        # password hashing) and keeps its indexes in sync
+        self.user_repo.update(user_id, user_data)
+        self._wrote('User')
         return user
 
+    def delete_user(self, user_id):
+        """
+        Delete a user with their places (and those places' reviews) and
+        the reviews they wrote, and release their email. Costs O(related
+        objects), found through the reverse indexes.
+        """
+        user = self.user_repo.get(user_id)
+        if not user:
+            return False
+        for place_id in self.places_by_owner.children(user_id):
+            self.delete_place(place_id)
+        self._delete_reviews(self.get_reviews_by_user(user_id))
+        with self.user_repo.lock(user_id):
+            if self.user_repo.get(user_id) is None:
+                return False  # deleted concurrently
+            self.user_repo.delete(user_id)
+        self.places_by_owner.pop(user_id)
+        self.reviews_by_user.pop(user_id)
+        User._emails_registry.discard(user.email)
+        self._wrote('User')
+        return True
+
     # Amenity methods
     def create_amenity(self, amenity_data):
         amenity = Amenity(**amenity_data)
         self.amenity_repo.add(amenity)
+        self._wrote('Amenity')
         return amenity
 
+    def create_amenities(self, amenities_data):
+        amenities = [Amenity(**amenity_data) for amenity_data in amenities_data]
+        self.amenity_repo.add_many(amenities)
+        self._wrote('Amenity')
+        return amenities
+
     def get_amenity(self, amenity_id):
         return self.amenity_repo.get(amenity_id)
 
@@ -55,16 +284,38 @@ class HBnBFacade:
     def get_all_amenities(self):
         return self.amenity_repo.get_all()
 
+    def get_amenities_page(self, after_id=None, limit=100):
+        return self.amenity_repo.iter_page(after_id, limit)
+
     def update_amenity(self, amenity_id, amenity_data):
         amenity = self.amenity_repo.get(amenity_id)
         if not amenity:
             return None
-        for key, value in amenity_data.items():
-            if hasattr(amenity, key):
-                setattr(amenity, key, value)
-        self.amenity_repo.update(amenity_id, amenity)
+        self.amenity_repo.update(amenity_id, amenity_data)
+        self._wrote('Amenity')
         return amenity
 
+    def delete_amenity(self, amenity_id):
+        """Delete an amenity and take it off every place that has it"""
+        amenity = self.amenity_repo.get(amenity_id)
+        if not amenity:
+            return False
+        # the places come from the amenity's bitmap, scanned at C speed
+        place_ids = list(self.place_amenities.iter_ids(self.place_amenities.match([amenity_id])))
+        with self.place_repo.lock_many(place_ids):
+            if self.amenity_repo.get(amenity_id) is None:
+                return False  # deleted concurrently
+            # (a reused bitmap ordinal can name a place without the amenity)
+            places = [place for place in self.place_repo.get_many(place_ids)
+                      if place and amenity.id in self._amenity_ids(place)]
+            for place in places:
+                place.remove_amenity(amenity)
+            self.place_repo.update_many((place.id, {}) for place in places)
+            self.amenity_repo.delete(amenity_id)
+        self.place_amenities.drop(amenity_id)
+        self._wrote('Amenity', 'Place')
+        return True
+
     # Place methods
     def create_place(self, place_data):
         # Get owner from user_repo
@@ -77,7 +328,7 @@ class HBnBFacade:
         # Handle amenities if provided
         if 'amenities' in place_data:
             amenity_ids = place_data.pop('amenities')
-            amenities = [self.get_amenity(aid) for aid in amenity_ids if self.get_amenity(aid)]
+            amenities = [amenity for amenity in self.amenity_repo.get_many(amenity_ids) if amenity]
             place = Place(**place_data)
             for amenity in amenities:
                 place.add_amenity(amenity)
@@ -85,21 +336,254 @@ class HBnBFacade:
             place = Place(**place_data)
         
         self.place_repo.add(place)
+        self.places_by_owner.add(owner.id, place.id)
+        self.place_geo.insert(place.id, place.latitude, place.longitude)
+        self.place_amenities.add_many((place.id, amenity.id) for amenity in place.amenities)
+        self._index_place_text(place)
+        self._wrote('Place')
         return place
 
+    def create_places(self, places_data):
+        """
+        Create many places with one repository batch. Owners and amenities
+        are fetched once for the whole batch; an unknown owner id raises
+        ValueError and nothing is created.
+        """
+        places_data = [dict(place_data) for place_data in places_data]
+        owner_ids = {place_data['owner_id'] for place_data in places_data}
+        owners = dict(zip(owner_ids, self.user_repo.get_many(owner_ids)))
+        amenity_ids = {aid for place_data in places_data
+                       for aid in place_data.get('amenities', ())}
+        amenities = dict(zip(amenity_ids, self.amenity_repo.get_many(amenity_ids)))
+
+        places = []
+        for place_data in places_data:
+            owner = owners[place_data.pop('owner_id')]
+            if not owner:
+                raise ValueError("Owner not found")
+            place_amenities = place_data.pop('amenities', ())
+            place = Place(owner=owner, **place_data)
+            for aid in place_amenities:
+                if amenities[aid]:
+                    place.add_amenity(amenities[aid])
+            places.append(place)
+        self.place_repo.add_many(places)
+        self.places_by_owner.add_many((place.owner.id, place.id) for place in places)
+        for place in places:
+            self.place_geo.insert(place.id, place.latitude, place.longitude)
+            self._index_place_text(place)
+        self.place_amenities.add_many((place.id, amenity.id)
+                                      for place in places for amenity in place.amenities)
+        self._wrote('Place')
+        return places
+
     def get_all_places(self):
         return self.place_repo.get_all()
 
+    def get_places_page(self, after_key=None, limit=100, min_price=None, max_price=None,
+                        sort='id', amenities=(), any_amenities=()):
+        """
+        Retrieve one page of places, optionally within a price range,
+        sorted by sort ('id', 'price', 'created_at'; prefix '-' for
+        descending). after_key is the page_key of the previous page's last
+        place in that order; limit=None returns every match. amenities
+        keeps the places having all of these amenity ids, any_amenities
+        those having at least one of them.
+        """
+        ranges = None
+        if min_price is not None or max_price is not None:
+            ranges = {'price': (min_price, max_price)}
+        order_by, descending = sort.lstrip('-'), sort.startswith('-')
+        if amenities or any_amenities:
+            matches = self.place_amenities.match(amenities, any_amenities)
+
+            def has_amenities(place):
+                # the bitmap is re-checked against the place itself: its
+                # ordinals may have been reused since match()
+                amenity_ids = self._amenity_ids(place)
+                return (amenity_ids.issuperset(amenities)
+                        and (not any_amenities or not amenity_ids.isdisjoint(any_amenities)))
+            return self._amenity_page(matches, has_amenities, after_key, limit, order_by,
+                                      descending, ranges)
+        return self.place_repo.iter_page(after_key, limit, order_by,
+                                         descending=descending, ranges=ranges)
+
+    @staticmethod
+    def _amenity_ids(place):
+        return {amenity.id for amenity in place.amenities}
+
+    def _amenity_page(self, matches, has_amenities, after_key, limit, order_by, descending,
+                      ranges):
+        """
+        One page of the places in the amenity bitmap matches that pass
+        has_amenities. When the matches are dense enough that a page is
+        reached after a short walk of an ordered index, walk it testing
+        each place against the bitmap; otherwise stream the matching places
+        into the page selection, which only ever holds limit of them.
+        """
+        count = self.place_amenities.count(matches)
+        if (limit is not None and order_by != 'id'
+                and count * count > limit * len(self.place_amenities)):
+            chunk = max(4 * limit, 256)
+            page = []
+            while len(page) < limit:
+                rows = self.place_repo.iter_page(after_key, chunk, order_by, descending, ranges)
+                page.extend(place for place in rows
+                            if self.place_amenities.contains(matches, place.id)
+                            and has_amenities(place))
+                if len(rows) < chunk:
+                    break
+                after_key = page_key(rows[-1], order_by)
+            return page[:limit]
+
+        place_ids = self.place_amenities.iter_ids(matches)
+        places = (place for batch in iter(lambda: list(islice(place_ids, 1000)), [])
+                  for place in self.place_repo.get_many(batch)
+                  if place and has_amenities(place))
+        return select_page(places, after_key, limit, order_by, descending, ranges)
+
     def update_place(self, place_id, place_data):
         place = self.place_repo.get(place_id)
         if not place:
             return None
-        for key, value in place_data.items():
-            if hasattr(place, key) and key != 'owner':  # Don't allow owner changes
-                setattr(place, key, value)
-        self.place_repo.update(place_id, place)
+        # Don't allow owner changes
+        changes = {key: value for key, value in place_data.items() if key != 'owner'}
+        # hold the place so concurrent moves reach the location index in order
+        with self.place_repo.lock(place_id):
+            self.place_repo.update(place_id, changes)
+            if 'latitude' in changes or 'longitude' in changes:
+                self.place_geo.insert(place.id, place.latitude, place.longitude)
+            if 'title' in changes or 'description' in changes:
+                self._index_place_text(place)
+        self._wrote('Place')
         return place
 
+    def delete_place(self, place_id):
+        """Delete a place and its reviews, in O(reviews)"""
+        place = self.place_repo.get(place_id)
+        if not place:
+            return False
+        with self.place_repo.lock(place_id):
+            if self.place_repo.get(place_id) is None:
+                return False  # deleted concurrently
+            reviews = list(place.reviews)
+            self.review_repo.delete_many(review.id for review in reviews)
+            self.place_repo.delete(place_id)
+            # under the place lock, so the amenities cannot change meanwhile
+            self.place_amenities.remove(place_id, [amenity.id for amenity in place.amenities])
+        self._count_ratings(-place.rating_count, -place.rating_sum)
+        for review in reviews:
+            self.reviews_by_user.remove(review.user.id, review.id)
+            self.place_text.remove(review.id)
+        self.places_by_owner.remove(place.owner.id, place_id)
+        self.place_geo.remove(place_id)
+        self.place_text.remove(f"{place_id}:title")
+        self.place_text.remove(f"{place_id}:description")
+        self._wrote('Place', 'Review')
+        return True
+
+    def add_place_amenity(self, place_id, amenity_id):
+        """Give a place an amenity; returns the place, or None if either is unknown"""
+        place, amenity = self.get_place(place_id), self.get_amenity(amenity_id)
+        if not place or not amenity:
+            return None
+        with self.place_repo.lock(place_id):
+            if self.place_repo.get(place_id) is None:
+                return None  # deleted concurrently
+            place.add_amenity(amenity)
+            self.place_repo.update(place_id, {})
+            self.place_amenities.add(place_id, amenity_id)
+        self._wrote('Place')
+        return place
+
+    def remove_place_amenity(self, place_id, amenity_id):
+        """Take an amenity away from a place; returns the place, or None if either is unknown"""
+        place, amenity = self.get_place(place_id), self.get_amenity(amenity_id)
+        if not place or not amenity:
+            return None
+        with self.place_repo.lock(place_id):
+            if self.place_repo.get(place_id) is None:
+                return None  # deleted concurrently
+            place.remove_amenity(amenity)
+            self.place_repo.update(place_id, {})
+            self.place_amenities.discard(place_id, amenity_id)
+        self._wrote('Place')
+        return place
+
+    def get_places_within(self, latitude, longitude, radius_km, limit=100):
+        """Places within radius_km of a point as [(place, distance_km)], nearest first"""
+        return self._with_places(self.place_geo.within(latitude, longitude, radius_km, limit))
+
+    def get_nearest_places(self, latitude, longitude, k=10):
+        """The k places nearest to a point as [(place, distance_km)], nearest first"""
+        return self._with_places(self.place_geo.nearest(latitude, longitude, k))
+
+    def search_places(self, query, limit=20, prefix=False):
+        """
+        Places whose title, description or reviews match query, as
+        [(place, score)] best first (BM25; title words weigh most). With
+        prefix=True the last query word also matches longer words.
+        """
+        return self._with_places(self.place_text.search(query, limit, prefix))
+
+    def _with_places(self, matches):
+        places = self.place_repo.get_many(obj_id for _, obj_id in matches)
+        return [(place, distance) for place, (distance, _) in zip(places, matches) if place]
+
+    def _index_place_text(self, place):
+        self.place_text.put(f"{place.id}:title", place.id, place.title, weight=3)
+        self.place_text.put(f"{place.id}:description", place.id, place.description)
+
+    def _index_review_text(self, review):
+        self.place_text.put(review.id, review.place.id, review.text)
+
+    # Rating aggregates
+    def _count_ratings(self, count, total):
+        with self._rating_lock:
+            self._rating_count += count
+            self._rating_sum += total
+
+    def rating_prior(self):
+        """(mean, weight) of the Bayesian place ratings: the mean of every review"""
+        with self._rating_lock:
+            count, total = self._rating_count, self._rating_sum
+        return (total / count if count else 3.0), self.rating_prior_weight
+
+    def check_rating_aggregates(self, repair=False):
+        """
+        Recompute every place's rating aggregates from the reviews and
+        return {place_id: (stored, expected)} for those that differ, each
+        a (count, sum, histogram) tuple. With repair=True the stored
+        aggregates (and the overall totals) are replaced by the expected
+        ones.
+        """
+        expected = {}
+        for review in self.review_repo.iter_all():
+            aggregate = expected.setdefault(review.place.id, [0, 0, [0] * 5])
+            aggregate[0] += 1
+            aggregate[1] += review.rating
+            aggregate[2][review.rating - 1] += 1
+
+        mismatches = {}
+        total_count = total_sum = 0
+        for place in self.place_repo.iter_all():
+            count, total, histogram = expected.get(place.id, (0, 0, [0] * 5))
+            total_count += count
+            total_sum += total
+            stored = (place.rating_count, place.rating_sum, list(place.rating_histogram))
+            if stored != (count, total, histogram):
+                mismatches[place.id] = (stored, (count, total, histogram))
+                if repair:
+                    with self.place_repo.lock(place.id):
+                        place.rating_count, place.rating_sum = count, total
+                        place.rating_histogram = histogram
+                        self.place_repo.update(place.id, {})
+        if repair:
+            with self._rating_lock:
+                self._rating_count, self._rating_sum = total_count, total_sum
+            self._wrote('Place')
+        return mismatches
+
     # Review methods
     def create_review(self, review_data):
         # Get user and place from repos
@@ -115,36 +599,121 @@ class HBnBFacade:
         review_data['place'] = place
         
         review = Review(**review_data)
-        self.review_repo.add(review)
-        
-        # Add review to place
-        place.add_review(review)
-        
+
+        # hold the place while its review list changes
+        with self.place_repo.lock(place.id):
+            if self.place_repo.get(place.id) is None:
+                return None  # place deleted concurrently
+            self.review_repo.add(review)
+            place.add_review(review)
+            self.place_repo.update(place.id, {})
+            # under the lock, so a concurrent delete_review removes it after
+            self._index_review_text(review)
+        self._count_ratings(1, review.rating)
+        self.reviews_by_user.add(user.id, review.id)
+        self._wrote('Review', 'Place')
+
         return review
 
+    def create_reviews(self, reviews_data):
+        """
+        Create many reviews with one repository batch. Users and places are
+        fetched once for the whole batch, and every affected place is locked
+        and saved once; an unknown user or place id raises ValueError and
+        nothing is created.
+        """
+        reviews_data = [dict(review_data) for review_data in reviews_data]
+        user_ids = {review_data['user_id'] for review_data in reviews_data}
+        place_ids = {review_data['place_id'] for review_data in reviews_data}
+        users = dict(zip(user_ids, self.user_repo.get_many(user_ids)))
+        places = dict(zip(place_ids, self.place_repo.get_many(place_ids)))
+
+        reviews = []
+        for review_data in reviews_data:
+            user = users[review_data.pop('user_id')]
+            place = places[review_data.pop('place_id')]
+            if not user or not place:
+                raise ValueError("User or place not found")
+            reviews.append(Review(user=user, place=place, **review_data))
+
+        # same lock order as create_review: places first, then reviews
+        with self.place_repo.lock_many(place_ids):
+            if not all(self.place_repo.get_many(place_ids)):
+                raise ValueError("User or place not found")  # place deleted concurrently
+            self.review_repo.add_many(reviews)
+            for review in reviews:
+                review.place.add_review(review)
+            self.place_repo.update_many((place_id, {}) for place_id in place_ids)
+            for review in reviews:
+                self._index_review_text(review)
+        self._count_ratings(len(reviews), sum(review.rating for review in reviews))
+        self.reviews_by_user.add_many((review.user.id, review.id) for review in reviews)
+        self._wrote('Review', 'Place')
+
+        return reviews
+
     def get_review(self, review_id):
         return self.review_repo.get(review_id)
 
     def get_all_reviews(self):
         return self.review_repo.get_all()
 
+    def get_reviews_page(self, after_id=None, limit=100):
+        return self.review_repo.iter_page(after_id, limit)
+
     def update_review(self, review_id, review_data):
         review = self.review_repo.get(review_id)
         if not review:
             return None
-        for key, value in review_data.items():
-            if hasattr(review, key) and key not in ['user', 'place']:  # Don't allow user/place changes
-                setattr(review, key, value)
-        self.review_repo.update(review_id, review)
+        # Don't allow user/place changes
+        changes = {key: value for key, value in review_data.items() if key not in ['user', 'place']}
+        # hold the place while its rating aggregates change (place first,
+        # as in create_review)
+        with self.place_repo.lock(review.place.id):
+            if self.review_repo.get(review_id) is None:
+                return None  # deleted concurrently
+            old_rating = review.rating
+            self.review_repo.update(review_id, changes)
+            if review.rating != old_rating:
+                review.place.change_rating(old_rating, review.rating)
+                self.place_repo.update(review.place.id, {})
+                self._count_ratings(0, review.rating - old_rating)
+            # under the lock, so a concurrent delete_review removes it after
+            if 'text' in changes:
+                self._index_review_text(review)
+        self._wrote('Review', 'Place')
         return review
 
+    def _delete_reviews(self, reviews):
+        """Delete reviews of any places, locking and saving each place once"""
+        place_ids = {review.place.id for review in reviews}
+        with self.place_repo.lock_many(place_ids):
+            # skip the reviews deleted concurrently
+            reviews = [review for review in reviews if review.place.remove_review(review)]
+            self.review_repo.delete_many(review.id for review in reviews)
+            self.place_repo.update_many(
+                (place_id, {}) for place_id in {review.place.id for review in reviews})
+            for review in reviews:
+                self.place_text.remove(review.id)
+        self._count_ratings(-len(reviews), -sum(review.rating for review in reviews))
+        for review in reviews:
+            self.reviews_by_user.remove(review.user.id, review.id)
+        self._wrote('Review', 'Place')
+
     def delete_review(self, review_id):
         review = self.review_repo.get(review_id)
         if not review:
             return False
-        # Remove from place's reviews list
-        if review in review.place.reviews:
-            review.place.reviews.remove(review)
-            review.place.save()
-        self.review_repo.delete(review_id)
+        # locks are always taken place first, then review (as in create_review)
+        with self.place_repo.lock(review.place.id), self.review_repo.lock(review_id):
+            if self.review_repo.get(review_id) is None:
+                return False  # deleted concurrently
+            # Remove from place's reviews list
+            if review.place.remove_review(review):
+                self.place_repo.update(review.place.id, {})
+                self._count_ratings(-1, -review.rating)
+            self.review_repo.delete(review_id)
+            self.reviews_by_user.remove(review.user.id, review_id)
+            self.place_text.remove(review_id)
+        self._wrote('Review', 'Place')
         return True
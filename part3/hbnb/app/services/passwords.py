@@ -0,0 +1,118 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import bcrypt
+
+
+class PasswordPoolBusy(Exception):
+    """Raised when every password worker is busy and the queue is full."""
+
+
+class PasswordHasher:
+    """
+    bcrypt hashing and verification, run in a bounded process pool.
+
+    A bcrypt hash is hundreds of milliseconds of CPU by design. Doing it
+    in worker processes keeps that CPU off the web process, and the
+    workers run at a lower scheduling priority, so the OS keeps serving
+    other requests first when the machine is busy. The calling thread
+    just waits for its result.
+
+    At most pool_size + queue_limit operations are in flight; beyond
+    that hash() and verify() raise PasswordPoolBusy at once instead of
+    queueing without bound. pool_size=0 hashes on the calling thread
+    (the default until init_app()).
+
+    If a worker dies, the pool is retired (broken is set) and operations
+    run on the calling threads from then on, still bounded the same way:
+    a new pool would have to be forked from a threaded server, so only
+    configure(), called at startup, creates one.
+    """
+    def __init__(self, rounds=12, pool_size=0, queue_limit=0, worker_nice=10):
+        self._pool = None
+        self._retire_lock = threading.Lock()
+        self.configure(rounds, pool_size, queue_limit, worker_nice)
+
+    def init_app(self, app):
+        """Configure from the Flask app configuration"""
+        self.configure(rounds=app.config.get('BCRYPT_LOG_ROUNDS', 12),
+                       pool_size=app.config.get('PASSWORD_POOL_SIZE', 0),
+                       queue_limit=app.config.get('PASSWORD_QUEUE_LIMIT', 0),
+                       worker_nice=app.config.get('PASSWORD_WORKER_NICE', 10))
+
+    def configure(self, rounds=12, pool_size=0, queue_limit=0, worker_nice=10):
+        """
+        (Re)create the pool. Its workers are all started here, so they are
+        forked before the application starts threads of its own.
+
+        Args:
+            rounds (int): bcrypt cost factor (log2 of the iterations)
+            pool_size (int): worker processes; 0 hashes on the calling thread
+            queue_limit (int): operations that may wait for a busy worker
+            worker_nice (int): niceness added to the workers' priority
+        """
+        self.close()
+        self.rounds = rounds
+        self.pool_size = pool_size
+        self.queue_limit = queue_limit
+        self.worker_nice = worker_nice
+        self.rejected = 0
+        self.broken = False
+        self._slots = threading.BoundedSemaphore(pool_size + queue_limit) if pool_size else None
+        if pool_size:
+            self._pool = ProcessPoolExecutor(
+                pool_size, mp_context=multiprocessing.get_context('fork'),
+                initializer=os.nice, initargs=(worker_nice,))
+            # the pool forks a worker per submit until it is full
+            for future in [self._pool.submit(os.getpid) for _ in range(pool_size)]:
+                future.result()
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def _retire(self, pool):
+        """Stop using pool after a worker died; the first caller shuts it down"""
+        with self._retire_lock:
+            if self._pool is not pool:
+                return
+            self._pool = None
+            self.broken = True
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, func, *args):
+        pool, slots = self._pool, self._slots
+        if slots is None:
+            return func(*args)
+        if not slots.acquire(blocking=False):
+            self.rejected += 1
+            raise PasswordPoolBusy("Too many password operations in progress")
+        try:
+            if pool is not None:
+                try:
+                    future = pool.submit(func, *args)
+                except (BrokenProcessPool, RuntimeError):
+                    # broken, or already shut down by another caller's _retire()
+                    self._retire(pool)
+                else:
+                    try:
+                        return future.result()
+                    except BrokenProcessPool:
+                        self._retire(pool)
+            # no pool (any more): run here, within the same bound
+            return func(*args)
+        finally:
+            slots.release()
+
+    def hash(self, password):
+        """bcrypt hash of password, as a str"""
+        salt = bcrypt.gensalt(self.rounds)
+        return self._run(bcrypt.hashpw, password.encode('utf-8'), salt).decode('utf-8')
+
+    def verify(self, password, hashed):
+        """True if password matches the bcrypt hash hashed"""
+        return self._run(bcrypt.checkpw, password.encode('utf-8'), hashed.encode('utf-8'))
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark: first page of "places having all/any of these amenities"
+through the amenity bitmap index versus a scan of every place
+
+Usage: python benchmarks/bench_amenity_filter.py [places] [queries]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.persistence.repository import select_page
+from app.services.facade import HBnBFacade
+
+AMENITIES = 30
+BATCH = 10_000
+SCAN_QUERIES = 3
+
+
+def percentile(samples, fraction):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def timed(queries, run):
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        run(query)
+        latencies.append(time.perf_counter() - start)
+    return percentile(latencies, 0.5) * 1e3, percentile(latencies, 0.99) * 1e3
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    rng = random.Random(0)
+    facade = HBnBFacade()
+    owner = facade.create_user({'first_name': 'Owner', 'last_name': 'Bench',
+                                'email': f"owner.{time.time_ns()}@example.com"})
+    amenities = facade.create_amenities([{'name': f"Amenity {n}"} for n in range(AMENITIES)])
+    # amenity n is found in roughly 1 place out of n + 2
+    for offset in range(0, count, BATCH):
+        facade.create_places([
+            {'title': f"Place {n}", 'description': None, 'price': rng.randint(20, 500),
+             'latitude': 0.0, 'longitude': 0.0, 'owner_id': owner.id,
+             'amenities': [amenity.id for rank, amenity in enumerate(amenities)
+                           if rng.random() < 1 / (rank + 2)]}
+            for n in range(offset, min(count, offset + BATCH))])
+
+    ids = [amenity.id for amenity in amenities]
+    cases = {
+        'all of 2': [{'amenities': rng.sample(ids[:6], 2)} for _ in range(queries)],
+        'all of 3': [{'amenities': rng.sample(ids[:10], 3)} for _ in range(queries)],
+        'any of 3': [{'any_amenities': rng.sample(ids, 3)} for _ in range(queries)],
+    }
+
+    def scan(query):
+        wanted_all = set(query.get('amenities', ()))
+        wanted_any = set(query.get('any_amenities', ()))
+
+        def matches(place):
+            have = {amenity.id for amenity in place.amenities}
+            return wanted_all <= have and (not wanted_any or wanted_any & have)
+        places = (place for place in facade.place_repo.iter_all() if matches(place))
+        return select_page(places, None, 100, 'price')
+
+    print(f"{count} places, first page of 100 by price")
+    print(f"{'filter':>10} {'scan p50':>11} {'bitmap p50':>11} {'bitmap p99':>11}")
+    for name, filters in cases.items():
+        scan_p50, _ = timed(filters[:SCAN_QUERIES], scan)
+        p50, p99 = timed(filters, lambda query: facade.get_places_page(
+            None, 100, sort='price', **query))
+        print(f"{name:>10} {scan_p50:>9.1f}ms {p50:>9.1f}ms {p99:>9.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
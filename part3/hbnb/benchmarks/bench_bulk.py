@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-entity cost of creating places one by one versus through
+the facade bulk methods, for each repository setup
+
+Usage: python benchmarks/bench_bulk.py [entities]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.facade import HBnBFacade
+
+BATCH = 1000
+
+
+def place_rows(count, owner, amenities):
+    return [{'title': f"Place {n}", 'description': None, 'price': 50, 'latitude': 0.0,
+             'longitude': 0.0, 'owner_id': owner.id,
+             'amenities': [amenity.id for amenity in amenities]}
+            for n in range(count)]
+
+
+def run(name, options, count):
+    tmpdir = tempfile.mkdtemp()
+    try:
+        results = []
+        for mode in ('single', 'bulk'):
+            setup = dict(options)
+            if setup.get('engine') == 'sqlite':
+                setup['database'] = os.path.join(tmpdir, f"{mode}.db")
+            if setup.pop('journal', False):
+                setup['journal_dir'] = os.path.join(tmpdir, mode)
+            facade = HBnBFacade(**setup)
+            owner = facade.create_user({'first_name': 'Owner', 'last_name': 'Bench',
+                                        'email': f"owner.{name}.{mode}@example.com"})
+            amenities = facade.create_amenities([{'name': f"Amenity {n}"} for n in range(3)])
+            rows = place_rows(count, owner, amenities)
+
+            start = time.perf_counter()
+            if mode == 'single':
+                for row in rows:
+                    facade.create_place(row)
+            else:
+                for offset in range(0, count, BATCH):
+                    facade.create_places(rows[offset:offset + BATCH])
+            results.append((time.perf_counter() - start) / count)
+            if facade.journal is not None:
+                facade.journal.close()
+        single, bulk = results
+        print(f"{name:>16} {single * 1e6:>10.1f}us {bulk * 1e6:>10.1f}us {single / bulk:>8.1f}x")
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print(f"{'setup':>16} {'single':>12} {'bulk':>12} {'speedup':>9}")
+    run('memory', {}, count)
+    run('memory+journal', {'journal': True, 'journal_fsync': True}, count)
+    run('sqlite', {'engine': 'sqlite'}, count)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark: deleting a user who wrote many reviews (and owns places)
+through the reverse indexes, compared with the full scan that finding
+their reviews would take without them
+
+Usage: python benchmarks/bench_cascade_delete.py [reviews] [victim_reviews]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.facade import HBnBFacade
+
+PLACES = 10_000
+USERS = 1000
+OWNED_PLACES = 50
+BATCH = 10_000
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    victim_count = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+    rng = random.Random(0)
+    run = time.time_ns()
+    facade = HBnBFacade()
+    users = facade.create_users([{'first_name': 'Guest', 'last_name': 'Bench',
+                                  'email': f"guest{n}.{run}@example.com"}
+                                 for n in range(USERS)])
+    victim = users[0]
+    places = facade.create_places([
+        {'title': f"Place {n}", 'description': None, 'price': 50, 'latitude': 0.0,
+         'longitude': 0.0,
+         'owner_id': (victim if n < OWNED_PLACES else users[1 + n % (USERS - 1)]).id}
+        for n in range(PLACES)])
+    authors = [victim] * victim_count + [users[1 + n % (USERS - 1)]
+                                         for n in range(count - victim_count)]
+    rng.shuffle(authors)
+    start = time.perf_counter()
+    for offset in range(0, count, BATCH):
+        facade.create_reviews([{'text': 'Nice stay', 'rating': rng.randint(1, 5),
+                                'user_id': author.id, 'place_id': rng.choice(places).id}
+                               for author in authors[offset:offset + BATCH]])
+    print(f"seeded {count} reviews in {time.perf_counter() - start:.0f}s")
+
+    owned = facade.get_places_by_owner(victim.id)
+    doomed = sum(len(place.reviews) for place in owned) + len(facade.get_reviews_by_user(victim.id))
+
+    start = time.perf_counter()
+    found = sum(1 for review in facade.review_repo.iter_all() if review.user is victim)
+    scan = time.perf_counter() - start
+
+    start = time.perf_counter()
+    facade.delete_user(victim.id)
+    elapsed = time.perf_counter() - start
+
+    print(f"user with {found} reviews and {len(owned)} places ({doomed} reviews deleted)")
+    print(f"  full scan for their reviews alone: {scan * 1e3:8.1f}ms")
+    print(f"  cascading delete_user:             {elapsed * 1e3:8.1f}ms "
+          f"({elapsed / doomed * 1e6:.1f}us per deleted review)")
+    print(f"  consistent: {facade.check_rating_aggregates() == {}} "
+          f"({len(facade.get_all_reviews())} reviews left)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark: CPU cost vs bytes saved of compressing representative API
+responses (place and review lists, a place's details) at every gzip
+level and, when brotli is installed, every br quality
+
+Usage: python benchmarks/bench_compression.py [places] [iterations]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.api.v1 import serializers
+from app.api.v1.compression import CODINGS, Compressor
+from app.api.v1.encoding import encode
+from app.models import Amenity, Place, Review, User
+
+LEVELS = {'gzip': range(1, 10), 'br': range(0, 12)}
+
+
+def build(count):
+    run = time.time_ns()
+    users = [User('Bench', f"User {n}", f"user{n}.{run}@example.com") for n in range(count // 4)]
+    amenities = [Amenity(f"Amenity {n}") for n in range(20)]
+    places, reviews = [], []
+    for n in range(count):
+        place = Place(f"Place {n}", 'A quiet place near the old harbour', 50 + n % 200,
+                      n % 90, n % 180, users[n % len(users)])
+        for k in range(5):
+            place.add_amenity(amenities[(n + k) % len(amenities)])
+        for k in range(2):
+            review = Review('Lovely stay, would come back', 1 + (n + k) % 5, place,
+                            users[(n + k) % len(users)])
+            place.add_review(review)
+            reviews.append(review)
+        places.append(place)
+    return users, places, reviews
+
+
+def bodies(places, reviews):
+    """name -> encoded response body, as the resources send it"""
+    return {
+        '100 places': encode([serializers.place_summary(p) for p in places[:100]]),
+        f"{len(places)} places": encode([serializers.place_summary(p) for p in places]),
+        f"{len(reviews)} reviews": encode([serializers.review_summary(r) for r in reviews]),
+        'place detail': encode(serializers.place_detail(places[0])),
+    }
+
+
+def per_call(action, count):
+    start = time.process_time()
+    for _ in range(count):
+        action()
+    return (time.process_time() - start) / count * 1e6
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    users, places, reviews = build(count)
+    print(f"{'body':<14} {'coding':<6} {'level':>5} {'bytes':>10} {'ratio':>6} "
+          f"{'CPU':>10} {'MB/s':>7}")
+    for name, text in bodies(places, reviews).items():
+        body = text.encode() + b"\n"
+        print(f"{name:<14} {'-':<6} {'-':>5} {len(body):>10,}")
+        for coding in CODINGS:
+            for level in LEVELS[coding]:
+                compressor = Compressor(gzip_level=level, brotli_level=level)
+                compressed = compressor.compress(body, coding)
+                cpu = per_call(lambda: compressor.compress(body, coding), iterations)
+                print(f"{'':<14} {coding:<6} {level:>5} {len(compressed):>10,} "
+                      f"{len(body) / len(compressed):5.1f}x {cpu:8.0f}us "
+                      f"{len(body) / cpu:7.0f}")
+
+    for user in users:
+        User._emails_registry.discard(user.email)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark: mixed facade workload (80% reads, 20% review create/delete)
+from 1 to 32 threads, one global lock versus 64 lock stripes
+
+Usage: python benchmarks/bench_concurrency.py [seconds]
+"""
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.facade import HBnBFacade
+
+THREADS = [1, 2, 4, 8, 16, 32]
+PLACES = 200
+
+
+def run(threads, duration, lock_stripes):
+    facade = HBnBFacade(lock_stripes=lock_stripes)
+    owner = facade.create_user({'first_name': 'Owner', 'last_name': 'Bench',
+                                'email': f"owner{threads}.{lock_stripes}@example.com"})
+    places = [facade.create_place({'title': f"Place {n}", 'description': None, 'price': 50,
+                                   'latitude': 0.0, 'longitude': 0.0, 'owner_id': owner.id})
+              for n in range(PLACES)]
+    done = []
+    stop = time.perf_counter() + duration
+
+    def worker(n):
+        rng = random.Random(n)
+        mine = []
+        count = 0
+        while time.perf_counter() < stop:
+            place = rng.choice(places)
+            if rng.random() < 0.8:
+                facade.get_place(place.id)
+                facade.get_user(owner.id)
+            elif mine and rng.random() < 0.5:
+                facade.delete_review(mine.pop())
+            else:
+                mine.append(facade.create_review({'text': 'Nice', 'rating': 4,
+                                                  'user_id': owner.id,
+                                                  'place_id': place.id}).id)
+            count += 1
+        done.append(count)
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return sum(done) / (time.perf_counter() - start)
+
+
+def main():
+    duration = float(sys.argv[1]) if len(sys.argv) > 1 else 2.0
+    print(f"{'threads':>8} {'global lock':>14} {'64 stripes':>14}")
+    for threads in THREADS:
+        single = run(threads, duration, lock_stripes=1)
+        striped = run(threads, duration, lock_stripes=64)
+        print(f"{threads:>8} {single:>12,.0f}/s {striped:>12,.0f}/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark: a polling workload (clients re-fetching the place list, place
+details and users, with an occasional update in between), with clients
+that always fetch the full body vs clients revalidating their copy with
+If-None-Match; response bytes and server CPU per request
+
+Usage: python benchmarks/bench_conditional.py [places] [polls] [polls per write]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import create_app
+from app.services import facade
+from config import Config
+
+
+def populate(count):
+    run = time.time_ns()
+    owners = [facade.create_user({'first_name': 'Bench', 'last_name': f"Owner {n}",
+                                  'email': f"owner{n}.{run}@example.com", 'password': 'pw'})
+              for n in range(max(1, count // 10))]
+    amenities = [facade.create_amenity({'name': f"Amenity {n}.{run}"}) for n in range(10)]
+    places = []
+    for n in range(count):
+        place = facade.create_place({
+            'title': f"Place {n}", 'description': 'A quiet place', 'price': 50 + n % 200,
+            'latitude': n % 90, 'longitude': n % 180, 'owner_id': owners[n % len(owners)].id,
+            'amenities': [amenities[(n + k) % len(amenities)].id for k in range(3)]})
+        places.append(place)
+    return owners, places
+
+
+def poll(client, urls, polls, write_every, writes, revalidate):
+    """(bytes received, CPU seconds, 304 count) over polls GETs"""
+    etags = {}
+    received = not_modified = 0
+    rng = random.Random(1)
+    start = time.process_time()
+    for n in range(polls):
+        if write_every and n % write_every == write_every - 1:
+            writes(rng)
+        url = rng.choice(urls)
+        headers = {'If-None-Match': etags[url]} if revalidate and url in etags else {}
+        response = client.get(url, headers=headers)
+        received += len(response.data)
+        if response.status_code == 304:
+            not_modified += 1
+        else:
+            etags[url] = response.headers.get('ETag')
+    return received, time.process_time() - start, not_modified
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    polls = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    write_every = int(sys.argv[3]) if len(sys.argv) > 3 else 50
+    config = type('BenchConfig', (Config,), {'BCRYPT_LOG_ROUNDS': 4})
+    client = create_app(config).test_client()
+    owners, places = populate(count)
+    urls = (['/api/v1/places/', '/api/v1/users/']
+            + [f"/api/v1/places/{place.id}" for place in places[:20]]
+            + [f"/api/v1/users/{owner.id}" for owner in owners[:10]])
+
+    def writes(rng):
+        place = rng.choice(places[:20])
+        facade.update_place(place.id, {'price': rng.randint(50, 250)})
+
+    print(f"{count} places, {polls} polls, a write every {write_every or 'never'}")
+    print(f"{'client':<14} {'bytes/poll':>11} {'CPU/poll':>10} {'304s':>6}")
+    results = {}
+    for label, revalidate in (('full', False), ('If-None-Match', True)):
+        best = None
+        for _ in range(3):
+            received, cpu, not_modified = poll(client, urls, polls, write_every, writes, revalidate)
+            if best is None or cpu < best[1]:
+                best = (received, cpu, not_modified)
+        received, cpu, not_modified = results[label] = best
+        print(f"{label:<14} {received / polls:>11,.0f} {cpu / polls * 1e6:8.0f}us "
+              f"{not_modified:>6}")
+    full, conditional = results['full'], results['If-None-Match']
+    print(f"saved: {1 - conditional[0] / full[0]:.0%} of bytes, "
+          f"{1 - conditional[1] / full[1]:.0%} of CPU")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Benchmark: throughput of each Repository engine
+
+Usage: python benchmarks/bench_engines.py [rows]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.models import User
+from app.persistence.repository import InMemoryRepository
+from app.persistence.sqlite_repository import SQLiteDatabase, SQLiteRepository
+
+
+def make_users(rows, tag):
+    return [User('Bench', 'User', f"{tag}{n}@example.com") for n in range(rows)]
+
+
+def run(name, repo, users):
+    repo.create_index('email', unique=True)
+    results = []
+
+    start = time.perf_counter()
+    for user in users:
+        repo.add(user)
+    results.append(('add', time.perf_counter() - start))
+
+    start = time.perf_counter()
+    for user in users:
+        repo.get(user.id)
+    results.append(('get', time.perf_counter() - start))
+
+    start = time.perf_counter()
+    for user in users:
+        repo.get_by_attribute('email', user.email)
+    results.append(('get_by_attribute', time.perf_counter() - start))
+
+    start = time.perf_counter()
+    for user in users:
+        repo.update(user.id, {'first_name': 'Renamed'})
+    results.append(('update', time.perf_counter() - start))
+
+    start = time.perf_counter()
+    repo.get_all()
+    results.append(('get_all', time.perf_counter() - start))
+
+    for op, elapsed in results:
+        count = 1 if op == 'get_all' else len(users)
+        print(f"{name:>8} {op:>18} {count / elapsed:>14,.0f} ops/s")
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    run('memory', InMemoryRepository(), make_users(rows, 'mem'))
+    with tempfile.TemporaryDirectory() as tmpdir:
+        database = SQLiteDatabase(os.path.join(tmpdir, 'bench.db'))
+        run('sqlite', SQLiteRepository(database, User), make_users(rows, 'sql'))
+        database.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark: radius and k-nearest place searches through the grid index
+versus a brute-force haversine scan, with places clustered around cities
+
+Usage: python benchmarks/bench_geo.py [places] [queries]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.persistence.geo import GeoIndex, haversine_km
+
+CITIES = 200
+BRUTE_FORCE_QUERIES = 10
+
+
+def percentile(samples, fraction):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def timed(queries, search):
+    latencies = []
+    for lat, lon in queries:
+        start = time.perf_counter()
+        search(lat, lon)
+        latencies.append(time.perf_counter() - start)
+    return percentile(latencies, 0.5) * 1e3, percentile(latencies, 0.99) * 1e3
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    rng = random.Random(0)
+    cities = [(rng.uniform(-60, 70), rng.uniform(-180, 180)) for _ in range(CITIES)]
+    points = []
+    for _ in range(count):
+        if rng.random() < 0.7:
+            lat, lon = rng.choice(cities)
+            lat = max(-90.0, min(90.0, rng.gauss(lat, 0.3)))
+            lon = (rng.gauss(lon, 0.3) + 180) % 360 - 180
+        else:
+            lat, lon = rng.uniform(-60, 70), rng.uniform(-180, 180)
+        points.append((lat, lon))
+
+    start = time.perf_counter()
+    index = GeoIndex()
+    for obj_id, (lat, lon) in enumerate(points):
+        index.insert(obj_id, lat, lon)
+    print(f"indexed {count:,} places in {time.perf_counter() - start:.1f}s")
+
+    centres = [(rng.gauss(lat, 0.2), rng.gauss(lon, 0.2)) if rng.random() < 0.7
+               else (rng.uniform(-60, 70), rng.uniform(-180, 180))
+               for lat, lon in (rng.choice(cities) for _ in range(queries))]
+
+    def brute_radius(lat, lon):
+        return sorted(d for d in (haversine_km(lat, lon, plat, plon) for plat, plon in points)
+                      if d <= 5)[:100]
+
+    def brute_nearest(lat, lon):
+        return sorted(haversine_km(lat, lon, plat, plon) for plat, plon in points)[:10]
+
+    print(f"{'search':>22} {'p50':>10} {'p99':>10}")
+    for name, search in [
+            ('radius 5 km, index', lambda lat, lon: index.within(lat, lon, 5, limit=100)),
+            ('radius 25 km, index', lambda lat, lon: index.within(lat, lon, 25, limit=100)),
+            ('10 nearest, index', lambda lat, lon: index.nearest(lat, lon, 10)),
+            ('radius 5 km, scan', brute_radius),
+            ('10 nearest, scan', brute_nearest)]:
+        sample = centres if 'index' in name else centres[:BRUTE_FORCE_QUERIES]
+        p50, p99 = timed(sample, search)
+        print(f"{name:>22} {p50:>8.3f}ms {p99:>8.3f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark: POST /api/v1/reviews/ throughput with a durable journal,
+one fsync per write versus group commit, at 1, 8 and 64 concurrent clients
+
+Usage: python benchmarks/bench_group_commit.py [seconds]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import create_app
+from app.services import facade
+
+CLIENTS = [1, 8, 64]
+
+
+def run(clients, duration, group_commit):
+    journal_dir = tempfile.mkdtemp()
+    app = create_app()
+    facade.configure(journal_dir=journal_dir, journal_fsync=True, group_commit=group_commit)
+    try:
+        owner = facade.create_user({'first_name': 'Owner', 'last_name': 'Bench',
+                                    'email': f"owner{clients}{group_commit}@example.com"})
+        place = facade.create_place({'title': 'Bench', 'description': None, 'price': 50,
+                                     'latitude': 0.0, 'longitude': 0.0, 'owner_id': owner.id})
+        guests = [facade.create_user({'first_name': 'Guest', 'last_name': 'Bench',
+                                      'email': f"guest{clients}{group_commit}{n}@example.com"})
+                  for n in range(clients)]
+
+        done = []
+        stop = time.perf_counter() + duration
+
+        def client(guest):
+            http = app.test_client()
+            count = 0
+            while time.perf_counter() < stop:
+                response = http.post('/api/v1/reviews/', json={
+                    'text': 'Nice', 'rating': 4, 'user_id': guest.id, 'place_id': place.id})
+                assert response.status_code == 201, response.get_json()
+                count += 1
+            done.append(count)
+
+        threads = [threading.Thread(target=client, args=(guest,)) for guest in guests]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        # every review POST logs two records: the review and its place
+        return sum(done) / elapsed, 2 * sum(done) / max(facade.journal.flushes, 1)
+    finally:
+        facade.configure()
+        shutil.rmtree(journal_dir)
+
+
+def main():
+    duration = float(sys.argv[1]) if len(sys.argv) > 1 else 3.0
+    print(f"{'clients':>8} {'fsync/write':>14} {'group commit':>14} {'records/fsync':>14}")
+    for clients in CLIENTS:
+        single, _ = run(clients, duration, group_commit=False)
+        grouped, per_fsync = run(clients, duration, group_commit=True)
+        print(f"{clients:>8} {single:>12,.0f}/s {grouped:>12,.0f}/s {per_fsync:>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Benchmark: id generation (uuid4 strings vs time-sortable UUIDv7, one at
+a time and in batches) and the SQLite cost of text vs 16-byte blob keys
+
+Usage: python benchmarks/bench_ids.py [rows]
+"""
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.models.ids import new_id, new_ids, id_bytes
+
+COUNT = 200_000
+LOOKUPS = 50_000
+
+
+def rate(label, make):
+    start = time.perf_counter()
+    ids = make()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<24} {elapsed / len(ids) * 1e9:8.0f}ns per id")
+    return ids
+
+
+def table_cost(ids, key, column_type):
+    """(database bytes per row, get-by-id microseconds) for one key encoding"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'ids.db')
+        conn = sqlite3.connect(path)
+        conn.execute(f'CREATE TABLE t (id {column_type} PRIMARY KEY, state TEXT NOT NULL)')
+        with conn:
+            conn.executemany('INSERT INTO t VALUES (?, ?)', ((key(i), '{}') for i in ids))
+        conn.execute('VACUUM')
+        size = os.path.getsize(path)
+        probes = random.Random(0).sample(ids, LOOKUPS)
+        start = time.perf_counter()
+        for obj_id in probes:
+            conn.execute('SELECT state FROM t WHERE id = ?', (key(obj_id),)).fetchone()
+        elapsed = time.perf_counter() - start
+        conn.close()
+    return size / len(ids), elapsed / LOOKUPS * 1e6
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    print(f"generating {COUNT} ids")
+    rate('str(uuid.uuid4())', lambda: [str(uuid.uuid4()) for _ in range(COUNT)])
+    rate('new_id()', lambda: [new_id() for _ in range(COUNT)])
+    rate('new_ids(1000)', lambda: [i for _ in range(COUNT // 1000) for i in new_ids(1000)])
+
+    print(f"SQLite table of {rows} rows")
+    ids = new_ids(rows)
+    for label, key, column_type in (('TEXT ids', str, 'TEXT'),
+                                    ('BLOB ids', id_bytes, 'BLOB')):
+        per_row, lookup = table_cost(ids, key, column_type)
+        print(f"  {label:<24} {per_row:6.1f} bytes/row  get {lookup:5.1f}us")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Benchmark: InMemoryRepository.get_by_attribute with and without an index
+
+Usage: python benchmarks/bench_index_lookup.py [rows ...]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.persistence.repository import InMemoryRepository
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+
+
+class Row:
+    __slots__ = ('id', 'email')
+
+    def __init__(self, n):
+        self.id = str(n)
+        self.email = f"user{n}@example.com"
+
+
+def build(rows, indexed):
+    repo = InMemoryRepository()
+    if indexed:
+        repo.create_index('email', unique=True)
+    for n in range(rows):
+        repo.add(Row(n))
+    return repo
+
+
+def time_lookups(repo, rows, lookups):
+    # spread probes over the table so the scan cost is representative
+    step = max(rows // lookups, 1)
+    probes = [f"user{n}@example.com" for n in range(0, rows, step)][:lookups]
+    start = time.perf_counter()
+    for email in probes:
+        repo.get_by_attribute('email', email)
+    return (time.perf_counter() - start) / len(probes)
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+    print(f"{'rows':>10} {'scan (us)':>14} {'index (us)':>14} {'speedup':>10}")
+    for rows in sizes:
+        scan = time_lookups(build(rows, indexed=False), rows, lookups=20)
+        indexed = time_lookups(build(rows, indexed=True), rows, lookups=10_000)
+        print(f"{rows:>10} {scan * 1e6:>14.1f} {indexed * 1e6:>14.3f} {scan / indexed:>9.0f}x")
+
+
+if __name__ == '__main__':
+    main()
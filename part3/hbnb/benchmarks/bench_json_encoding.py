@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark: encoding representative response bodies with json.dumps (what
+flask_restx does) vs the fragment encoder, with the fragments' text
+cached (warm) and encoded for the first time (cold); compact and with
+the indent of 4 used in debug mode
+
+Usage: python benchmarks/bench_json_encoding.py [places] [iterations]
+"""
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.api.v1 import serializers
+from app.api.v1.encoding import encode
+from app.models import Amenity, Place, Review, User
+
+
+def build(count):
+    run = time.time_ns()
+    users = [User('Bench', f"User {n}", f"user{n}.{run}@example.com") for n in range(count // 4)]
+    amenities = [Amenity(f"Amenity {n}") for n in range(20)]
+    places, reviews = [], []
+    for n in range(count):
+        place = Place(f"Place {n}", 'A quiet place', 50 + n % 200, n % 90, n % 180,
+                      users[n % len(users)])
+        for k in range(5):
+            place.add_amenity(amenities[(n + k) % len(amenities)])
+        for k in range(2):
+            review = Review('Lovely stay', 1 + (n + k) % 5, place, users[(n + k) % len(users)])
+            place.add_review(review)
+            reviews.append(review)
+        places.append(place)
+    return users, places, reviews
+
+
+def payloads(users, places, reviews):
+    """name -> function building the response body, as the resources do"""
+    return {
+        '100 places': lambda: [serializers.place_summary(p) for p in places[:100]],
+        f"{len(places)} places": lambda: [serializers.place_summary(p) for p in places],
+        '100 reviews': lambda: [serializers.review_summary(r) for r in reviews[:100]],
+        '100 users': lambda: [serializers.user_summary(u) for u in users[:100]],
+        'place detail': lambda: serializers.place_detail(places[0]),
+        'error': lambda: {'message': 'Input payload validation failed',
+                          'errors': {'price': "'x' is not of type 'number'"}},
+    }
+
+
+def drop_caches(objects):
+    for obj in objects:
+        try:
+            del obj._serialized
+        except AttributeError:
+            pass
+
+
+def per_call(action, count, reset=None):
+    elapsed = 0.0
+    for _ in range(count):
+        if reset:
+            reset()
+        start = time.perf_counter()
+        action()
+        elapsed += time.perf_counter() - start
+    return elapsed / count * 1e6
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    users, places, reviews = build(count)
+    everything = users + places + reviews + [a for p in places for a in p.amenities]
+    print(f"{'payload':<14} {'indent':>6} {'bytes':>9} {'json.dumps':>11} "
+          f"{'cold':>10} {'warm':>10} {'speedup':>8}")
+    for name, body in payloads(users, places, reviews).items():
+        for indent in (None, 4):
+            data = body()
+            assert encode(data, indent) == json.dumps(data, indent=indent)
+            size = len(json.dumps(data, indent=indent))
+            stdlib = per_call(lambda: json.dumps(body(), indent=indent), iterations)
+            cold = per_call(lambda: encode(body(), indent), iterations,
+                            lambda: drop_caches(everything))
+            encode(body(), indent)
+            warm = per_call(lambda: encode(body(), indent), iterations)
+            print(f"{name:<14} {str(indent):>6} {size:>9,} {stdlib:9.0f}us "
+                  f"{cold:8.0f}us {warm:8.0f}us {stdlib / warm:7.1f}x")
+
+    for user in users:
+        User._emails_registry.discard(user.email)
+
+
+if __name__ == '__main__':
+    main()
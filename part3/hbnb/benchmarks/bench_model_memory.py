@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark: bytes of memory per entity for each model type, with the
+relationships a typical dataset has (a few amenities per place, reviews
+spread over places)
+
+Usage: python benchmarks/bench_model_memory.py [entities]
+"""
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.models import User, Place, Review, Amenity
+
+FIRST_NAMES = ['Alice', 'Bob', 'Chloe', 'David', 'Emma', 'Farid', 'Grace', 'Hugo']
+AMENITY_NAMES = ['WiFi', 'Pool', 'Parking', 'Kitchen', 'Bathtub', 'Heating']
+
+
+def measure(make, count):
+    """Average traced bytes per object kept alive by make(n)"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [make(n) for n in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # the list holding the objects is not part of their cost
+    return (after - before - sys.getsizeof(kept)) / count, kept
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rng = random.Random(0)
+    run = time.time_ns()
+    # names arrive from JSON payloads as fresh string objects, not literals
+    fresh = lambda name: ''.join(list(name))
+
+    results = {}
+    results['User'], users = measure(lambda n: User(
+        first_name=fresh(rng.choice(FIRST_NAMES)), last_name=f"Surname{n % 1000}",
+        email=f"user{n}.{run}@example.com"), count)
+    results['Amenity'], amenities = measure(
+        lambda n: Amenity(fresh(AMENITY_NAMES[n % len(AMENITY_NAMES)])), count)
+
+    def make_place(n):
+        place = Place(title=f"Place {n}", description=None, price=80.0, latitude=1.5,
+                      longitude=2.5, owner=users[n % len(users)])
+        for amenity in rng.sample(amenities[:len(AMENITY_NAMES)], 3):
+            place.add_amenity(amenity)
+        return place
+    results['Place'], places = measure(make_place, count)
+
+    def make_review(n):
+        place = places[n % (len(places) // 10)]  # 10 reviews per place
+        review = Review(text='Lovely stay', rating=1 + n % 5, place=place,
+                        user=users[n % len(users)])
+        place.add_review(review)
+        return review
+    results['Review'], _ = measure(make_review, count)
+
+    print(f"{'model':>8} {'bytes/entity':>13}")
+    for name, size in results.items():
+        print(f"{name:>8} {size:>13.0f}")
+    for user in users:
+        User._emails_registry.discard(user.email)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Benchmark: model construction and update() throughput, i.e. the cost of
+validating fields on the way in
+
+Usage: python benchmarks/bench_model_validation.py [iterations]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.models import User, Place, Review, Amenity
+
+
+def throughput(label, action, count):
+    start = time.perf_counter()
+    for n in range(count):
+        action(n)
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<22} {count / elapsed:>12,.0f}/s {elapsed / count * 1e6:8.2f}us")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    run = time.time_ns()
+    owner = User('Bench', 'Owner', f"owner.{run}@example.com")
+    place = Place('Loft', None, 100, 10.0, 20.0, owner)
+    review = Review('Nice', 4, place, owner)
+    amenity = Amenity(f"Sauna {run}")
+    users = []
+
+    def make_user(n):
+        users.append(User('Alice', 'Smith', f"user{n}.{run}@example.com"))
+
+    print("construction")
+    throughput('User', make_user, count)
+    throughput('Amenity', lambda n: Amenity('WiFi'), count)
+    throughput('Place', lambda n: Place('Loft', 'Quiet', 100, 10.0, 20.0, owner), count)
+    throughput('Review', lambda n: Review('Lovely stay', 5, place, owner), count)
+
+    print("update()")
+    throughput('User (names)', lambda n: users[n].update(
+        {'first_name': 'Bob', 'last_name': 'Jones'}), count)
+    throughput('Amenity (name)', lambda n: amenity.update({'name': f"Sauna {run}"}), count)
+    throughput('Place (4 fields)', lambda n: place.update(
+        {'title': 'Loft', 'price': 120, 'latitude': 11.5, 'longitude': 21.5}), count)
+    throughput('Review (text, rating)', lambda n: review.update(
+        {'text': 'Great', 'rating': 5}), count)
+
+    for user in users + [owner]:
+        User._emails_registry.discard(user.email)
+
+
+if __name__ == '__main__':
+    main()
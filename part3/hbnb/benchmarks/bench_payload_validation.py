@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Benchmark: request payload validation per model, flask_restx's
+per-request jsonschema validation vs the validators compiled at startup
+
+Usage: python benchmarks/bench_payload_validation.py [iterations]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from werkzeug.exceptions import HTTPException
+
+from app.api.v1.amenities import amenity_model
+from app.api.v1.places import place_model
+from app.api.v1.reviews import review_model
+from app.api.v1.users import user_model, user_update_model
+from app.api.v1.validation import compile_payload
+
+ID = '0190a1b2-c3d4-7e5f-8a6b-7c8d9e0f1a2b'
+PAYLOADS = [
+    (user_model, {'first_name': 'Alice', 'last_name': 'Smith',
+                  'email': 'alice@example.com', 'password': 'secret'}),
+    (user_update_model, {'last_name': 'Jones'}),
+    (amenity_model, {'name': 'WiFi'}),
+    (place_model, {'title': 'Loft', 'description': 'Quiet', 'price': 120.0,
+                   'latitude': 48.85, 'longitude': 2.35, 'owner_id': ID,
+                   'amenities': [ID, ID, ID]}),
+    (review_model, {'text': 'Lovely stay', 'rating': 5, 'user_id': ID, 'place_id': ID}),
+]
+
+
+def jsonschema_validate(model, payload):
+    try:
+        model.validate(payload)
+    except HTTPException:
+        pass
+
+
+def per_call(action, count):
+    start = time.perf_counter()
+    for _ in range(count):
+        action()
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    print(f"{'model':<12} {'payload':<8} {'jsonschema':>11} {'compiled':>10} {'speedup':>8}")
+    for model, valid in PAYLOADS:
+        validate = compile_payload(model)
+        # the same payload with every field of the wrong type
+        invalid = {name: [] if isinstance(value, str) else 'x' for name, value in valid.items()}
+        for label, payload in (('valid', valid), ('invalid', invalid)):
+            generic = per_call(lambda: jsonschema_validate(model, payload), count)
+            compiled = per_call(lambda: validate(payload), count)
+            print(f"{model.name:<12} {label:<8} {generic:9.1f}us {compiled:8.2f}us "
+                  f"{generic / compiled:7.0f}x")
+
+
+if __name__ == '__main__':
+    main()
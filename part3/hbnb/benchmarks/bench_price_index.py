@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Benchmark: one page of places in a price range, sorted by price, through
+the ordered price index versus filtering and sorting every place
+
+Usage: python benchmarks/bench_price_index.py [places]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.facade import HBnBFacade
+
+QUERIES = 200
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rng = random.Random(0)
+    facade = HBnBFacade()
+    owner = facade.create_user({'first_name': 'Owner', 'last_name': 'Bench',
+                                'email': 'price.owner@example.com'})
+    for start in range(0, count, 1000):
+        facade.create_places([
+            {'title': f"Place {n}", 'description': None, 'price': rng.uniform(10, 1000),
+             'latitude': 0.0, 'longitude': 0.0, 'owner_id': owner.id}
+            for n in range(start, min(start + 1000, count))])
+    ranges = [(low, low + rng.uniform(1, 200))
+              for low in (rng.uniform(10, 800) for _ in range(QUERIES))]
+
+    start = time.perf_counter()
+    for low, high in ranges:
+        matches = [p for p in facade.get_all_places() if low <= p.price <= high]
+        sorted(matches, key=lambda p: (p.price, p.id))[:20]
+    scan = (time.perf_counter() - start) / QUERIES
+
+    start = time.perf_counter()
+    for low, high in ranges:
+        facade.get_places_page(None, 20, min_price=low, max_price=high, sort='price')
+    indexed = (time.perf_counter() - start) / QUERIES
+
+    print(f"{count:,} places, first page of 20 in a random price range")
+    print(f"{'full scan':>12} {scan * 1e3:>10.3f} ms/query")
+    print(f"{'price index':>12} {indexed * 1e3:>10.3f} ms/query  ({scan / indexed:,.0f}x)")
+
+
+if __name__ == '__main__':
+    main()
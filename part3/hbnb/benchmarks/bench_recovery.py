@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark: restart time of the journaled in-memory store
+
+Writes N places and N reviews through a journal, then measures recovery
+from the log alone and from a snapshot plus a short log tail.
+
+Usage: python benchmarks/bench_recovery.py [places]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.models import User, Place, Review, Amenity
+from app.persistence.repository import InMemoryRepository
+from app.persistence.journal import Journal, JournaledRepository
+
+MODEL_NAMES = ('User', 'Place', 'Review', 'Amenity')
+
+
+def open_store(directory):
+    journal = Journal(directory, fsync=False)
+    raw = {name: InMemoryRepository() for name in MODEL_NAMES}
+    restored = journal.recover(raw)
+    repos = {name: JournaledRepository(repo, journal, name) for name, repo in raw.items()}
+    return journal, repos, restored
+
+
+def populate(directory, places):
+    journal, repos, _ = open_store(directory)
+    users = [User('Bench', 'User', f"recovery{n}@example.com") for n in range(1000)]
+    for user in users:
+        repos['User'].add(user)
+    wifi = Amenity('WiFi')
+    repos['Amenity'].add(wifi)
+    for n in range(places):
+        place = Place(f"Place {n}", 'Bench place', 100.0, 0.0, 0.0, users[n % len(users)])
+        place.amenities.append(wifi)
+        repos['Place'].add(place)
+        review = Review('Lovely', 5, place, users[(n + 1) % len(users)])
+        repos['Review'].add(review)
+    return journal, repos
+
+
+def time_recovery(directory):
+    start = time.perf_counter()
+    journal, _, restored = open_store(directory)
+    elapsed = time.perf_counter() - start
+    journal.close()
+    return restored, elapsed
+
+
+def main():
+    places = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    tmpdir = tempfile.mkdtemp()
+    try:
+        start = time.perf_counter()
+        journal, repos = populate(tmpdir, places)
+        print(f"populate: {time.perf_counter() - start:.1f}s")
+
+        restored, elapsed = time_recovery(tmpdir)
+        print(f"recover from log only: {restored:,} entities in {elapsed:.2f}s")
+
+        start = time.perf_counter()
+        journal.snapshot(repos)
+        print(f"snapshot: {time.perf_counter() - start:.1f}s")
+        for n in range(places // 100):
+            repos['Amenity'].add(Amenity(f"Tail {n}"))
+        journal.close()
+
+        restored, elapsed = time_recovery(tmpdir)
+        print(f"recover from snapshot + 1% tail: {restored:,} entities in {elapsed:.2f}s")
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark: read-mostly GET throughput (place list, amenity list, place
+details) with the response cache off and on, with a write (a new review
+or a price change) every so many requests; hit/miss counts of the cache
+
+Usage: python benchmarks/bench_response_cache.py [places] [requests] [requests per write]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import create_app
+from app.services import facade
+from config import Config
+
+
+def populate(count):
+    run = time.time_ns()
+    users = [facade.create_user({'first_name': 'Bench', 'last_name': f"User {n}",
+                                 'email': f"user{n}.{run}@example.com", 'password': 'pw'})
+             for n in range(max(2, count // 10))]
+    amenities = [facade.create_amenity({'name': f"Amenity {n}.{run}"}) for n in range(20)]
+    places = [facade.create_place({
+        'title': f"Place {n}", 'description': 'A quiet place', 'price': 50 + n % 200,
+        'latitude': n % 90, 'longitude': n % 180, 'owner_id': users[n % len(users)].id,
+        'amenities': [amenities[(n + k) % len(amenities)].id for k in range(3)]})
+        for n in range(count)]
+    return users, places
+
+
+def run(client, urls, requests, write_every, write):
+    rng = random.Random(1)
+    start = time.perf_counter()
+    for n in range(requests):
+        if write_every and n % write_every == write_every - 1:
+            write(rng)
+        response = client.get(rng.choice(urls))
+        assert response.status_code == 200, response.status_code
+    return requests / (time.perf_counter() - start)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    write_every = int(sys.argv[3]) if len(sys.argv) > 3 else 100
+    base = type('BenchConfig', (Config,), {'BCRYPT_LOG_ROUNDS': 4, 'PASSWORD_POOL_SIZE': 0})
+    apps = {label: create_app(type('BenchConfig', (base,), {'RESPONSE_CACHE_BYTES': size}))
+            for label, size in (('off', 0), ('on', 32 * 1024 * 1024))}
+    users, places = populate(count)
+    hot = places[:50]
+    # mostly detail pages, some list pages (the whole list and its first page)
+    urls = ([f"/api/v1/places/{place.id}" for place in hot] * 4
+            + ['/api/v1/places/', '/api/v1/places/?limit=50', '/api/v1/amenities/'] * 10)
+
+    def write(rng):
+        place = rng.choice(hot)
+        if rng.random() < 0.5:
+            reviewer = rng.choice([user for user in users if user is not place.owner])
+            facade.create_review({'text': 'Nice', 'rating': rng.randint(1, 5),
+                                  'user_id': reviewer.id, 'place_id': place.id})
+        else:
+            facade.update_place(place.id, {'price': rng.randint(50, 250)})
+
+    print(f"{count} places, {requests} GETs, a write every {write_every or 'never'}")
+    print(f"{'cache':<6} {'req/s':>8} {'hits':>6} {'misses':>7} {'evictions':>10} {'bytes':>10}")
+    best = {}
+    for _ in range(3):
+        for label, app in apps.items():
+            client = app.test_client()
+            rate = run(client, urls, requests, write_every, write)
+            best[label] = max(best.get(label, 0), rate)
+    for label, app in apps.items():
+        cache = app.extensions.get('response_cache')
+        stats = cache.stats() if cache else {'hits': '-', 'misses': '-', 'evictions': '-',
+                                             'bytes': '-'}
+        print(f"{label:<6} {best[label]:>8,.0f} {stats['hits']:>6} {stats['misses']:>7} "
+              f"{stats['evictions']:>10} {stats['bytes']:>10}")
+    print(f"speedup: {best['on'] / best['off']:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark: memory and query latency of the full-text index over place
+titles and review texts, with a Zipf-distributed vocabulary
+
+Usage: python benchmarks/bench_search.py [reviews] [queries]
+"""
+import itertools
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.persistence.search import TextIndex
+
+VOCABULARY = 20_000
+REVIEWS_PER_PLACE = 10
+WORDS_PER_REVIEW = 20
+
+
+def percentile(samples, fraction):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def make_words(rng):
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    words = set()
+    while len(words) < VOCABULARY:
+        words.add(''.join(rng.choice(letters) for _ in range(rng.randint(3, 10))))
+    return sorted(words)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    rng = random.Random(0)
+    words = make_words(rng)
+    weights = list(itertools.accumulate(1 / rank for rank in range(1, VOCABULARY + 1)))
+    places = max(1, count // REVIEWS_PER_PLACE)
+    titles = [' '.join(rng.choices(words, cum_weights=weights, k=3)) for _ in range(places)]
+    reviews = [' '.join(rng.choices(words, cum_weights=weights, k=WORDS_PER_REVIEW))
+               for _ in range(count)]
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    index = TextIndex()
+    for place, title in enumerate(titles):
+        index.put(f"{place}:title", place, title, weight=3)
+    for review, text in enumerate(reviews):
+        index.put(review, review % places, text)
+    elapsed = time.perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"indexed {places} places and {count} reviews in {elapsed:.1f}s "
+          f"({elapsed / (places + count) * 1e6:.1f}us per source)")
+    print(f"index memory: {memory / 2**20:.0f} MiB, "
+          f"{memory / places:.0f} bytes per place, "
+          f"{memory / (places + count):.0f} bytes per source")
+
+    # query words drawn uniformly from the 2000 most common words, so some
+    # match a large share of the documents
+    common = sorted(words, key=lambda word: -len(index._postings.get(word, ())))[:2000]
+    cases = {
+        'one word': lambda: rng.choice(common),
+        'two words': lambda: f"{rng.choice(common)} {rng.choice(common)}",
+        'rare word': lambda: rng.choice(words),
+        'prefix': lambda: f"{rng.choice(common)} {rng.choice(common)[:3]}",
+    }
+    print(f"{'query':>10} {'p50':>9} {'p99':>9}")
+    for name, make_query in cases.items():
+        latencies = []
+        for _ in range(queries):
+            query = make_query()
+            start = time.perf_counter()
+            index.search(query, 20, prefix=name == 'prefix')
+            latencies.append(time.perf_counter() - start)
+        print(f"{name:>10} {percentile(latencies, 0.5) * 1e3:>7.2f}ms "
+              f"{percentile(latencies, 0.99) * 1e3:>7.2f}ms")
+
+
+if __name__ == '__main__':
+    main()
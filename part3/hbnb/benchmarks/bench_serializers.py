@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark: list endpoint throughput with the cached representations
+warm (nothing changed since the last request) and cold (every cache
+dropped before each request), plus the serialization step alone
+
+Usage: python benchmarks/bench_serializers.py [places] [requests]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import create_app
+from app.api.v1.serializers import place_summary, review_summary, user_summary
+from app.services import facade
+from config import Config
+
+AMENITIES_PER_PLACE = 5
+REVIEWS_PER_PLACE = 2
+
+
+def seed(places):
+    run = time.time_ns()
+    users = facade.create_users([
+        {'first_name': 'Bench', 'last_name': f"User {n}", 'email': f"user{n}.{run}@example.com"}
+        for n in range(places // 4)])
+    amenities = [facade.create_amenity({'name': f"Amenity {n} {run}"[:50]}) for n in range(20)]
+    for n in range(places):
+        place = facade.create_place({
+            'title': f"Place {n}", 'description': 'A quiet place', 'price': 50 + n % 200,
+            'latitude': n % 90, 'longitude': n % 180, 'owner_id': users[n % len(users)].id,
+            'amenities': [amenities[(n + k) % len(amenities)].id
+                          for k in range(AMENITIES_PER_PLACE)]})
+        for k in range(REVIEWS_PER_PLACE):
+            facade.create_review({'text': 'Lovely stay', 'rating': 1 + (n + k) % 5,
+                                  'user_id': users[(n + k) % len(users)].id,
+                                  'place_id': place.id})
+
+
+def drop_caches():
+    for repo in (facade.user_repo, facade.amenity_repo, facade.place_repo, facade.review_repo):
+        for obj in repo.iter_all():
+            try:
+                del obj._serialized
+            except AttributeError:
+                pass
+
+
+def per_second(action, count, cold):
+    elapsed = 0.0
+    for _ in range(count):
+        if cold:
+            drop_caches()
+        start = time.perf_counter()
+        action()
+        elapsed += time.perf_counter() - start
+    return count / elapsed
+
+
+def main():
+    places = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    app = create_app(type('BenchConfig', (Config,), {'PASSWORD_POOL_SIZE': 0}))
+    seed(places)
+    http = app.test_client()
+
+    serializers = [
+        ('places', place_summary, facade.get_all_places),
+        ('reviews', review_summary, facade.get_all_reviews),
+        ('users', user_summary, facade.get_all_users),
+    ]
+    print(f"{places} places, {AMENITIES_PER_PLACE} amenities and "
+          f"{REVIEWS_PER_PLACE} reviews each; 100 rows per page")
+    print(f"{'':<34} {'cold':>9} {'warm':>9} {'speedup':>8}")
+    for name, serialize, get_all in serializers:
+        rows = get_all()
+        cold, warm = (per_second(lambda: [serialize(row) for row in rows], count, cold)
+                      for cold in (True, False))
+        label = f"serialize all {len(rows)} {name}"
+        print(f"{label:<34} {cold:7.1f}/s {warm:7.1f}/s {warm / cold:7.1f}x")
+    for name, _, _ in serializers:
+        url = f"/api/v1/{name}/?limit=100"
+        cold, warm = (per_second(lambda: http.get(url), count * 4, cold)
+                      for cold in (True, False))
+        label = f"GET {url}"
+        print(f"{label:<34} {cold:7.1f}/s {warm:7.1f}/s {warm / cold:7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark: GET latency while a storm of signups hashes passwords,
+with bcrypt inline on the request threads vs in the password worker pool
+
+A threaded server runs the app; one client polls GET /users/<id> while
+several others POST new users as fast as they are answered.
+
+Usage: python benchmarks/bench_signup_storm.py [seconds] [signup clients]
+"""
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from werkzeug.serving import make_server
+
+from app import create_app
+from config import Config
+
+GET_INTERVAL = 0.01
+
+
+def request(url, payload=None):
+    data = None if payload is None else json.dumps(payload).encode()
+    req = urllib.request.Request(url, data, {'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(req) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as exc:
+        return exc.code, None
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def run(label, pool_size, seconds, clients):
+    config = type('BenchConfig', (Config,), {
+        'PASSWORD_POOL_SIZE': pool_size, 'PASSWORD_QUEUE_LIMIT': clients // 2})
+    app = create_app(config)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}/api/v1/users/"
+    run_id = time.time_ns()
+    _, user = request(base, {'first_name': 'Reader', 'last_name': 'Bench',
+                             'email': f"reader.{run_id}@example.com", 'password': 'pw'})
+
+    stop = threading.Event()
+    statuses = []
+
+    def signups(client):
+        n = 0
+        while not stop.is_set():
+            status, _ = request(base, {'first_name': 'Storm', 'last_name': 'User',
+                                       'email': f"storm{client}.{n}.{run_id}@example.com",
+                                       'password': 'correct horse battery staple'})
+            statuses.append(status)
+            n += 1
+            if status == 503:
+                time.sleep(0.05)
+
+    def measure(phase):
+        latencies = []
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            request(base + user['id'])
+            latencies.append((time.perf_counter() - start) * 1e3)
+            time.sleep(GET_INTERVAL)
+        print(f"  {label:<8} {phase:<6} GET p50 {percentile(latencies, 0.5):7.2f}ms  "
+              f"p99 {percentile(latencies, 0.99):7.2f}ms  max {max(latencies):7.2f}ms")
+
+    measure('idle')
+    storm = [threading.Thread(target=signups, args=(client,)) for client in range(clients)]
+    for thread in storm:
+        thread.start()
+    measure('storm')
+    stop.set()
+    for thread in storm:
+        thread.join()
+    server.shutdown()
+    print(f"  {label:<8} signups: {statuses.count(201)} created, "
+          f"{statuses.count(503)} rejected (503)")
+
+
+def main():
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    clients = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    print(f"{seconds:g}s per phase, {clients} signup clients, "
+          f"bcrypt cost {Config.BCRYPT_LOG_ROUNDS}, {os.cpu_count()} CPU(s)")
+    run('inline', 0, seconds, clients)
+    run('pool', Config.PASSWORD_POOL_SIZE, seconds, clients)
+
+
+if __name__ == '__main__':
+    main()
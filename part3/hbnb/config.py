@@ -5,10 +5,64 @@ class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'default_secret_key')
     DEBUG = False
 
+    # Persistence: 'memory' (default) or 'sqlite'
+    REPOSITORY_ENGINE = os.getenv('REPOSITORY_ENGINE', 'memory')
+    SQLITE_DATABASE = os.getenv('SQLITE_DATABASE', 'hbnb.db')
+    REPOSITORY_LOCK_STRIPES = 64  # 0 = in-memory repositories are not thread-safe
+
+    # Durability for the 'memory' engine: write-ahead log + periodic snapshots
+    JOURNAL_DIR = os.getenv('JOURNAL_DIR')  # unset = not durable
+    JOURNAL_FSYNC = True
+    JOURNAL_SNAPSHOT_INTERVAL = 300  # seconds
+    JOURNAL_GROUP_COMMIT = True      # one fsync per batch of concurrent writes
+    JOURNAL_BATCH_WINDOW = 0.002     # seconds to wait for a batch to fill
+    JOURNAL_MAX_BATCH = 256
+
+    # Grid cell size (degrees, must divide 360) of the in-process index
+    # behind /places/nearby
+    GEO_CELL_SIZE = 0.2
+
+    # Reviews-worth of weight the Bayesian place rating gives the mean of
+    # all ratings, so places with few reviews are not ranked on luck
+    RATING_PRIOR_WEIGHT = 5
+
+    # Encode API responses from the JSON text cached with each entity's
+    # representation (same bytes as flask_restx's default encoding)
+    JSON_FRAGMENT_ENCODING = True
+
+    # Byte budget of the in-process cache of GET responses (0 = off);
+    # entries are revalidated against the resource's ETag on every hit
+    RESPONSE_CACHE_BYTES = 32 * 1024 * 1024
+
+    # gzip/br compression of JSON responses of at least MIN_SIZE bytes
+    # (br needs the brotli package); levels trade CPU for bytes, see
+    # benchmarks/bench_compression.py
+    COMPRESSION = True
+    COMPRESSION_MIN_SIZE = 1024
+    COMPRESSION_GZIP_LEVEL = 6
+    COMPRESSION_BROTLI_LEVEL = 4
+
+    # Password hashing: bcrypt cost factor (each +1 doubles the work), and a
+    # pool of low-priority worker processes doing it off the request threads.
+    # At most POOL_SIZE + QUEUE_LIMIT hashes are in flight; beyond that
+    # signups/logins get a 503 instead of piling up. POOL_SIZE 0 = inline.
+    BCRYPT_LOG_ROUNDS = 12
+    PASSWORD_POOL_SIZE = int(os.getenv('PASSWORD_POOL_SIZE', os.cpu_count() or 1))
+    PASSWORD_QUEUE_LIMIT = 32
+    PASSWORD_WORKER_NICE = 10
+
 class DevelopmentConfig(Config):
     DEBUG = True
+    BCRYPT_LOG_ROUNDS = 10
+
+class TestingConfig(Config):
+    TESTING = True
+    # cheap hashes on the calling thread: no worker processes per app
+    BCRYPT_LOG_ROUNDS = 4
+    PASSWORD_POOL_SIZE = 0
 
 config = {
     'development': DevelopmentConfig,
+    'testing': TestingConfig,
     'default': DevelopmentConfig
 }
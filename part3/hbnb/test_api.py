@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the HBnB API layer
+Tests representations, conditional requests, the response cache,
+compression and password hashing
+"""
+import json
+import os
+import threading
+import time
+import unittest
+import uuid
+from datetime import datetime
+
+from app import create_app
+from app.models import User, Place, Amenity
+from app.services import facade
+from app.services.passwords import PasswordHasher, PasswordPoolBusy
+from config import TestingConfig
+from testutils import make_user
+
+
+class TestPasswordHasher(unittest.TestCase):
+    """Test cases for pooled bcrypt hashing"""
+
+    def test_inline_round_trip(self):
+        """Test that a password verifies against its hash, and others do not"""
+        hasher = PasswordHasher(rounds=4)
+        hashed = hasher.hash('secret')
+        self.assertTrue(hashed.startswith('$2b$04$'))
+        self.assertTrue(hasher.verify('secret', hashed))
+        self.assertFalse(hasher.verify('Secret', hashed))
+
+    def test_pool_round_trip(self):
+        """Test that worker processes hash and verify like the inline path"""
+        hasher = PasswordHasher(rounds=4, pool_size=2)
+        self.addCleanup(hasher.close)
+        hashed = hasher.hash('secret')
+        self.assertTrue(hasher.verify('secret', hashed))
+        self.assertTrue(PasswordHasher(rounds=4).verify('secret', hashed))
+
+    def test_saturated_pool_rejects(self):
+        """Test that hashing beyond pool size + queue limit fails fast"""
+        hasher = PasswordHasher(rounds=13, pool_size=1, queue_limit=0)
+        self.addCleanup(hasher.close)
+        worker = threading.Thread(target=hasher.hash, args=('slow',))
+        worker.start()
+        time.sleep(0.1)
+        with self.assertRaises(PasswordPoolBusy):
+            hasher.hash('secret')
+        worker.join()
+        self.assertEqual(hasher.rejected, 1)
+        self.assertTrue(hasher.verify('slow', hasher.hash('slow')))
+
+    def test_broken_pool_falls_back_inline(self):
+        """Test that a dead worker retires the pool once and hashing goes on inline"""
+        hasher = PasswordHasher(rounds=4, pool_size=2, queue_limit=6)
+        self.addCleanup(hasher.close)
+        pool = hasher._pool
+        os.kill(next(iter(pool._processes)), 9)
+        errors, hashes = [], []
+
+        def hash_one():
+            try:
+                hashes.append(hasher.hash('secret'))
+            except Exception as e:
+                errors.append(e)
+        threads = [threading.Thread(target=hash_one) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(len(hashes), 8)
+        self.assertTrue(hasher.broken)
+        self.assertIsNone(hasher._pool)
+        self.assertTrue(hasher.verify('secret', hashes[0]))
+        self.assertEqual(hasher.rejected, 0)
+
+
+class TestSerializers(unittest.TestCase):
+    """Test cases for the cached API representations"""
+
+    def setUp(self):
+        run = uuid.uuid4().hex
+        self.owner = User('Ann', 'Lee', f"ann.{run}@example.com")
+        self.wifi = Amenity('WiFi')
+        self.place = Place('Loft', 'Quiet', 100, 10.0, 20.0, self.owner)
+        self.place.add_amenity(self.wifi)
+        self.addCleanup(User._emails_registry.discard, self.owner.email)
+
+    def test_reused_until_saved(self):
+        """Test that a representation is reused until the entity is saved"""
+        from app.api.v1.serializers import user_summary
+        first = user_summary(self.owner)
+        self.assertIs(user_summary(self.owner), first)
+        self.owner.update({'first_name': 'Bea'})
+        self.assertEqual(user_summary(self.owner)['first_name'], 'Bea')
+
+    def test_related_changes_invalidate(self):
+        """Test that changing an embedded owner or amenity rebuilds the place"""
+        from app.api.v1.serializers import place_summary
+        self.assertEqual(place_summary(self.place)['owner']['last_name'], 'Lee')
+        self.owner.update({'last_name': 'Kim'})
+        self.wifi.update({'name': 'Fiber'})
+        summary = place_summary(self.place)
+        self.assertEqual(summary['owner']['last_name'], 'Kim')
+        self.assertEqual(summary['amenities'], [{'id': self.wifi.id, 'name': 'Fiber'}])
+
+    def test_save_moves_updated_at_forward(self):
+        """Test that back-to-back saves never leave updated_at unchanged"""
+        stamps = []
+        for _ in range(100):
+            self.wifi.save()
+            stamps.append(self.wifi.updated_at)
+        self.assertEqual(stamps, sorted(set(stamps)))
+
+
+class TestFragmentEncoding(unittest.TestCase):
+    """Test cases for JSON encoding with cached fragments"""
+
+    def test_same_bytes_as_json(self):
+        """Test that encoding reuses fragments yet matches json.dumps exactly"""
+        from app.api.v1.encoding import Encoded, encode, extend
+        owner = Encoded({'id': 'u1', 'name': 'Zoë "Z"'})
+        place = Encoded({'id': 'p1', 'owner': owner, 'tags': [], 'price': 1e16})
+        data = {'places': [extend(place, rating=Encoded({'histogram': [0, 1]})), place],
+                'count': 2, 'empty': {}, 'keys': {1: None}}
+        for indent in (None, 4, 2, None):
+            self.assertEqual(encode(data, indent), json.dumps(data, indent=indent))
+
+    def test_datetimes(self):
+        """Test that datetimes are encoded as their isoformat()"""
+        from app.api.v1.encoding import encode
+        moment = datetime(2024, 5, 1, 12, 30, 0, 250)
+        self.assertEqual(encode({'at': moment}), '{"at": "2024-05-01T12:30:00.000250"}')
+
+
+class TestConditionalRequests(unittest.TestCase):
+    """Test cases for ETags, If-None-Match and If-Match"""
+
+    def setUp(self):
+        self.client = create_app(TestingConfig).test_client()
+        payload = {'first_name': 'Ann', 'last_name': 'Lee', 'password': 'secret',
+                   'email': f"ann.{uuid.uuid4().hex}@example.com"}
+        response = self.client.post('/api/v1/users/', json=payload)
+        self.addCleanup(User._emails_registry.discard, payload['email'])
+        self.url = f"/api/v1/users/{response.get_json()['id']}"
+
+    def test_not_modified(self):
+        """Test that a matching If-None-Match gets an empty 304"""
+        etag = self.client.get(self.url).headers['ETag']
+        response = self.client.get(self.url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b'')
+        self.assertEqual(response.headers['ETag'], etag)
+
+    def test_tags_follow_writes(self):
+        """Test that an update changes the entity's and the list's tags"""
+        etag = self.client.get(self.url).headers['ETag']
+        list_etag = self.client.get('/api/v1/users/').headers['ETag']
+        self.client.put(self.url, json={'first_name': 'Bea'})
+        response = self.client.get(self.url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+        response = self.client.get('/api/v1/users/', headers={'If-None-Match': list_etag})
+        self.assertEqual(response.status_code, 200)
+
+    def test_stale_if_match(self):
+        """Test that a PUT with an outdated If-Match fails with 412"""
+        etag = self.client.get(self.url).headers['ETag']
+        response = self.client.put(self.url, json={'first_name': 'Bea'}, headers={'If-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        response = self.client.put(self.url, json={'first_name': 'Cy'}, headers={'If-Match': etag})
+        self.assertEqual(response.status_code, 412)
+
+    def test_tag_read_during_a_write_goes_stale(self):
+        """Test that a list read before a write has updated every index is not kept valid"""
+        client = create_app(type('NoCacheConfig', (TestingConfig,),
+                                 {'RESPONSE_CACHE_BYTES': 0})).test_client()
+        owner = make_user()
+        self.addCleanup(User._emails_registry.discard, owner.email)
+        facade.user_repo.add(owner)
+        url = '/api/v1/places/nearby?lat=1&lon=2&radius_km=10'
+        during = []
+        insert = facade.place_geo.insert
+
+        def insert_after_a_read(*args):
+            during.append(client.get(url))
+            insert(*args)
+        facade.place_geo.insert = insert_after_a_read
+        place = facade.create_place({'title': 'Loft', 'description': 'Quiet', 'price': 10,
+                                     'latitude': 1, 'longitude': 2, 'amenities': [],
+                                     'owner_id': owner.id})
+        self.assertEqual(during[0].get_json(), [])
+        response = client.get(url, headers={'If-None-Match': during[0].headers['ETag']})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([p['id'] for p in response.get_json()], [place.id])
+
+
+class TestResponseCache(unittest.TestCase):
+    """Test cases for the cache of encoded GET responses"""
+
+    def test_byte_bounded_lru(self):
+        """Test that the least recently used entries go first once over budget"""
+        from flask import Response
+        from app.api.v1.response_cache import ResponseCache
+        cache = ResponseCache(max_bytes=2500, max_entry_bytes=1000)
+        for name in 'abcd':
+            cache.put((name, ()), 't1', Response(name * 500))
+        self.assertIsNone(cache.get(('a', ()), 't1'))
+        self.assertEqual(cache.get(('b', ()), 't1').get_data(), b'b' * 500)
+        cache.put(('e', ()), 't1', Response('e' * 500))
+        self.assertIsNone(cache.get(('c', ()), 't1'))
+        self.assertIsNotNone(cache.get(('b', ()), 't1'))
+        self.assertIsNone(cache.get(('b', ()), 't2'))
+        cache.put(('big', ()), 't1', Response('x' * 2000))
+        self.assertIsNone(cache.get(('big', ()), 't1'))
+        self.assertLessEqual(cache.size, 2500)
+        self.assertEqual((cache.hits, cache.misses, cache.evictions), (2, 4, 2))
+
+    def test_review_invalidates_only_its_place(self):
+        """Test that a new review refreshes its place's responses, not another place's"""
+        app = create_app(TestingConfig)
+        client = app.test_client()
+        cache = app.extensions['response_cache']
+        owner = make_user()
+        self.addCleanup(User._emails_registry.discard, owner.email)
+        facade.user_repo.add(owner)
+        reviewer = make_user()
+        self.addCleanup(User._emails_registry.discard, reviewer.email)
+        facade.user_repo.add(reviewer)
+        place_ids = [facade.create_place({'title': title, 'description': 'Quiet', 'price': 10,
+                                          'latitude': 1, 'longitude': 2, 'owner_id': owner.id,
+                                          'amenities': []}).id
+                     for title in ('Loft', 'Barn')]
+        urls = [f"/api/v1/reviews/places/{place_id}" for place_id in place_ids]
+        first = [client.get(url).get_json() for url in urls]
+        facade.create_review({'text': 'Lovely', 'rating': 5, 'user_id': reviewer.id,
+                              'place_id': place_ids[0]})
+        hits = cache.hits
+        self.assertEqual(len(client.get(urls[0]).get_json()), len(first[0]) + 1)
+        self.assertEqual(client.get(urls[1]).get_json(), first[1])
+        self.assertEqual(cache.hits, hits + 1)
+
+    def test_no_stale_body_after_a_write(self):
+        """Test that responses built halfway through a write are not served after it"""
+        client = create_app(TestingConfig).test_client()
+        owner, reviewer = make_user(), make_user()
+        for user in (owner, reviewer):
+            self.addCleanup(User._emails_registry.discard, user.email)
+            facade.user_repo.add(user)
+        urls = ['/api/v1/places/nearby?lat=1&lon=2&radius_km=10', '/api/v1/places/search?q=loft']
+        during = []
+        insert = facade.place_geo.insert
+
+        def insert_after_reads(*args):
+            during.extend(client.get(url).get_json() for url in urls)
+            insert(*args)
+        facade.place_geo.insert = insert_after_reads
+        place, other = [facade.create_place({'title': title, 'description': 'Quiet', 'price': 10,
+                                             'latitude': 1, 'longitude': 2,
+                                             'owner_id': owner.id, 'amenities': []})
+                        for title in ('Loft', 'Barn')]
+        self.assertEqual(during[:2], [[], []])
+        for url in urls:
+            self.assertIn(place.id, [p['id'] for p in client.get(url).get_json()])
+
+        # the rating totals (the prior of every place's Bayesian average)
+        # are updated after the reviewed place is saved
+        count_ratings = facade._count_ratings
+
+        def count_after_a_read(*args):
+            client.get('/api/v1/places/')
+            count_ratings(*args)
+        facade._count_ratings = count_after_a_read
+        self.addCleanup(delattr, facade, '_count_ratings')
+        facade.create_review({'text': 'Lovely', 'rating': 5, 'user_id': reviewer.id,
+                              'place_id': place.id})
+        ratings = {p['id']: p['rating']['bayesian_average']
+                   for p in client.get('/api/v1/places/').get_json()}
+        self.assertEqual(ratings[other.id], 5.0)
+
+
+class TestCompression(unittest.TestCase):
+    """Test cases for negotiated response compression"""
+
+    def setUp(self):
+        self.client = create_app(TestingConfig).test_client()
+        owner = make_user()
+        self.addCleanup(User._emails_registry.discard, owner.email)
+        facade.user_repo.add(owner)
+        for n in range(20):
+            facade.create_place({'title': f"Loft {n}", 'description': 'Quiet', 'price': 10,
+                                 'latitude': 1, 'longitude': 2, 'owner_id': owner.id,
+                                 'amenities': []})
+        self.url = f"/api/v1/users/{owner.id}/places"
+        self.small_url = f"/api/v1/users/{owner.id}"
+
+    def test_gzip_round_trip(self):
+        """Test that gzip is negotiated and decodes to the identity body"""
+        import gzip
+        plain = self.client.get(self.url)
+        self.assertNotIn('Content-Encoding', plain.headers)
+        for _ in range(2):  # compressed, then from the cache
+            response = self.client.get(self.url, headers={'Accept-Encoding': 'gzip'})
+            self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+            self.assertIn('Accept-Encoding', response.headers['Vary'])
+            self.assertEqual(gzip.decompress(response.data), plain.data)
+            self.assertEqual(response.headers['ETag'], plain.headers['ETag'][:-1] + '-gzip"')
+        response = self.client.get(self.url, headers={'Accept-Encoding': 'gzip',
+                                                       'If-None-Match': response.headers['ETag']})
+        self.assertEqual(response.status_code, 304)
+
+    def test_threshold_and_refusal(self):
+        """Test that small responses and clients refusing gzip get identity"""
+        response = self.client.get(self.small_url, headers={'Accept-Encoding': 'gzip'})
+        self.assertNotIn('Content-Encoding', response.headers)
+        response = self.client.get(self.url, headers={'Accept-Encoding': 'gzip;q=0'})
+        self.assertNotIn('Content-Encoding', response.headers)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -207,6 +207,19 @@ test_endpoint "Protected endpoint without token" "POST" "/places/" '{
     "title": "Unauthorized Place"
 }' "" "422"
 
+# Test list pagination parameters
+test_endpoint "Paginated user list" "GET" "/users/?limit=1" "" "" "200"
+test_endpoint "Invalid page size" "GET" "/places/?limit=0" "" "" "400"
+test_endpoint "Invalid cursor" "GET" "/reviews/?cursor=%25%25" "" "" "400"
+
+# Test location searches
+test_endpoint "Nearest places" "GET" "/places/nearest?lat=48.85&lon=2.35&k=5" "" "" "200"
+test_endpoint "Nearby search without radius" "GET" "/places/nearby?lat=48.85&lon=2.35" "" "" "400"
+
+# Test full-text search
+test_endpoint "Search places" "GET" "/places/search?q=beach&prefix=true" "" "" "200"
+test_endpoint "Search without query" "GET" "/places/search" "" "" "400"
+
 echo -e "\n=========================================="
 echo -e "${GREEN}TESTING COMPLETE${NC}"
 echo -e "Tests run: $TESTS"
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Multi-threaded stress tests for the HBnB facade and repositories
+Checks invariants under contention: no lost reviews, no duplicate emails
+"""
+import sys
+import threading
+import unittest
+
+from app.services.facade import HBnBFacade
+from app.persistence.locks import ReadWriteLock
+
+
+def run_threads(count, target):
+    """Run target(n) in count threads released at the same moment"""
+    barrier = threading.Barrier(count)
+    errors = []
+
+    def worker(n):
+        barrier.wait()
+        try:
+            target(n)
+        except Exception as exc:  # surfaced through the assertion below
+            errors.append(exc)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return errors
+
+
+class TestStress(unittest.TestCase):
+    """Invariant checks with many threads hammering one facade"""
+
+    def setUp(self):
+        # switch threads as often as possible to expose races
+        self.interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        self.facade = HBnBFacade(lock_stripes=8)
+
+    def tearDown(self):
+        sys.setswitchinterval(self.interval)
+
+    def make_user(self, email):
+        return self.facade.create_user({'first_name': 'Stress', 'last_name': 'Test',
+                                        'email': email})
+
+    def test_no_duplicate_emails(self):
+        """Test that racing signups for the same email create one user"""
+        emails = [f"stress.dup{n}@example.com" for n in range(10)]
+        created = []
+
+        def signup(n):
+            for email in emails:
+                try:
+                    created.append(self.make_user(email))
+                except ValueError:
+                    pass
+
+        errors = run_threads(16, signup)
+        self.assertEqual(errors, [])
+        self.assertEqual(sorted(u.email for u in created), sorted(emails))
+        self.assertEqual(len(self.facade.get_all_users()), len(emails))
+        for user in created:
+            self.assertIs(self.facade.get_user_by_email(user.email), user)
+
+    def test_no_lost_reviews(self):
+        """Test that concurrent review creates and deletes keep place.reviews exact"""
+        owner = self.make_user('stress.owner@example.com')
+        guests = [self.make_user(f"stress.guest{n}@example.com") for n in range(16)]
+        places = [self.facade.create_place({'title': f"Place {n}", 'description': None,
+                                            'price': 10, 'latitude': 0.0, 'longitude': 0.0,
+                                            'owner_id': owner.id}) for n in range(3)]
+
+        def churn(n):
+            mine = []
+            for i in range(60):
+                place = places[(n + i) % len(places)]
+                mine.append(self.facade.create_review({
+                    'text': 'ok', 'rating': 3, 'user_id': guests[n].id, 'place_id': place.id}))
+                if i % 3 == 2:
+                    self.assertTrue(self.facade.delete_review(mine.pop(0).id))
+
+        errors = run_threads(len(guests), churn)
+        self.assertEqual(errors, [])
+
+        reviews = self.facade.get_all_reviews()
+        self.assertEqual(len(reviews), len(guests) * 40)
+        for place in places:
+            stored = {r.id for r in reviews if r.place is place}
+            linked = [r.id for r in place.reviews]
+            self.assertEqual(len(linked), len(set(linked)))
+            self.assertEqual(set(linked), stored)
+
+    def test_rating_aggregates_under_churn(self):
+        """Test that concurrent review writes keep the rating aggregates exact"""
+        owner = self.make_user('stress.rater@example.com')
+        guests = [self.make_user(f"stress.rater{n}@example.com") for n in range(8)]
+        places = [self.facade.create_place({'title': f"Place {n}", 'description': None,
+                                            'price': 10, 'latitude': 0.0, 'longitude': 0.0,
+                                            'owner_id': owner.id}) for n in range(2)]
+
+        def churn(n):
+            mine = []
+            for i in range(40):
+                mine.append(self.facade.create_review({
+                    'text': 'ok', 'rating': 1 + (n + i) % 5, 'user_id': guests[n].id,
+                    'place_id': places[i % 2].id}))
+                if i % 4 == 1:
+                    self.facade.update_review(mine[-1].id, {'rating': 1 + i % 5})
+                if i % 4 == 3:
+                    self.facade.delete_review(mine.pop(0).id)
+
+        errors = run_threads(len(guests), churn)
+        self.assertEqual(errors, [])
+        self.assertEqual(self.facade.check_rating_aggregates(), {})
+        reviews = self.facade.get_all_reviews()
+        mean, _ = self.facade.rating_prior()
+        self.assertAlmostEqual(mean, sum(r.rating for r in reviews) / len(reviews))
+
+    def test_single_winner_delete(self):
+        """Test that racing deletes of one review succeed exactly once"""
+        owner = self.make_user('stress.deleter@example.com')
+        place = self.facade.create_place({'title': 'Place', 'description': None, 'price': 10,
+                                          'latitude': 0.0, 'longitude': 0.0,
+                                          'owner_id': owner.id})
+        review = self.facade.create_review({'text': 'ok', 'rating': 3, 'user_id': owner.id,
+                                            'place_id': place.id})
+        results = []
+        errors = run_threads(16, lambda n: results.append(self.facade.delete_review(review.id)))
+        self.assertEqual(errors, [])
+        self.assertEqual(results.count(True), 1)
+        self.assertEqual(place.reviews, [])
+
+    def test_deleted_review_leaves_no_text(self):
+        """Test that a review text update racing its delete never outlives the review"""
+        owner = self.make_user('stress.writer@example.com')
+        place = self.facade.create_place({'title': 'Place', 'description': None, 'price': 10,
+                                          'latitude': 0.0, 'longitude': 0.0,
+                                          'owner_id': owner.id})
+        review = self.facade.create_review({'text': 'fine', 'rating': 3, 'user_id': owner.id,
+                                            'place_id': place.id})
+        deleter = threading.Thread(target=self.facade.delete_review, args=(review.id,))
+        put = self.facade.place_text.put
+
+        def put_racing_a_delete(*args, **kwargs):
+            # let the delete run as far as it can before the text goes in
+            deleter.start()
+            deleter.join(timeout=0.2)
+            put(*args, **kwargs)
+        self.facade.place_text.put = put_racing_a_delete
+        self.facade.update_review(review.id, {'text': 'stale words'})
+        deleter.join()
+        self.assertIsNone(self.facade.get_review(review.id))
+        self.assertEqual(self.facade.search_places('stale'), [])
+
+
+class TestReadWriteLock(unittest.TestCase):
+    """Test cases for the striped locks' building block"""
+
+    def test_readers_share(self):
+        """Test that readers hold the lock together"""
+        lock = ReadWriteLock()
+        inside = threading.Barrier(3, timeout=5)
+
+        def reader(n):
+            with lock.read():
+                inside.wait()
+
+        self.assertEqual(run_threads(3, reader), [])
+
+    def test_writer_excludes_readers(self):
+        """Test that a reader waits for the writer to finish"""
+        lock = ReadWriteLock()
+        events = []
+        lock.acquire_write()
+        reader = threading.Thread(target=lambda: (lock.acquire_read(), events.append('read')))
+        reader.start()
+        reader.join(timeout=0.1)
+        events.append('write done')
+        lock.release_write()
+        reader.join()
+        self.assertEqual(events, ['write done', 'read'])
+
+    def test_writer_reentrant(self):
+        """Test that the writing thread can re-enter and read"""
+        lock = ReadWriteLock()
+        with lock.write():
+            with lock.write():
+                with lock.read():
+                    pass
+        with lock.read():
+            pass
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the HBnB write-ahead journal
+Tests recovery, snapshots and crash consistency of the durable in-memory store
+"""
+import os
+import random
+import shutil
+import tempfile
+import threading
+import unittest
+
+from app.models import Amenity
+from app.persistence.repository import InMemoryRepository
+from app.persistence.journal import Journal, JournaledRepository
+from app.persistence.group_commit import GroupCommitWriter
+from app.services.facade import HBnBFacade
+
+
+def open_amenities(directory, **options):
+    """Recover an amenity repository from directory, wrapped for logging"""
+    options.setdefault('fsync', False)
+    journal = Journal(directory, **options)
+    repo = InMemoryRepository()
+    repo.create_index('name', unique=True)
+    journal.recover({'Amenity': repo})
+    return journal, JournaledRepository(repo, journal, 'Amenity')
+
+
+def names(repo):
+    return {amenity.id: amenity.name for amenity in repo.get_all()}
+
+
+class TestJournalRecovery(unittest.TestCase):
+    """Test cases for journal replay and snapshots"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_replay_log(self):
+        """Test that add/update/delete are replayed after a restart"""
+        journal, repo = open_amenities(self.tmpdir)
+        wifi, pool, spa = Amenity('WiFi'), Amenity('Pool'), Amenity('Spa')
+        for amenity in (wifi, pool, spa):
+            repo.add(amenity)
+        repo.update(pool.id, {'name': 'Heated Pool'})
+        repo.delete(spa.id)
+        expected = names(repo)
+        journal.close()
+
+        journal, recovered = open_amenities(self.tmpdir)
+        self.assertEqual(names(recovered), expected)
+        self.assertEqual(recovered.get_by_attribute('name', 'Heated Pool').id, pool.id)
+        self.assertEqual(recovered.get(wifi.id).created_at, wifi.created_at)
+        journal.close()
+
+    def test_snapshot_then_tail(self):
+        """Test recovery from a snapshot plus the log written after it"""
+        journal, repo = open_amenities(self.tmpdir)
+        first = Amenity('WiFi')
+        repo.add(first)
+        journal.snapshot({'Amenity': repo})
+        second = Amenity('Pool')
+        repo.add(second)
+        repo.delete(first.id)
+        expected = names(repo)
+        journal.close()
+
+        logs = [f for f in os.listdir(self.tmpdir) if f.startswith('journal-')]
+        self.assertEqual(len(logs), 1)
+
+        journal, recovered = open_amenities(self.tmpdir)
+        self.assertEqual(names(recovered), expected)
+        journal.close()
+
+    def test_replay_batches(self):
+        """Test that add_many/update_many/delete_many are replayed after a restart"""
+        journal, repo = open_amenities(self.tmpdir)
+        amenities = [Amenity(f"Amenity {n}") for n in range(2500)]
+        repo.add_many(amenities)
+        repo.update_many([(amenities[0].id, {'name': 'WiFi'})])
+        repo.delete_many([a.id for a in amenities[1:1200]])
+        expected = names(repo)
+        journal.close()
+
+        journal, recovered = open_amenities(self.tmpdir)
+        self.assertEqual(names(recovered), expected)
+        self.assertEqual(recovered.get_by_attribute('name', 'WiFi').id, amenities[0].id)
+        journal.close()
+
+    def test_facade_references_survive_restart(self):
+        """Test that places and reviews keep their links after a restart"""
+        facade = HBnBFacade(journal_dir=self.tmpdir, journal_fsync=False)
+        owner = facade.create_user({'first_name': 'Ann', 'last_name': 'Lee',
+                                    'email': 'journal.owner@example.com'})
+        guest = facade.create_user({'first_name': 'Bob', 'last_name': 'Ray',
+                                    'email': 'journal.guest@example.com'})
+        wifi = facade.create_amenity({'name': 'WiFi'})
+        place = facade.create_place({'title': 'Loft', 'description': None, 'price': 80,
+                                     'latitude': 1.0, 'longitude': 2.0,
+                                     'owner_id': owner.id, 'amenities': [wifi.id]})
+        review = facade.create_review({'text': 'Great', 'rating': 5,
+                                       'user_id': guest.id, 'place_id': place.id})
+        facade.snapshot()
+        facade.update_review(review.id, {'text': 'Great stay'})
+        facade.journal.close()
+
+        restarted = HBnBFacade(journal_dir=self.tmpdir, journal_fsync=False)
+        loaded = restarted.get_place(place.id)
+        self.assertIs(loaded.owner, restarted.get_user(owner.id))
+        self.assertEqual([a.name for a in loaded.amenities], ['WiFi'])
+        self.assertEqual([r.text for r in loaded.reviews], ['Great stay'])
+        self.assertIs(loaded.reviews[0].place, loaded)
+        self.assertIs(restarted.get_user_by_email('journal.guest@example.com'),
+                      loaded.reviews[0].user)
+        restarted.journal.close()
+
+
+class TestCrashConsistency(unittest.TestCase):
+    """Truncate the log at random offsets and check what recovery sees"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.source = os.path.join(self.tmpdir, 'source')
+        journal, repo = open_amenities(self.source)
+        rng = random.Random(1234)
+        self.log = os.path.join(self.source, 'journal-00000000.log')
+        # (log size, expected state) after every logged operation
+        self.states = [(0, {})]
+        live = []
+        for n in range(60):
+            op = rng.random()
+            if live and op < 0.2:
+                repo.delete(live.pop(rng.randrange(len(live))))
+            elif live and op < 0.5:
+                repo.update(rng.choice(live), {'name': f"Renamed {n}"})
+            else:
+                amenity = Amenity(f"Amenity {n}")
+                repo.add(amenity)
+                live.append(amenity.id)
+            self.states.append((os.path.getsize(self.log), names(repo)))
+        journal.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def recover_truncated(self, offset):
+        target = os.path.join(self.tmpdir, f'crash-{offset}')
+        shutil.copytree(self.source, target)
+        with open(os.path.join(target, 'journal-00000000.log'), 'r+b') as f:
+            f.truncate(offset)
+        return target, open_amenities(target)
+
+    def expected_at(self, offset):
+        return [state for size, state in self.states if size <= offset][-1]
+
+    def test_random_truncation(self):
+        """Test that recovery yields exactly the last complete prefix"""
+        rng = random.Random(42)
+        size = os.path.getsize(self.log)
+        for offset in sorted(rng.randrange(size + 1) for _ in range(40)):
+            target, (journal, repo) = self.recover_truncated(offset)
+            self.assertEqual(names(repo), self.expected_at(offset), f"offset {offset}")
+            journal.close()
+            shutil.rmtree(target)
+
+    def test_writes_after_torn_tail(self):
+        """Test that records appended after recovery are not hidden by the torn tail"""
+        offset = self.states[10][0] + 5
+        target, (journal, repo) = self.recover_truncated(offset)
+        extra = Amenity('After crash')
+        repo.add(extra)
+        expected = names(repo)
+        journal.close()
+
+        journal, recovered = open_amenities(target)
+        self.assertEqual(names(recovered), expected)
+        journal.close()
+
+    def test_corrupt_record(self):
+        """Test that a flipped byte stops replay at the damaged record"""
+        target = os.path.join(self.tmpdir, 'corrupt')
+        shutil.copytree(self.source, target)
+        offset = self.states[20][0] + 10
+        with open(os.path.join(target, 'journal-00000000.log'), 'r+b') as f:
+            f.seek(offset)
+            byte = f.read(1)
+            f.seek(offset)
+            f.write(bytes([byte[0] ^ 0xFF]))
+        journal, repo = open_amenities(target)
+        self.assertEqual(names(repo), self.states[20][1])
+        journal.close()
+
+
+class TestGroupCommit(unittest.TestCase):
+    """Test cases for batched durable writes"""
+
+    def test_batches_concurrent_writers(self):
+        """Test that concurrent writers share flushes and all get acknowledged"""
+        batches = []
+        gate = threading.Event()
+
+        def sink(records):
+            gate.wait()
+            batches.append(list(records))
+
+        writer = GroupCommitWriter(sink, window=0.01, max_batch=8)
+        threads = [threading.Thread(target=lambda n=n: writer.wait(writer.enqueue(n)))
+                   for n in range(20)]
+        for thread in threads:
+            thread.start()
+        gate.set()
+        for thread in threads:
+            thread.join(timeout=5)
+        writer.close()
+
+        self.assertFalse(any(thread.is_alive() for thread in threads))
+        flushed = [record for batch in batches for record in batch]
+        self.assertEqual(sorted(flushed), list(range(20)))
+        self.assertLess(len(batches), 20)
+        self.assertTrue(all(len(batch) <= 8 for batch in batches))
+
+    def test_sink_failure_reaches_writers(self):
+        """Test that a failed flush raises in the waiting writer"""
+        def sink(records):
+            raise OSError("disk full")
+
+        writer = GroupCommitWriter(sink, window=0)
+        with self.assertRaises(OSError):
+            writer.wait(writer.enqueue(b'record'))
+        writer.close()
+
+    def test_journal_recovers_group_committed_writes(self):
+        """Test that group-committed records are replayed after a restart"""
+        tmpdir = tempfile.mkdtemp()
+        try:
+            journal, repo = open_amenities(tmpdir, fsync=True, group_commit=True)
+            threads = [threading.Thread(target=repo.add, args=(Amenity(f"Amenity {n}"),))
+                       for n in range(16)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            expected = names(repo)
+            journal.close()
+
+            journal, recovered = open_amenities(tmpdir)
+            self.assertEqual(len(expected), 16)
+            self.assertEqual(names(recovered), expected)
+            journal.close()
+        finally:
+            shutil.rmtree(tmpdir)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,1090 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the HBnB persistence layer
+Tests repository CRUD behaviour and secondary indexes
+"""
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import unittest
+import uuid
+from datetime import datetime
+
+from app.models import User, Place, Amenity
+from app.models.ids import IdGenerator, id_bytes, id_from_bytes
+from app.persistence.repository import InMemoryRepository, page_key
+from app.persistence.bitmap import BitmapIndex
+from app.persistence.codec import dump_state, load_state, new_instance
+from app.persistence.geo import GeoIndex, haversine_km
+from app.persistence.relations import ReverseIndex
+from app.persistence.search import TextIndex
+from app.persistence.sqlite_repository import SQLiteDatabase, SQLiteRepository
+from app.services.facade import HBnBFacade
+from testutils import make_user
+
+
+class Row:
+    """Minimal stored object: an id plus arbitrary attributes"""
+    _next_id = 0
+
+    def __init__(self, **attrs):
+        Row._next_id += 1
+        self.id = f"row-{Row._next_id}"
+        self.__dict__.update(attrs)
+
+    def update(self, data):
+        for key, value in data.items():
+            setattr(self, key, value)
+
+
+class TestInMemoryIndexes(unittest.TestCase):
+    """Test cases for InMemoryRepository secondary indexes"""
+
+    def setUp(self):
+        self.repo = InMemoryRepository()
+        self.repo.create_index('email', unique=True)
+        self.repo.create_index('city')
+
+    def test_unique_lookup(self):
+        """Test get_by_attribute through a unique index"""
+        alice = Row(email='alice@example.com', city='Paris')
+        self.repo.add(alice)
+        self.assertIs(self.repo.get_by_attribute('email', 'alice@example.com'), alice)
+        self.assertIsNone(self.repo.get_by_attribute('email', 'bob@example.com'))
+
+    def test_unique_violation_rejected(self):
+        """Test that a duplicate unique value is rejected without side effects"""
+        self.repo.add(Row(email='alice@example.com', city='Paris'))
+        duplicate = Row(email='alice@example.com', city='Rome')
+        with self.assertRaises(ValueError):
+            self.repo.add(duplicate)
+        self.assertIsNone(self.repo.get(duplicate.id))
+        self.assertEqual(self.repo.get_all_by_attribute('city', 'Rome'), [])
+
+    def test_non_unique_lookup(self):
+        """Test get_all_by_attribute through a non-unique index"""
+        a = Row(email='a@example.com', city='Paris')
+        b = Row(email='b@example.com', city='Paris')
+        c = Row(email='c@example.com', city='Rome')
+        for row in (a, b, c):
+            self.repo.add(row)
+        self.assertEqual(self.repo.get_all_by_attribute('city', 'Paris'), [a, b])
+        self.assertIs(self.repo.get_by_attribute('city', 'Paris'), a)
+
+    def test_update_moves_entry(self):
+        """Test that update keeps indexes in sync"""
+        row = Row(email='old@example.com', city='Paris')
+        self.repo.add(row)
+        self.repo.update(row.id, {'email': 'new@example.com', 'city': 'Rome'})
+        self.assertIsNone(self.repo.get_by_attribute('email', 'old@example.com'))
+        self.assertIs(self.repo.get_by_attribute('email', 'new@example.com'), row)
+        self.assertEqual(self.repo.get_all_by_attribute('city', 'Paris'), [])
+        self.assertEqual(self.repo.get_all_by_attribute('city', 'Rome'), [row])
+
+    def test_update_to_taken_value_rejected(self):
+        """Test that update cannot steal another row's unique value"""
+        a = Row(email='a@example.com', city='Paris')
+        b = Row(email='b@example.com', city='Paris')
+        self.repo.add(a)
+        self.repo.add(b)
+        with self.assertRaises(ValueError):
+            self.repo.update(b.id, {'email': 'a@example.com'})
+        self.assertEqual(b.email, 'b@example.com')
+        self.assertIs(self.repo.get_by_attribute('email', 'a@example.com'), a)
+
+    def test_delete_removes_entry(self):
+        """Test that delete frees the indexed value"""
+        row = Row(email='gone@example.com', city='Paris')
+        self.repo.add(row)
+        self.repo.delete(row.id)
+        self.assertIsNone(self.repo.get_by_attribute('email', 'gone@example.com'))
+        self.assertEqual(self.repo.get_all_by_attribute('city', 'Paris'), [])
+        self.repo.add(Row(email='gone@example.com', city='Paris'))
+
+    def test_scan_fallback(self):
+        """Test that unindexed attributes still resolve by scanning"""
+        row = Row(email='a@example.com', city='Paris', zip='75001')
+        self.repo.add(row)
+        self.assertIs(self.repo.get_by_attribute('zip', '75001'), row)
+        self.assertEqual(self.repo.get_all_by_attribute('zip', '75001'), [row])
+
+    def test_index_built_from_existing_rows(self):
+        """Test that create_index indexes rows added before it"""
+        repo = InMemoryRepository()
+        row = Row(name='WiFi')
+        repo.add(row)
+        repo.create_index('name', unique=True)
+        self.assertIs(repo.get_by_attribute('name', 'WiFi'), row)
+
+    def test_id_pages_use_the_id_index(self):
+        """Test that pages in id order walk the id index, not the whole table"""
+        rows = [Row(email=f"{n}@example.com", city='Paris') for n in range(10)]
+        random.shuffle(rows)
+        self.repo.add_many(rows[:5])
+        for row in rows[5:]:
+            self.repo.add(row)
+        self.repo.delete(rows[0].id)
+
+        def no_scan():
+            raise AssertionError("scanned the table")
+        self.repo.iter_all = no_scan
+        expected = sorted(row.id for row in rows[1:])
+        first = self.repo.iter_page(limit=4)
+        rest = self.repo.iter_page(after_key=first[-1].id, limit=None)
+        self.assertEqual([row.id for row in first + rest], expected)
+        self.assertEqual([row.id for row in self.repo.iter_page(limit=3, descending=True)],
+                         expected[::-1][:3])
+
+
+class TestSortedIndex(unittest.TestCase):
+    """Test cases for InMemoryRepository ordered indexes"""
+
+    def setUp(self):
+        self.repo = InMemoryRepository()
+        self.repo.create_index('price', ordered=True)
+        self.rows = [Row(price=price) for price in [50, 10, 30, 30, 80, 20]]
+        self.repo.add_many(self.rows[:4])
+        for row in self.rows[4:]:
+            self.repo.add(row)
+
+    def prices(self, **options):
+        return [row.price for row in self.repo.iter_page(order_by='price', **options)]
+
+    def test_sorted_pages(self):
+        """Test ascending and descending walks with ties broken by id"""
+        self.assertEqual(self.prices(), [10, 20, 30, 30, 50, 80])
+        self.assertEqual(self.prices(descending=True), [80, 50, 30, 30, 20, 10])
+        first = self.repo.iter_page(limit=3, order_by='price')
+        rest = self.repo.iter_page(page_key(first[-1], 'price'), order_by='price')
+        self.assertEqual([r.id for r in first + rest],
+                         [r.id for r in sorted(self.rows, key=lambda r: (r.price, r.id))])
+
+    def test_range(self):
+        """Test inclusive range filters, alone and with a cursor"""
+        self.assertEqual(self.prices(ranges={'price': (20, 50)}), [20, 30, 30, 50])
+        self.assertEqual(self.prices(ranges={'price': (None, 25)}, descending=True), [20, 10])
+        page = self.repo.iter_page(limit=2, order_by='price', ranges={'price': (20, 50)})
+        self.assertEqual(self.prices(after_key=page_key(page[-1], 'price'),
+                                     ranges={'price': (20, 50)}), [30, 50])
+
+    def test_update_and_delete_move_entries(self):
+        """Test that updates re-sort and deletes remove index entries"""
+        self.repo.update(self.rows[1].id, {'price': 90})
+        self.repo.delete(self.rows[4].id)
+        self.assertEqual(self.prices(), [20, 30, 30, 50, 90])
+        self.assertEqual(self.repo.get_all_by_attribute('price', 30),
+                         sorted(self.rows[2:4], key=lambda r: r.id))
+
+
+class RepositoryConformance:
+    """
+    Behaviour every Repository engine must share.
+    Subclasses provide make_repo(model).
+    """
+
+    def make_repo(self, model):
+        raise NotImplementedError
+
+    def setUp(self):
+        self.users = self.make_repo(User)
+        self.amenities = self.make_repo(Amenity)
+        self.places = self.make_repo(Place)
+        self.users.create_index('email', unique=True)
+        self.amenities.create_index('name', unique=True)
+
+    def test_add_and_get(self):
+        """Test that an added entity can be read back by id"""
+        user = make_user()
+        self.users.add(user)
+        loaded = self.users.get(user.id)
+        self.assertEqual(loaded.id, user.id)
+        self.assertEqual(loaded.email, user.email)
+        self.assertIsNone(self.users.get('missing-id'))
+
+    def test_get_all_in_insertion_order(self):
+        """Test that get_all returns every entity in insertion order"""
+        names = ['WiFi', 'Pool', 'Parking']
+        for name in names:
+            self.amenities.add(Amenity(name))
+        self.assertEqual([a.name for a in self.amenities.get_all()], names)
+
+    def test_id_pages_in_creation_order(self):
+        """Test that paging by id returns entities oldest first"""
+        amenities = [Amenity(f"Amenity {n}") for n in range(30)]
+        self.amenities.add_many(reversed(amenities))
+        first = self.amenities.iter_page(None, 20)
+        rest = self.amenities.iter_page(first[-1].id, 20)
+        self.assertEqual([a.name for a in first + rest], [a.name for a in amenities])
+
+    def test_update(self):
+        """Test that update validates and applies changes"""
+        amenity = Amenity('WiFi')
+        self.amenities.add(amenity)
+        self.amenities.update(amenity.id, {'name': 'Fast WiFi'})
+        self.assertEqual(self.amenities.get(amenity.id).name, 'Fast WiFi')
+        self.assertIsNone(self.amenities.get_by_attribute('name', 'WiFi'))
+        with self.assertRaises(ValueError):
+            self.amenities.update(amenity.id, {'name': ''})
+
+    def test_delete(self):
+        """Test that delete removes the entity and frees its index entries"""
+        amenity = Amenity('WiFi')
+        self.amenities.add(amenity)
+        self.amenities.delete(amenity.id)
+        self.assertIsNone(self.amenities.get(amenity.id))
+        self.assertIsNone(self.amenities.get_by_attribute('name', 'WiFi'))
+        self.assertEqual(self.amenities.get_all(), [])
+        self.amenities.delete(amenity.id)
+
+    def test_get_by_attribute(self):
+        """Test indexed and unindexed attribute lookups"""
+        user = make_user(first_name='Alice')
+        self.users.add(user)
+        self.assertEqual(self.users.get_by_attribute('email', user.email).id, user.id)
+        self.assertEqual(self.users.get_by_attribute('first_name', 'Alice').id, user.id)
+        self.assertIsNone(self.users.get_by_attribute('email', 'nobody@example.com'))
+
+    def test_unique_index(self):
+        """Test that unique indexes reject duplicates on add and update"""
+        self.amenities.add(Amenity('WiFi'))
+        with self.assertRaises(ValueError):
+            self.amenities.add(Amenity('WiFi'))
+        pool = Amenity('Pool')
+        self.amenities.add(pool)
+        with self.assertRaises(ValueError):
+            self.amenities.update(pool.id, {'name': 'WiFi'})
+        self.assertEqual(len(self.amenities.get_all()), 2)
+
+    def test_non_unique_index_on_reference(self):
+        """Test that references are indexed by the referenced entity's id"""
+        self.places.create_index('owner')
+        owner, other = make_user(), make_user()
+        self.users.add(owner)
+        self.users.add(other)
+        mine = [Place(f"Place {n}", None, 100, 0, 0, owner) for n in range(2)]
+        for place in mine + [Place('Other', None, 100, 0, 0, other)]:
+            self.places.add(place)
+        found = self.places.get_all_by_attribute('owner', owner)
+        self.assertEqual([p.id for p in found], [p.id for p in mine])
+
+    def test_references_round_trip(self):
+        """Test that references and relationship lists survive storage"""
+        owner = make_user()
+        wifi = Amenity('WiFi')
+        self.users.add(owner)
+        self.amenities.add(wifi)
+        place = Place('Loft', 'Nice', 120.0, 48.85, 2.35, owner)
+        place.add_amenity(wifi)
+        self.places.add(place)
+        loaded = self.places.get(place.id)
+        self.assertEqual(loaded.owner.id, owner.id)
+        self.assertEqual([a.id for a in loaded.amenities], [wifi.id])
+        self.assertEqual(loaded.created_at, place.created_at)
+
+    def test_iter_all(self):
+        """Test that iter_all streams every entity"""
+        names = ['WiFi', 'Pool', 'Parking']
+        for name in names:
+            self.amenities.add(Amenity(name))
+        self.assertEqual(sorted(a.name for a in self.amenities.iter_all()), sorted(names))
+
+    def test_iter_page_by_id(self):
+        """Test that keyset pages cover every entity once, in id order"""
+        ids = []
+        for n in range(7):
+            amenity = Amenity(f"Amenity {n}")
+            self.amenities.add(amenity)
+            ids.append(amenity.id)
+        seen, after = [], None
+        while True:
+            page = self.amenities.iter_page(after, limit=3)
+            if not page:
+                break
+            seen.extend(a.id for a in page)
+            after = page_key(page[-1])
+        self.assertEqual(seen, sorted(ids))
+
+    def test_iter_page_stable_under_inserts(self):
+        """Test that a cursor is unaffected by rows added before it"""
+        for n in range(4):
+            self.amenities.add(Amenity(f"Amenity {n}"))
+        first = self.amenities.iter_page(None, limit=2)
+        self.amenities.add(Amenity('Late'))
+        rest = self.amenities.iter_page(page_key(first[-1]), limit=10)
+        later = sorted(a.id for a in self.amenities.get_all() if a.id > first[-1].id)
+        self.assertEqual([a.id for a in rest], later)
+
+    def test_iter_page_by_indexed_attribute(self):
+        """Test keyset pages ordered by an indexed attribute"""
+        for name in ['Pool', 'WiFi', 'Gym', 'Sauna']:
+            self.amenities.add(Amenity(name))
+        first = self.amenities.iter_page(None, limit=2, order_by='name')
+        rest = self.amenities.iter_page(page_key(first[-1], 'name'), limit=2, order_by='name')
+        self.assertEqual([a.name for a in first + rest], ['Gym', 'Pool', 'Sauna', 'WiFi'])
+
+    def test_add_many_and_get_many(self):
+        """Test batch inserts and batch lookups, with None for missing ids"""
+        amenities = [Amenity(f"Amenity {n}") for n in range(5)]
+        self.amenities.add_many(amenities)
+        ids = [a.id for a in amenities]
+        found = self.amenities.get_many(ids[:2] + ['missing-id'] + ids[2:])
+        self.assertEqual([a.name if a else None for a in found],
+                         ['Amenity 0', 'Amenity 1', None, 'Amenity 2', 'Amenity 3', 'Amenity 4'])
+        self.assertEqual(self.amenities.get_by_attribute('name', 'Amenity 3').id, ids[3])
+
+    def test_add_many_unique_violation(self):
+        """Test that a batch with a duplicate unique value adds nothing"""
+        self.amenities.add(Amenity('WiFi'))
+        with self.assertRaises(ValueError):
+            self.amenities.add_many([Amenity('Pool'), Amenity('WiFi')])
+        with self.assertRaises(ValueError):
+            self.amenities.add_many([Amenity('Spa'), Amenity('Spa')])
+        self.assertEqual([a.name for a in self.amenities.get_all()], ['WiFi'])
+
+    def test_update_many_and_delete_many(self):
+        """Test batch updates and batch deletes"""
+        amenities = [Amenity(f"Amenity {n}") for n in range(4)]
+        self.amenities.add_many(amenities)
+        self.amenities.update_many([(amenities[0].id, {'name': 'WiFi'}),
+                                    (amenities[1].id, {'name': 'Pool'}),
+                                    ('missing-id', {'name': 'Spa'})])
+        self.assertEqual(self.amenities.get_by_attribute('name', 'Pool').id, amenities[1].id)
+        with self.assertRaises(ValueError):
+            self.amenities.update_many([(amenities[2].id, {'name': 'WiFi'})])
+        self.amenities.delete_many([amenities[0].id, amenities[3].id, 'missing-id'])
+        self.assertEqual(sorted(a.name for a in self.amenities.get_all()), ['Amenity 2', 'Pool'])
+        self.assertIsNone(self.amenities.get_by_attribute('name', 'WiFi'))
+
+    def test_iter_page_price_range(self):
+        """Test range-filtered, price-sorted pages over an ordered index"""
+        self.places.create_index('price', ordered=True)
+        owner = make_user()
+        self.users.add(owner)
+        prices = [120, 40, 75, 40, 300, 90]
+        self.places.add_many([Place(f"Place {n}", None, price, 0, 0, owner)
+                              for n, price in enumerate(prices)])
+        page = self.places.iter_page(None, 2, 'price', ranges={'price': (40, 120)})
+        rest = self.places.iter_page(page_key(page[-1], 'price'), None, 'price',
+                                     ranges={'price': (40, 120)})
+        self.assertEqual([p.price for p in page + rest], [40, 40, 75, 90, 120])
+        priciest = self.places.iter_page(None, 3, 'price', descending=True)
+        self.assertEqual([p.price for p in priciest], [300, 120, 90])
+
+
+class TestInMemoryConformance(RepositoryConformance, unittest.TestCase):
+    """Conformance tests for InMemoryRepository"""
+
+    def make_repo(self, model):
+        return InMemoryRepository()
+
+
+class TestSQLiteConformance(RepositoryConformance, unittest.TestCase):
+    """Conformance tests for SQLiteRepository"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'hbnb.db')
+        self.database = SQLiteDatabase(self.path)
+        super().setUp()
+
+    def tearDown(self):
+        self.database.close()
+        self.tmpdir.cleanup()
+
+    def make_repo(self, model):
+        return SQLiteRepository(self.database, model)
+
+    def test_reopen_database(self):
+        """Test that entities and indexes survive reopening the database"""
+        owner = make_user()
+        self.users.add(owner)
+        place = Place('Loft', None, 120.0, 0, 0, owner)
+        self.places.add(place)
+        self.database.close()
+
+        database = SQLiteDatabase(self.path)
+        try:
+            users = SQLiteRepository(database, User)
+            places = SQLiteRepository(database, Place)
+            users.create_index('email', unique=True)
+            loaded = places.get(place.id)
+            self.assertEqual(loaded.title, 'Loft')
+            self.assertIs(loaded.owner, users.get(owner.id))
+            self.assertEqual(users.get_by_attribute('email', owner.email).id, owner.id)
+        finally:
+            database.close()
+
+    def test_failed_update_leaves_entity(self):
+        """Test that an update rejected by the database leaves the live entity as it was"""
+        wifi, pool, spa = Amenity('WiFi'), Amenity('Pool'), Amenity('Spa')
+        self.amenities.add_many([wifi, pool, spa])
+        with self.assertRaises(ValueError):
+            self.amenities.update(pool.id, {'name': 'WiFi'})
+        with self.assertRaises(ValueError):
+            self.amenities.update_many([(spa.id, {'name': 'Sauna'}),
+                                        (pool.id, {'name': 'WiFi'})])
+        self.assertEqual((pool.name, spa.name), ('Pool', 'Spa'))
+        self.assertEqual(self.amenities.get_many([pool.id, spa.id]), [pool, spa])
+        self.assertEqual(self.amenities.get_by_attribute('name', 'Pool').id, pool.id)
+
+    def test_lock_excludes_writers(self):
+        """Test that a locked id holds off another thread's lock"""
+        amenity = Amenity('WiFi')
+        self.amenities.add(amenity)
+        events = []
+
+        def other():
+            with self.amenities.lock(amenity.id):
+                events.append('other')
+
+        with self.amenities.lock_many([amenity.id]):
+            thread = threading.Thread(target=other)
+            thread.start()
+            thread.join(timeout=0.1)
+            events.append('locked')
+        thread.join()
+        self.assertEqual(events, ['locked', 'other'])
+
+    def test_facade_reconfigure_closes_database(self):
+        """Test that reconfiguring the facade closes its previous database"""
+        facade = HBnBFacade('sqlite', database=os.path.join(self.tmpdir.name, 'facade.db'))
+        connection = facade.database.connection()
+        facade.configure('memory')
+        self.assertIsNone(facade.database)
+        with self.assertRaises(sqlite3.ProgrammingError):
+            connection.execute('SELECT 1')
+
+    def test_ids_stored_as_blobs(self):
+        """Test that UUID ids are stored as 16 bytes and other ids as given"""
+        amenity = Amenity('WiFi')
+        legacy = Amenity('Pool')
+        legacy.id = 'legacy-id'
+        self.amenities.add_many([amenity, legacy])
+        rows = self.database.connection().execute('SELECT id FROM amenity ORDER BY rowid')
+        self.assertEqual([row[0] for row in rows], [id_bytes(amenity.id), 'legacy-id'])
+        self.assertEqual(self.amenities.get_many(['legacy-id', amenity.id]), [legacy, amenity])
+        self.assertIsNone(self.amenities.get(amenity.id.upper()))
+
+    def test_text_id_table(self):
+        """Test that a table created with text ids keeps working"""
+        self.database.connection().execute(
+            'CREATE TABLE user_v1 (id TEXT PRIMARY KEY, version INTEGER NOT NULL, '
+            'state TEXT NOT NULL)')
+        users = SQLiteRepository(self.database, User, table='user_v1')
+        user = make_user()
+        users.add(user)
+        users.update(user.id, {'last_name': 'Smith'})
+        row = self.database.connection().execute('SELECT id FROM user_v1').fetchone()
+        self.assertEqual(row[0], user.id)
+        self.assertEqual(users.get(user.id).last_name, 'Smith')
+
+
+class TestIdGenerator(unittest.TestCase):
+    """Test cases for the time-sortable id generator"""
+
+    def test_uuid7_format(self):
+        """Test that ids are canonical version 7 UUIDs"""
+        obj_id = IdGenerator().new_id()
+        parsed = uuid.UUID(obj_id)
+        self.assertEqual((parsed.version, parsed.variant), (7, uuid.RFC_4122))
+        self.assertEqual(str(parsed), obj_id)
+        self.assertEqual(id_bytes(obj_id), parsed.bytes)
+        self.assertEqual(id_from_bytes(parsed.bytes), obj_id)
+        self.assertIsNone(id_bytes(obj_id.upper()))
+
+    def test_ids_increase(self):
+        """Test that single and batch ids come out unique and in order"""
+        generator = IdGenerator()
+        ids = [generator.new_id() for _ in range(5000)]
+        ids += generator.new_ids(5000) + [generator.new_id()]
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(len(set(ids)), len(ids))
+        self.assertEqual(sorted(map(id_bytes, ids)), list(map(id_bytes, ids)))
+
+
+class TestFacadeBulk(unittest.TestCase):
+    """Test cases for the HBnBFacade bulk creation methods"""
+
+    def setUp(self):
+        self.facade = HBnBFacade()
+
+    def test_bulk_seed(self):
+        """Test creating users, amenities, places and reviews in batches"""
+        users = self.facade.create_users([
+            {'first_name': 'Bulk', 'last_name': 'User', 'email': f"bulk{n}@example.com"}
+            for n in range(3)])
+        wifi, pool = self.facade.create_amenities([{'name': 'WiFi'}, {'name': 'Pool'}])
+        places = self.facade.create_places([
+            {'title': f"Place {n}", 'description': None, 'price': 10, 'latitude': 0.0,
+             'longitude': 0.0, 'owner_id': users[n].id, 'amenities': [wifi.id, pool.id]}
+            for n in range(3)])
+        reviews = self.facade.create_reviews([
+            {'text': 'Nice', 'rating': 4, 'user_id': users[0].id, 'place_id': place.id}
+            for place in places for _ in range(2)])
+
+        self.assertEqual(len(self.facade.get_all_users()), 3)
+        self.assertEqual([a.name for a in places[1].amenities], ['WiFi', 'Pool'])
+        self.assertEqual(len(reviews), 6)
+        self.assertTrue(all(len(place.reviews) == 2 for place in places))
+        self.assertIs(self.facade.get_user_by_email('bulk2@example.com'), users[2])
+
+    def test_bulk_users_all_or_nothing(self):
+        """Test that one invalid user leaves no user and no reserved email"""
+        with self.assertRaises(ValueError):
+            self.facade.create_users([
+                {'first_name': 'Bulk', 'last_name': 'User', 'email': 'bulk.ok@example.com'},
+                {'first_name': 'Bulk', 'last_name': 'User', 'email': 'not-an-email'}])
+        self.assertEqual(self.facade.get_all_users(), [])
+        self.facade.create_user({'first_name': 'Bulk', 'last_name': 'User',
+                                 'email': 'bulk.ok@example.com'})
+
+    def test_bulk_places_unknown_owner(self):
+        """Test that an unknown owner id rejects the whole batch"""
+        with self.assertRaises(ValueError):
+            self.facade.create_places([{'title': 'Loft', 'description': None, 'price': 10,
+                                        'latitude': 0.0, 'longitude': 0.0,
+                                        'owner_id': 'missing-id'}])
+        self.assertEqual(self.facade.get_all_places(), [])
+
+
+class TestGeoIndex(unittest.TestCase):
+    """Test cases for the place location grid index"""
+
+    def setUp(self):
+        rng = random.Random(7)
+        self.index = GeoIndex(cell_size=1.0)
+        self.points = {}
+        for n in range(3000):
+            # a dense cluster across the antimeridian plus scattered points
+            if n % 2:
+                lat, lon = rng.uniform(-90, 90), rng.uniform(-180, 180)
+            else:
+                lat, lon = rng.gauss(-15, 2), (rng.gauss(180, 2) + 180) % 360 - 180
+            self.points[n] = (max(-90.0, min(90.0, lat)), lon)
+            self.index.insert(n, *self.points[n])
+
+    def brute_force(self, lat, lon):
+        return sorted((haversine_km(lat, lon, *point), obj_id)
+                      for obj_id, point in self.points.items())
+
+    def test_nearest_matches_brute_force(self):
+        """Test k-nearest results against a linear scan"""
+        for lat, lon, k in [(-15, 179.5, 10), (0, 0, 5), (89.5, 10, 3), (-15, -179.9, 40)]:
+            expected = self.brute_force(lat, lon)[:k]
+            self.assertEqual([obj_id for _, obj_id in self.index.nearest(lat, lon, k)],
+                             [obj_id for _, obj_id in expected])
+
+    def test_within_matches_brute_force(self):
+        """Test radius results against a linear scan"""
+        for lat, lon, radius in [(-15, 180, 150), (40, -100, 2000), (-89, 0, 500)]:
+            expected = [obj_id for d, obj_id in self.brute_force(lat, lon) if d <= radius]
+            self.assertEqual([obj_id for _, obj_id in self.index.within(lat, lon, radius)],
+                             expected)
+
+    def test_move_and_remove(self):
+        """Test that re-inserting moves a point and remove drops it"""
+        self.index.insert(0, 10.0, 10.0)
+        self.assertEqual(self.index.nearest(10.0, 10.0, 1)[0][1], 0)
+        self.index.remove(0)
+        self.assertNotIn(0, [obj_id for _, obj_id in self.index.within(10.0, 10.0, 1)])
+        self.assertEqual(len(self.index), 2999)
+
+    def test_cell_size_must_divide_360(self):
+        """Test that cell sizes leaving a partial column at the antimeridian are rejected"""
+        for cell_size in (7.0, 0.7, 0, -1):
+            with self.assertRaises(ValueError):
+                GeoIndex(cell_size=cell_size)
+        index = GeoIndex(cell_size=6.0)
+        index.insert('p', -38.60, 176.49)
+        self.assertEqual([obj_id for _, obj_id in index.within(-38.21, 180.0, 500)], ['p'])
+        self.assertEqual(index.nearest(-38.21, -179.9, 1)[0][1], 'p')
+
+    def test_facade_tracks_place_moves(self):
+        """Test that the facade keeps the index in step with place updates"""
+        facade = HBnBFacade()
+        owner = facade.create_user({'first_name': 'Geo', 'last_name': 'Owner',
+                                    'email': 'geo.owner@example.com'})
+        place = facade.create_place({'title': 'Loft', 'description': None, 'price': 10,
+                                     'latitude': 48.85, 'longitude': 2.35,
+                                     'owner_id': owner.id})
+        self.assertEqual(facade.get_places_within(48.85, 2.35, 5)[0][0], place)
+        facade.update_place(place.id, {'latitude': 45.76, 'longitude': 4.83})
+        self.assertEqual(facade.get_places_within(48.85, 2.35, 5), [])
+        self.assertEqual(facade.get_nearest_places(45.7, 4.8, 1)[0][0], place)
+
+
+class TestTextIndex(unittest.TestCase):
+    """Test cases for the BM25 full-text index"""
+
+    def setUp(self):
+        self.index = TextIndex()
+        self.index.put('a:title', 'a', 'Seaside cottage', weight=3)
+        self.index.put('a:description', 'a', 'Quiet cottage near the sea')
+        self.index.put('b:title', 'b', 'City loft', weight=3)
+        self.index.put('b:description', 'b', 'Loft with a sea view and a cottage garden')
+        self.index.put('c:title', 'c', 'Mountain cabin', weight=3)
+
+    def ids(self, query, **options):
+        return [doc_id for _, doc_id in self.index.search(query, **options)]
+
+    def test_ranking(self):
+        """Test that title matches outrank description matches"""
+        self.assertEqual(self.ids('cottage'), ['a', 'b'])
+        self.assertEqual(self.ids('loft'), ['b'])
+        self.assertEqual(set(self.ids('cabin sea')), {'a', 'b', 'c'})
+        self.assertEqual(self.ids('castle'), [])
+        self.assertEqual(self.ids('   '), [])
+
+    def test_prefix(self):
+        """Test that prefix=True expands the last query word only"""
+        self.assertEqual(self.ids('mount'), [])
+        self.assertEqual(self.ids('mount', prefix=True), ['c'])
+        self.assertEqual(set(self.ids('sea', prefix=True)), {'a', 'b'})
+        self.assertEqual(self.ids('mount loft', prefix=True), ['b'])
+
+    def test_incremental_updates(self):
+        """Test that replacing and removing a source updates the postings"""
+        self.index.put('c:title', 'c', 'Mountain cottage', weight=3)
+        self.assertIn('c', self.ids('cottage'))
+        self.assertEqual(self.ids('cabin'), [])
+        self.index.remove('c:title')
+        self.assertEqual(self.ids('mountain'), [])
+        self.assertEqual(len(self.index), 2)
+        self.index.remove('a:title')
+        self.index.remove('a:description')
+        self.assertEqual(self.ids('quiet', prefix=True), [])
+        self.assertEqual(self.index._vocabulary, sorted(self.index._postings))
+
+    def test_facade_tracks_text(self):
+        """Test that the facade indexes place and review text as they change"""
+        facade = HBnBFacade()
+        owner = facade.create_user({'first_name': 'Text', 'last_name': 'Owner',
+                                    'email': 'text.owner@example.com'})
+        place = facade.create_place({'title': 'Loft', 'description': 'Bright', 'price': 10,
+                                     'latitude': 0.0, 'longitude': 0.0,
+                                     'owner_id': owner.id})
+        review = facade.create_review({'text': 'Lovely terrace', 'rating': 5,
+                                       'user_id': owner.id, 'place_id': place.id})
+        self.assertEqual(facade.search_places('terrace')[0][0], place)
+        facade.update_place(place.id, {'title': 'Studio'})
+        self.assertEqual(facade.search_places('loft'), [])
+        self.assertEqual(facade.search_places('stud', prefix=True)[0][0], place)
+        facade.update_review(review.id, {'text': 'Noisy street'})
+        self.assertEqual(facade.search_places('terrace'), [])
+        facade.delete_review(review.id)
+        self.assertEqual(facade.search_places('noisy'), [])
+
+
+class TestBitmapIndex(unittest.TestCase):
+    """Test cases for the amenity bitmap index"""
+
+    def setUp(self):
+        self.index = BitmapIndex()
+        # object n has key 'k<i>' for every bit i set in n
+        self.index.add_many((n, f"k{i}") for n in range(64) for i in range(6) if n >> i & 1)
+
+    def ids(self, **filters):
+        return sorted(self.index.iter_ids(self.index.match(**filters)))
+
+    def test_all_and_any(self):
+        """Test AND and OR filters against the definition"""
+        self.assertEqual(self.ids(all_of=['k0', 'k5']), [n for n in range(64) if n & 33 == 33])
+        self.assertEqual(self.ids(any_of=['k1', 'k2']), [n for n in range(64) if n & 6])
+        self.assertEqual(self.ids(all_of=['k0'], any_of=['k4', 'k5']),
+                         [n for n in range(64) if n & 1 and n & 48])
+        self.assertEqual(self.ids(all_of=['k0', 'missing']), [])
+        # object 0 has no key, so it was never indexed
+        self.assertEqual(self.ids(), list(range(1, 64)))
+
+    def test_add_discard_remove(self):
+        """Test that single updates and removals change the matches"""
+        self.index.add(0, 'k0')
+        self.index.add(64, 'k0')
+        self.assertIn(0, self.ids(all_of=['k0']))
+        self.assertIn(64, self.ids(all_of=['k0']))
+        self.index.discard(1, 'k0')
+        self.assertNotIn(1, self.ids(all_of=['k0']))
+        self.index.remove(63)
+        self.assertNotIn(63, self.ids(any_of=['k0', 'k1']))
+        self.assertNotIn(63, self.ids())
+
+    def test_blocks(self):
+        """Test filters and single-bit changes on bitmaps spanning several blocks"""
+        from app.persistence.bitmap import BLOCK_BITS
+        index = BitmapIndex()
+        index.add_many((n, 'even' if n % 2 else 'odd') for n in range(3 * BLOCK_BITS))
+        index.add(BLOCK_BITS + 1, 'odd')
+        index.discard(2 * BLOCK_BITS + 1, 'even')
+        matches = index.match(all_of=['even', 'odd'])
+        self.assertEqual(list(index.iter_ids(matches)), [BLOCK_BITS + 1])
+        self.assertEqual(BitmapIndex.count(index.match(any_of=['even'])), 3 * BLOCK_BITS // 2 - 1)
+        self.assertFalse(index.contains(index.match(any_of=['even']), 2 * BLOCK_BITS + 1))
+        self.assertEqual(BitmapIndex.count(index.match()), 3 * BLOCK_BITS)
+
+    def test_remove_clears_given_keys_and_frees_ordinal(self):
+        """Test that removal clears only the named keys and reuses the ordinal"""
+        size = len(self.index._ids)
+        self.index.remove(63, keys=[f"k{i}" for i in range(6)])
+        self.assertNotIn(63, self.ids())
+        self.assertNotIn(63, self.ids(any_of=[f"k{i}" for i in range(6)]))
+        self.index.add(100, 'k0')
+        self.assertEqual(len(self.index._ids), size)
+        self.assertIn(100, self.ids(all_of=['k0']))
+        self.assertNotIn(100, self.ids(all_of=['k1']))
+
+    def test_facade_amenity_filters(self):
+        """Test the places list amenity filters with pagination"""
+        facade = HBnBFacade()
+        owner = facade.create_user({'first_name': 'Bitmap', 'last_name': 'Owner',
+                                    'email': 'bitmap.owner@example.com'})
+        wifi, tub = facade.create_amenities([{'name': 'WiFi'}, {'name': 'Bathtub'}])
+        places = facade.create_places([
+            {'title': f"Place {n}", 'description': None, 'price': 10 + n, 'latitude': 0.0,
+             'longitude': 0.0, 'owner_id': owner.id,
+             'amenities': [wifi.id] + ([tub.id] if n % 2 else [])}
+            for n in range(5)])
+        first = facade.get_places_page(None, 1, sort='-price', amenities=[wifi.id, tub.id])
+        self.assertEqual(first, [places[3]])
+        rest = facade.get_places_page(page_key(first[-1], 'price'), 10, sort='-price',
+                                      amenities=[wifi.id, tub.id])
+        self.assertEqual(rest, [places[1]])
+        # dense matches walk the price index instead
+        self.assertEqual(facade.get_places_page(None, 2, sort='price', amenities=[wifi.id]),
+                         places[:2])
+        self.assertEqual(facade.get_places_page((11.0, places[1].id), 2, sort='price',
+                                                amenities=[wifi.id], max_price=13),
+                         places[2:4])
+        facade.remove_place_amenity(places[3].id, tub.id)
+        facade.add_place_amenity(places[0].id, tub.id)
+        self.assertEqual(facade.get_places_page(None, 10, any_amenities=[tub.id], sort='price'),
+                         [places[0], places[1]])
+        self.assertEqual(len(places[3].amenities), 1)
+        # a place created after a delete reuses its ordinal, not its amenities
+        held = facade.place_amenities.match([tub.id])
+        facade.delete_place(places[1].id)
+        plain = facade.create_place({'title': 'Plain', 'description': None, 'price': 1,
+                                     'latitude': 0.0, 'longitude': 0.0, 'owner_id': owner.id,
+                                     'amenities': [wifi.id]})
+        self.assertIn(plain.id, list(facade.place_amenities.iter_ids(held)))
+        self.assertEqual(facade.get_places_page(None, 10, amenities=[tub.id], sort='price'),
+                         [places[0]])
+
+
+class TestRatingAggregates(unittest.TestCase):
+    """Test cases for the per-place rating aggregates"""
+
+    def setUp(self):
+        self.facade = HBnBFacade(rating_prior_weight=2)
+        self.user = self.facade.create_user({'first_name': 'Rating', 'last_name': 'User',
+                                             'email': f"rating.{id(self)}@example.com"})
+        self.place = self.facade.create_place({'title': 'Loft', 'description': None,
+                                               'price': 10, 'latitude': 0.0,
+                                               'longitude': 0.0, 'owner_id': self.user.id})
+
+    def review(self, rating, place=None):
+        return self.facade.create_review({'text': 'ok', 'rating': rating,
+                                          'user_id': self.user.id,
+                                          'place_id': (place or self.place).id})
+
+    def test_create_update_delete(self):
+        """Test that review writes update count, sum and histogram"""
+        first, second = self.review(5), self.review(2)
+        self.assertEqual((self.place.rating_count, self.place.rating_sum), (2, 7))
+        self.assertEqual(self.place.rating_histogram, [0, 1, 0, 0, 1])
+        self.facade.update_review(second.id, {'rating': 4})
+        self.assertEqual(self.place.rating_histogram, [0, 0, 0, 1, 1])
+        self.assertEqual(self.place.average_rating, 4.5)
+        self.facade.delete_review(first.id)
+        self.assertEqual((self.place.rating_count, self.place.rating_sum), (1, 4))
+        self.assertEqual(self.place.rating_histogram, [0, 0, 0, 1, 0])
+        self.assertEqual(self.facade.check_rating_aggregates(), {})
+
+    def test_bayesian_average(self):
+        """Test that a single review is shrunk towards the overall mean"""
+        other = self.facade.create_place({'title': 'Cabin', 'description': None,
+                                          'price': 10, 'latitude': 0.0, 'longitude': 0.0,
+                                          'owner_id': self.user.id})
+        self.review(5)
+        for _ in range(4):
+            self.review(2, other)
+        mean, weight = self.facade.rating_prior()
+        self.assertEqual((mean, weight), (13 / 5, 2))
+        self.assertAlmostEqual(self.place.bayesian_rating(mean, weight), (2 * mean + 5) / 3)
+        self.assertIsNone(self.facade.create_place({
+            'title': 'Empty', 'description': None, 'price': 10, 'latitude': 0.0,
+            'longitude': 0.0, 'owner_id': self.user.id}).average_rating)
+
+    def test_checker_repairs(self):
+        """Test that the checker reports and repairs drifted aggregates"""
+        self.review(3)
+        self.place.rating_count = 7
+        mismatches = self.facade.check_rating_aggregates(repair=True)
+        self.assertEqual(mismatches[self.place.id][1], (1, 3, [0, 0, 1, 0, 0]))
+        self.assertEqual(self.place.rating_count, 1)
+        self.assertEqual(self.facade.check_rating_aggregates(), {})
+
+    def test_aggregates_not_writable(self):
+        """Test that updates cannot overwrite the aggregates"""
+        with self.assertRaises(ValueError):
+            self.facade.update_place(self.place.id, {'rating_count': 3})
+
+
+class TestReverseIndexes(unittest.TestCase):
+    """Test cases for the reverse relationship indexes"""
+
+    def test_reverse_index(self):
+        """Test add, remove and pop on a reverse index"""
+        index = ReverseIndex()
+        index.add_many([('u1', 'p1'), ('u1', 'p2'), ('u2', 'p3')])
+        index.add('u1', 'p1')
+        self.assertEqual(index.children('u1'), ['p1', 'p2'])
+        index.remove('u1', 'p1')
+        index.remove('u1', 'missing')
+        self.assertEqual(index.children('u1'), ['p2'])
+        self.assertEqual(index.pop('u2'), ['p3'])
+        self.assertEqual((index.children('u2'), index.count('u1')), ([], 1))
+
+    def test_remove_review_keeps_order(self):
+        """Test that removing a review leaves the others in the order they were added"""
+        facade = HBnBFacade()
+        owner = facade.create_user({'first_name': 'Reverse', 'last_name': 'Owner',
+                                    'email': 'reverse.owner@example.com'})
+        place = facade.create_place({'title': 'Loft', 'description': None, 'price': 10,
+                                     'latitude': 0.0, 'longitude': 0.0, 'owner_id': owner.id})
+        reviews = [facade.create_review({'text': f"Review {n}", 'rating': 3,
+                                         'user_id': owner.id, 'place_id': place.id})
+                   for n in range(4)]
+        self.assertTrue(place.remove_review(reviews[0]))
+        self.assertFalse(place.remove_review(reviews[0]))
+        self.assertEqual(place.reviews, reviews[1:])
+        place.remove_review(reviews[2])
+        self.assertEqual(place.reviews, [reviews[1], reviews[3]])
+        place.add_review(reviews[2])
+        self.assertEqual(place.reviews, [reviews[1], reviews[3], reviews[2]])
+
+    def test_facade_navigates_backwards(self):
+        """Test places by owner and reviews by user through creates and deletes"""
+        facade = HBnBFacade()
+        owner, guest = facade.create_users([
+            {'first_name': 'Reverse', 'last_name': 'Host', 'email': 'reverse.host@example.com'},
+            {'first_name': 'Reverse', 'last_name': 'Guest', 'email': 'reverse.guest@example.com'}])
+        first = facade.create_place({'title': 'Loft', 'description': None, 'price': 10,
+                                     'latitude': 0.0, 'longitude': 0.0, 'owner_id': owner.id})
+        second, = facade.create_places([{'title': 'Cabin', 'description': None, 'price': 10,
+                                         'latitude': 0.0, 'longitude': 0.0,
+                                         'owner_id': owner.id}])
+        review = facade.create_review({'text': 'Nice', 'rating': 4, 'user_id': guest.id,
+                                       'place_id': first.id})
+        batch = facade.create_reviews([{'text': 'Fine', 'rating': 3, 'user_id': guest.id,
+                                        'place_id': second.id}])
+        self.assertEqual(facade.get_places_by_owner(owner.id), [first, second])
+        self.assertEqual(facade.get_places_by_owner(guest.id), [])
+        self.assertEqual(facade.get_reviews_by_user(guest.id), [review] + batch)
+        facade.delete_review(review.id)
+        self.assertEqual(facade.get_reviews_by_user(guest.id), batch)
+        self.assertEqual(first.reviews, [])
+
+
+class TestCascadingDeletes(unittest.TestCase):
+    """Test cases for the facade cascading deletes"""
+
+    def setUp(self):
+        self.facade = HBnBFacade()
+        tag = id(self)
+        self.host, self.guest = self.facade.create_users([
+            {'first_name': 'Cascade', 'last_name': 'Host', 'email': f"host.{tag}@example.com"},
+            {'first_name': 'Cascade', 'last_name': 'Guest', 'email': f"guest.{tag}@example.com"}])
+        self.wifi, = self.facade.create_amenities([{'name': f"WiFi {tag}"}])
+        self.loft, self.cabin = self.facade.create_places([
+            {'title': title, 'description': None, 'price': 10, 'latitude': 1.0,
+             'longitude': 1.0, 'owner_id': owner.id, 'amenities': [self.wifi.id]}
+            for title, owner in (('Harbour loft', self.host), ('Cabin', self.guest))])
+        self.stay = self.facade.create_review({'text': 'Lovely harbour', 'rating': 5,
+                                               'user_id': self.guest.id,
+                                               'place_id': self.loft.id})
+        self.visit = self.facade.create_review({'text': 'Fine', 'rating': 2,
+                                                'user_id': self.host.id,
+                                                'place_id': self.cabin.id})
+
+    def test_delete_place(self):
+        """Test that deleting a place deletes its reviews and leaves no index entry"""
+        self.assertTrue(self.facade.delete_place(self.loft.id))
+        self.assertFalse(self.facade.delete_place(self.loft.id))
+        self.assertIsNone(self.facade.get_review(self.stay.id))
+        self.assertEqual(self.facade.get_reviews_by_user(self.guest.id), [])
+        self.assertEqual(self.facade.get_places_by_owner(self.host.id), [])
+        self.assertEqual(self.facade.search_places('harbour'), [])
+        self.assertEqual(self.facade.get_places_within(1.0, 1.0, 1),
+                         [(self.cabin, 0.0)])
+        self.assertEqual(self.facade.get_places_page(None, 10, amenities=[self.wifi.id]),
+                         [self.cabin])
+        self.assertEqual(self.facade.rating_prior()[0], 2.0)
+
+    def test_delete_user(self):
+        """Test that deleting a user cascades and frees the email"""
+        self.assertTrue(self.facade.delete_user(self.host.id))
+        self.assertFalse(self.facade.delete_user(self.host.id))
+        self.assertEqual(self.facade.get_all_places(), [self.cabin])
+        self.assertEqual(self.facade.get_all_reviews(), [])
+        self.assertEqual((self.cabin.reviews, self.cabin.rating_count), ([], 0))
+        self.assertEqual(self.facade.check_rating_aggregates(), {})
+        self.facade.create_user({'first_name': 'Cascade', 'last_name': 'Again',
+                                 'email': self.host.email})
+
+    def test_delete_amenity(self):
+        """Test that deleting an amenity takes it off its places"""
+        self.assertTrue(self.facade.delete_amenity(self.wifi.id))
+        self.assertFalse(self.facade.delete_amenity(self.wifi.id))
+        self.assertEqual((self.loft.amenities, self.cabin.amenities), ([], []))
+        self.assertEqual(self.facade.get_places_page(None, 10, any_amenities=[self.wifi.id]),
+                         [])
+        self.facade.create_amenity({'name': self.wifi.name})
+
+
+class TestCompactModels(unittest.TestCase):
+    """Test cases for the __slots__ model representation"""
+
+    def test_no_instance_dict(self):
+        """Test that entities carry no per-instance __dict__"""
+        user = make_user()
+        place = Place(title='Slots', description=None, price=1, latitude=0.0,
+                      longitude=0.0, owner=user)
+        for obj in (user, Amenity('Sauna'), place):
+            self.assertFalse(hasattr(obj, '__dict__'))
+        with self.assertRaises(AttributeError):
+            user.nickname = 'JD'
+
+    def test_names_interned(self):
+        """Test that equal names share one string object"""
+        first = make_user(first_name=''.join(['Ma', 'rie']))
+        second = make_user(first_name=''.join(['Mar', 'ie']))
+        self.assertIs(first.first_name, second.first_name)
+        self.assertIs(Amenity(''.join(['Po', 'ol'])).name, Amenity(''.join(['Poo', 'l'])).name)
+
+    def test_timestamps_round_trip(self):
+        """Test that timestamps keep microsecond precision through a state copy"""
+        user = make_user()
+        self.assertEqual(user.created_at, user.updated_at)
+        user.save()
+        self.assertGreaterEqual(user.updated_at, user.created_at)
+        copy = load_state(new_instance(User), dump_state(user), None)
+        self.assertEqual((copy.created_at, copy.updated_at), (user.created_at, user.updated_at))
+        self.assertEqual(copy.first_name, user.first_name)
+
+    def test_state_fields(self):
+        """Test that STATE_FIELDS lists the persistent attributes only"""
+        self.assertEqual(User.STATE_FIELDS, ('id', 'created_at', 'updated_at', 'first_name',
+                                             'last_name', 'email', 'is_admin', 'password'))
+        self.assertNotIn('_review_index', Place.STATE_FIELDS)
+        self.assertIn('reviews', Place.STATE_FIELDS)
+
+
+class TestFieldValidators(unittest.TestCase):
+    """Test cases for the compiled model field validators"""
+
+    def setUp(self):
+        self.owner = make_user()
+        self.place = Place('Loft', None, 80, 1.0, 2.0, self.owner)
+
+    def test_update_checks_every_field_first(self):
+        """Test that a rejected update leaves every field unchanged"""
+        with self.assertRaises(ValueError):
+            self.place.update({'title': 'Renamed', 'price': -1})
+        self.assertEqual(self.place.title, 'Loft')
+        with self.assertRaisesRegex(ValueError, 'rating_count is computed'):
+            self.place.update({'rating_count': 3})
+
+    def test_update_normalizes(self):
+        """Test that update casts like the constructor and skips unknown keys"""
+        self.place.update({'price': 95, 'latitude': -3, 'nickname': 'x'})
+        self.assertEqual((self.place.price, self.place.latitude), (95.0, -3.0))
+        self.assertIs(type(self.place.price), float)
+
+    def test_update_ignores_server_managed_fields(self):
+        """Test that update cannot set the id, timestamps or relation lists"""
+        place_id, created = self.place.id, self.place.created_at
+        self.place.update({'id': 'evil', 'created_at': datetime(2000, 1, 1), 'reviews': [1],
+                           'amenities': ['x'], 'title': 'Renamed'})
+        self.assertEqual((self.place.id, self.place.created_at), (place_id, created))
+        self.assertEqual((self.place.reviews, self.place.amenities), ([], []))
+        self.assertEqual(self.place.title, 'Renamed')
+
+    def test_messages(self):
+        """Test that validators raise the field-specific errors"""
+        cases = [({'latitude': 91}, ValueError, 'latitude must be within -90.0 to 90.0'),
+                 ({'title': 'x' * 101}, ValueError, 'title must be at most 100 characters'),
+                 ({'owner': 'me'}, TypeError, 'owner must be a User'),
+                 ({'price': '10'}, TypeError, 'price must be a number')]
+        for data, error, message in cases:
+            with self.assertRaisesRegex(error, message):
+                self.place.update(data)
+        with self.assertRaisesRegex(ValueError, 'email must be a valid email'):
+            self.owner.update({'email': 'not-an-email'})
+
+    def test_api_models_share_declarations(self):
+        """Test that API payload fields come from the model declarations"""
+        from app.api.v1.places import place_model
+        from app.api.v1.users import user_update_model
+        self.assertEqual(place_model['title'].description,
+                         Place.FIELDS['title'].description)
+        self.assertTrue(place_model['price'].required)
+        self.assertFalse(user_update_model['email'].required)
+
+
+class TestPayloadValidation(unittest.TestCase):
+    """Test cases for the compiled request payload validators"""
+
+    def test_same_errors_as_jsonschema(self):
+        """Test that compiled validators report what flask_restx validation reports"""
+        from werkzeug.exceptions import HTTPException
+        from app.api.v1.places import place_model
+        from app.api.v1.reviews import review_model
+        from app.api.v1.validation import compile_payload
+        payloads = [None, [], {}, {'title': 5, 'price': True, 'amenities': ['a', 2]},
+                    {'text': 'x', 'rating': 5.0, 'user_id': None, 'extra': 1},
+                    {'title': 'Loft', 'price': 1, 'latitude': 0, 'longitude': 0.5,
+                     'owner_id': 'u', 'amenities': []},
+                    {'text': 'x', 'rating': 5, 'user_id': 'u', 'place_id': 'p'}]
+        for model in (place_model, review_model):
+            validate = compile_payload(model)
+            for payload in payloads:
+                try:
+                    model.validate(payload)
+                    expected = {}
+                except HTTPException as exc:
+                    expected = exc.data['errors']
+                self.assertEqual(list(validate(payload).items()), list(expected.items()))
+
+
+
+class TestCursors(unittest.TestCase):
+    """Test cases for keyset pagination cursors"""
+
+    def test_round_trip(self):
+        """Test that encoded cursors decode to the same keys"""
+        from app.api.v1.pagination import decode_cursor, encode_cursor
+        moment = datetime(2024, 5, 1, 12, 30)
+        for sort, key in (('id', 'abc'), ('price', (12.5, 'abc')), ('-price', (3, 'abc')),
+                          ('created_at', (moment, 'abc'))):
+            self.assertEqual(decode_cursor(encode_cursor(sort, key), sort), key)
+
+    def test_ill_typed_keys_rejected(self):
+        """Test that well-formed cursors holding the wrong types are invalid"""
+        from base64 import urlsafe_b64encode
+        from app.api.v1.pagination import decode_cursor
+        cursors = [('id', 5), ('id', {}), ('id', ['x', 'y']), ('price', ['x', 'y']),
+                   ('price', [None, 'y']), ('price', [True, 'y']), ('price', [1, 2]),
+                   ('price', 'y'), ('price', [{'$dt': '2024-05-01T00:00:00'}, 'y']),
+                   ('created_at', [5, 'y']),
+                   ('created_at', [{'$dt': '2024-05-01T00:00:00+02:00'}, 'y'])]
+        for sort, key in cursors:
+            token = urlsafe_b64encode(json.dumps([sort, key]).encode()).decode()
+            with self.assertRaisesRegex(ValueError, 'Invalid cursor'):
+                decode_cursor(token, sort)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+"""
+Shared helpers for the HBnB test modules
+"""
+import uuid
+
+from app.models import User
+
+
+def make_user(**overrides):
+    """Build a User with a unique email (the email registry is per-process)"""
+    data = {'first_name': 'John', 'last_name': 'Doe',
+            'email': f"user.{uuid.uuid4().hex}@example.com"}
+    data.update(overrides)
+    return User(**data)
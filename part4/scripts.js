@@ -59,6 +59,7 @@ document.addEventListener('DOMContentLoaded', () => {
     const placesList = document.getElementById('places-list');
     if (placesList) {
         checkAuthentication();
+        setupPriceFilter();
     }
 });
 
@@ -85,7 +86,7 @@ function checkAuthentication() {
     }
 }
 
-async function fetchPlaces(token) {
+async function fetchPlaces(token, maxPrice = 'all') {
     try {
         const headers = {
             'Content-Type': 'application/json'
@@ -96,15 +97,18 @@ async function fetchPlaces(token) {
             headers['Authorization'] = `Bearer ${token}`;
         }
 
-        const response = await fetch(`${API_BASE_URL}/places`, {
+        // The API filters by price server-side
+        const query = (!maxPrice || maxPrice === 'all') ? '' : `?max_price=${encodeURIComponent(maxPrice)}`;
+        // Revalidate with the stored ETag: unchanged lists come back as 304
+        const response = await fetch(`${API_BASE_URL}/places/${query}`, {
             method: 'GET',
-            headers: headers
+            headers: headers,
+            cache: 'no-cache'
         });
 
         if (response.ok) {
             const places = await response.json();
             displayPlaces(places);
-            setupPriceFilter(places);
         } else {
             console.error('Failed to fetch places:', response.statusText);
             document.getElementById('places-list').innerHTML = '<p>Failed to load places. Please try again later.</p>';
@@ -141,7 +145,7 @@ function displayPlaces(places) {
     });
 }
 
-function setupPriceFilter(places) {
+function setupPriceFilter() {
     const priceFilter = document.getElementById('price-filter');
     
     if (priceFilter) {
@@ -153,22 +157,8 @@ function setupPriceFilter(places) {
 }
 
 function filterPlacesByPrice(maxPrice) {
-    const placeCards = document.querySelectorAll('.place-card');
-
-    placeCards.forEach(card => {
-        const price = parseFloat(card.getAttribute('data-price'));
-
-        if (maxPrice === 'all') {
-            card.style.display = 'block';
-        } else {
-            const max = parseFloat(maxPrice);
-            if (price <= max) {
-                card.style.display = 'block';
-            } else {
-                card.style.display = 'none';
-            }
-        }
-    });
+    // Ask the API for the matching places instead of hiding cards locally
+    fetchPlaces(getCookie('token'), maxPrice);
 }
 
 function viewPlaceDetails(placeId) {
@@ -194,7 +184,8 @@ async function fetchPlaceDetails(placeId, token) {
 
         const response = await fetch(`${API_BASE_URL}/places/${placeId}`, {
             method: 'GET',
-            headers: headers
+            headers: headers,
+            cache: 'no-cache'
         });
 
         if (response.ok) {